@@ -0,0 +1,191 @@
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from actions.page_ready import navigate
+from utils.config import BLOCKED_URL_PATTERNS, DRIVER_PROFILE
+from utils.error import messageError
+from utils.metrics import register_metrics_collector
+
+# Resources most controllers never read: images, fonts, media, analytics and ads.
+# Network.setBlockedURLs patterns match the whole URL ('*' matches any text). Extensions are
+# anchored to the end of the path, with or without a query string, so hosts like
+# www.gifts.com or www.webmd.com are not blocked
+LEAN_BLOCKED_EXTENSIONS = [
+    'png', 'jpg', 'jpeg', 'gif', 'webp', 'avif', 'svg', 'ico', 'bmp',
+    'woff', 'woff2', 'ttf', 'otf', 'eot',
+    'mp4', 'webm', 'ogg', 'mp3', 'wav', 'm3u8',
+]
+LEAN_BLOCKED_URLS = [pattern for extension in LEAN_BLOCKED_EXTENSIONS
+                     for pattern in (f'*.{extension}', f'*.{extension}?*')] + [
+    '*google-analytics.com*', '*googletagmanager.com*', '*doubleclick.net*',
+    '*googlesyndication.com*', '*facebook.net*', '*hotjar.com*', '*scorecardresearch.com*',
+]
+
+# name -> {'blocked_urls': CDP patterns (Chromium only), 'chrome_prefs': {...}, 'firefox_prefs': {...}}
+PROFILES = {
+    'default': {'blocked_urls': [], 'chrome_prefs': {}, 'firefox_prefs': {}},
+    'lean': {
+        'blocked_urls': LEAN_BLOCKED_URLS + BLOCKED_URL_PATTERNS,
+        'chrome_prefs': {
+            'profile.managed_default_content_settings.images': 2,
+        },
+        'firefox_prefs': {
+            'permissions.default.image': 2,
+            'gfx.downloadable_fonts.enabled': False,
+            'media.autoplay.default': 5,
+        },
+    },
+}
+
+# Profile chosen for the current request (X-Browser-Profile header), see browser_profile()
+_current_profile = ContextVar('browser_profile', default=None)
+
+# Resource Timing bytes of the page: document plus every resource that was downloaded.
+# Cross-origin resources without Timing-Allow-Origin report 0, so it is a lower bound.
+_TRANSFER_SIZE_JS = """
+var bytes = 0;
+performance.getEntriesByType('navigation').concat(performance.getEntriesByType('resource'))
+    .forEach(function(entry) { bytes += entry.transferSize || 0; });
+return bytes;
+"""
+
+
+@contextmanager
+def browser_profile(name):
+    """
+    Makes `name` the profile of the drivers created or leased inside the block
+    without an explicit profile. None keeps the current one.
+    """
+    if name is not None:
+        get_profile(name)
+    token = _current_profile.set(name or _current_profile.get())
+    try:
+        yield
+    finally:
+        _current_profile.reset(token)
+
+
+def resolve_profile(name=None):
+    """
+    Profile to use: the given one, the one of the current request or DRIVER_PROFILE.
+    """
+    name = name or _current_profile.get() or DRIVER_PROFILE
+    get_profile(name)
+    return name
+
+
+def get_profile(name):
+    profile = PROFILES.get(name)
+    if profile is None:
+        raise messageError(f"Unknown browser profile '{name}'. Available: {', '.join(PROFILES)}")
+    return profile
+
+
+def apply_profile_options(options, name, browser='chrome'):
+    """
+    Adds the content settings of a profile to the browser options (before launching it).
+    """
+    profile = get_profile(name)
+    if browser == 'firefox':
+        for key, value in profile['firefox_prefs'].items():
+            options.set_preference(key, value)
+    elif profile['chrome_prefs']:
+        prefs = dict(options.experimental_options.get('prefs', {}))
+        prefs.update(profile['chrome_prefs'])
+        options.add_experimental_option('prefs', prefs)
+    return options
+
+
+def apply_profile_network(driver, name):
+    """
+    Blocks the URL patterns of a profile in a launched Chromium driver (CDP).
+
+    Returns:
+        bool: True if the patterns were installed (or the profile has none)
+    """
+    patterns = get_profile(name)['blocked_urls']
+    if not patterns:
+        return True
+    try:
+        driver.execute_cdp_cmd('Network.enable', {})
+        driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': patterns})
+        return True
+    except Exception as e:
+        logging.warning(f"Browser profile '{name}': URL blocking not available: {e}")
+        return False
+
+
+def open_url(driver, url, profile, ready=None):
+    """
+    driver.get(url) and the `ready` condition (see actions/page_ready.py),
+    recording the time until the page is ready and the transferred bytes in
+    the report of `profile`.
+    """
+    start = time.perf_counter()
+    navigate(driver, lambda: driver.get(url), ready)
+    elapsed = time.perf_counter() - start
+    try:
+        transferred = driver.execute_script(_TRANSFER_SIZE_JS)
+    except Exception:
+        transferred = None
+    profile_stats.record(profile, elapsed, transferred)
+    return driver
+
+
+class ProfileStats:
+    """
+    Page loads, load time and bytes transferred per browser profile.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stats = {}
+
+    def record(self, profile, seconds, transferred=None):
+        with self._lock:
+            stats = self._stats.setdefault(profile, {'pages': 0, 'seconds': 0.0, 'bytes': 0, 'measured': 0})
+            stats['pages'] += 1
+            stats['seconds'] += seconds
+            if isinstance(transferred, (int, float)):
+                stats['bytes'] += int(transferred)
+                stats['measured'] += 1
+
+    def report(self):
+        """
+        Returns:
+            dict: {profile: {'pages', 'avg_load_seconds', 'avg_bytes', 'bytes'}}
+        """
+        with self._lock:
+            stats = {profile: dict(values) for profile, values in self._stats.items()}
+        return {
+            profile: {
+                'pages': s['pages'],
+                'avg_load_seconds': s['seconds'] / s['pages'],
+                'avg_bytes': s['bytes'] / s['measured'] if s['measured'] else None,
+                'bytes': s['bytes'],
+            }
+            for profile, s in stats.items()
+        }
+
+    def reset(self):
+        with self._lock:
+            self._stats.clear()
+
+    def metrics(self):
+        with self._lock:
+            stats = {profile: dict(values) for profile, values in self._stats.items()}
+        return [
+            ('scraper_profile_page_loads_total', 'counter', 'Pages opened by browser profile.',
+             [({'profile': p}, s['pages']) for p, s in sorted(stats.items())]),
+            ('scraper_profile_page_load_seconds_total', 'counter', 'Seconds spent loading pages by browser profile.',
+             [({'profile': p}, round(s['seconds'], 6)) for p, s in sorted(stats.items())]),
+            ('scraper_profile_transfer_bytes_total', 'counter',
+             'Bytes downloaded by page loads (Resource Timing) by browser profile.',
+             [({'profile': p}, s['bytes']) for p, s in sorted(stats.items())]),
+        ]
+
+
+profile_stats = ProfileStats()
+register_metrics_collector('browser_profiles', profile_stats.metrics)
@@ -1,7 +1,10 @@
 import inspect
 import logging
 from time import sleep
+from actions.page_helpers import make_element_interactable, page_helper
+from actions.strategy_cache import get_site, strategy_cache
 from utils.error import messageError
+from utils.metrics import count_strategy, instrument
 from selenium.webdriver.common.action_chains import ActionChains
 from selenium.webdriver.common.keys import Keys
 from selenium.common.exceptions import (
@@ -11,16 +14,64 @@ from selenium.common.exceptions import (
 )
 
 
+def _click_basic(driver, element):
+    # Scroll básico y ActionChains con move_to_element (método original)
+    driver.execute_script("arguments[0].scrollIntoView(true);", element)
+    ActionChains(driver).move_to_element(element).perform()
+    element.click()
+
+
+def _click_action_chains(driver, element):
+    ActionChains(driver).move_to_element(element).click().perform()
+
+
+def _click_direct(driver, element):
+    element.click()
+
+
+def _click_javascript(driver, element):
+    page_helper(driver, 'click', element)
+
+
+def _click_focus_enter(driver, element):
+    page_helper(driver, 'focus', element)
+    element.send_keys(Keys.ENTER)
+
+
+def _click_action_chains_pause(driver, element):
+    ActionChains(driver).move_to_element(element).pause(0.1).click().perform()
+
+
+_NOT_CLICKABLE = (ElementNotInteractableException, ElementClickInterceptedException)
+
+# Métodos avanzados en orden: (nombre, función, excepciones que pasan al siguiente método).
+# Otras excepciones terminan el intento actual.
+CLICK_STRATEGIES = [
+    ('action_chains', _click_action_chains, _NOT_CLICKABLE),
+    ('direct', _click_direct, _NOT_CLICKABLE),
+    ('javascript', _click_javascript, Exception),
+    ('focus_enter', _click_focus_enter, Exception),
+    ('action_chains_pause', _click_action_chains_pause, Exception),
+]
+_STRATEGY_FUNCTIONS = dict([('basic', _click_basic)] + [(name, function) for name, function, _ in CLICK_STRATEGIES])
+
+
 # This function searches for an element on the page, scrolls to it, and click to it with multiple fallback strategies.
-def click_element(driver, element, max_attempts=3):
+@instrument
+def click_element(driver, element, max_attempts=3, locator=None):
     logging.info(f"START || {inspect.currentframe().f_code.co_name} - Element: {element}")
     """
     Realiza un click seguro en un elemento, intentando diferentes métodos con robustez mejorada
 
+    El método que funcionó se recuerda por sitio y localizador (strategy_cache)
+    y se prueba primero la próxima vez, sin las esperas de los reintentos.
+
     Args:
         driver: WebDriver de Selenium
         element: Elemento a hacer click
         max_attempts: Número máximo de intentos (default: 3)
+        locator: Localizador con el que se buscó el elemento, p. ej. (By.ID, 'submit').
+            Sin él se comparte una entrada por sitio (default: None)
 
     Returns:
         driver: WebDriver actualizado
@@ -29,30 +80,37 @@ def click_element(driver, element, max_attempts=3):
         messageError: Si todos los intentos de click fallan
     """
     try:
+        site = get_site(driver)
+
+        # PASO 0: Probar primero el método que funcionó la última vez en este sitio/localizador
+        preferred = strategy_cache.get('click_element', site, locator)
+        if preferred is None:
+            strategy_cache.count_lookup('click_element', 'miss')
+        elif _try_preferred(driver, element, preferred):
+            strategy_cache.count_lookup('click_element', 'hit')
+            count_strategy('click_element', preferred)
+            return driver
+        else:
+            strategy_cache.count_lookup('click_element', 'stale')
+            strategy_cache.forget('click_element', site, locator)
 
         # PASO 1: Intentar método básico primero (click simple)
-        try:
-
-            # Verificar que el elemento esté disponible
-            element.is_displayed()
+        if preferred != 'basic':
+            try:
 
-            # Scroll básico al elemento
-            driver.execute_script(
-                "arguments[0].scrollIntoView(true);", element)
+                # Verificar que el elemento esté disponible
+                element.is_displayed()
+                _click_basic(driver, element)
 
-            # ActionChains básico con move_to_element (método original)
-            actions = ActionChains(driver)
-            actions.move_to_element(element).perform()
-            element.click()
+                _remember(site, locator, 'basic')
+                return driver
 
-            return driver
-
-        except (ElementNotInteractableException, ElementClickInterceptedException, StaleElementReferenceException) as e:
-            logging.debug(
-                f"⚠️ Método básico falló: {e}, pasando a métodos avanzados")
-        except Exception as e:
-            logging.debug(
-                f"⚠️ Error inesperado en método básico: {e}, pasando a métodos avanzados")
+            except (ElementNotInteractableException, ElementClickInterceptedException, StaleElementReferenceException) as e:
+                logging.debug(
+                    f"⚠️ Método básico falló: {e}, pasando a métodos avanzados")
+            except Exception as e:
+                logging.debug(
+                    f"⚠️ Error inesperado en método básico: {e}, pasando a métodos avanzados")
 
         for attempt in range(max_attempts):
             try:
@@ -69,13 +127,7 @@ def click_element(driver, element, max_attempts=3):
 
                 # Scroll al elemento con JavaScript más robusto
                 try:
-                    driver.execute_script("""
-                        arguments[0].scrollIntoView({
-                            behavior: 'smooth', 
-                            block: 'center',
-                            inline: 'center'
-                        });
-                    """, element)
+                    page_helper(driver, 'scrollCenter', element, True)
                     sleep(0.5)
                 except Exception as e:
                     logging.warning(f"Error en scroll avanzado: {e}")
@@ -84,44 +136,14 @@ def click_element(driver, element, max_attempts=3):
                 make_element_interactable(driver, element)
                 sleep(0.2)
 
-                # Método 1: Click con ActionChains mejorado
-                try:
-                    actions = ActionChains(driver)
-                    actions.move_to_element(element).click().perform()
-                    return driver
-                except (ElementNotInteractableException, ElementClickInterceptedException) as e:
-                    logging.debug(f"ActionChains avanzado falló: {e}")
-
-                # Método 2: Click directo
-                try:
-                    element.click()
-                    return driver
-                except (ElementNotInteractableException, ElementClickInterceptedException) as e:
-                    logging.debug(f"Click directo avanzado falló: {e}")
-
-                # Método 3: Click con JavaScript
-                try:
-                    driver.execute_script("arguments[0].click();", element)
-                    return driver
-                except Exception as e:
-                    logging.debug(f"Click con JavaScript falló: {e}")
-
-                # Método 4: Focus y Enter
-                try:
-                    driver.execute_script("arguments[0].focus();", element)
-                    element.send_keys(Keys.ENTER)
-                    return driver
-                except Exception as e:
-                    logging.debug(f"Focus y Enter falló: {e}")
-
-                # Método 5: ActionChains avanzado con pausa
-                try:
-                    actions = ActionChains(driver)
-                    actions.move_to_element(element).pause(
-                        0.1).click().perform()
-                    return driver
-                except Exception as e:
-                    logging.debug(f"ActionChains con pausa falló: {e}")
+                # Métodos 1-5: ActionChains, click directo, JavaScript, focus y Enter, ActionChains con pausa
+                for name, strategy, recoverable in CLICK_STRATEGIES:
+                    try:
+                        strategy(driver, element)
+                        _remember(site, locator, name)
+                        return driver
+                    except recoverable as e:
+                        logging.debug(f"Método {name} falló: {e}")
 
                 # Si llegamos aquí, todos los métodos fallaron en este intento
                 logging.warning(
@@ -143,6 +165,7 @@ def click_element(driver, element, max_attempts=3):
 
         # Si llegamos aquí, todos los intentos fallaron
         logging.error("❌ Todos los intentos de click fallaron")
+        count_strategy('click_element', 'failed')
         raise messageError(
             "No se pudo hacer click en el elemento después de múltiples intentos")
 
@@ -151,87 +174,26 @@ def click_element(driver, element, max_attempts=3):
             f"Error {inspect.currentframe().f_code.co_name}: {e}")
 
 
-def make_element_interactable(driver, element):
+def _try_preferred(driver, element, preferred):
     """
-    Intenta hacer un elemento interactuable removiendo restricciones comunes
-
-    Args:
-        driver: WebDriver de Selenium
-        element: Elemento web a hacer interactuable
-
-    Returns:
-        bool: True si el elemento fue habilitado exitosamente
+    Runs only the cached method, with a direct scroll and no waits.
+    Returns False if it fails (or no longer exists) so the full chain runs.
     """
+    strategy = _STRATEGY_FUNCTIONS.get(preferred)
+    if strategy is None:
+        return False
     try:
-
-        # Script para habilitar elemento
-        result = driver.execute_script("""
-            var element = arguments[0];
-            
-            try {
-                // Quitar atributos restrictivos
-                element.removeAttribute('disabled');
-                element.removeAttribute('readonly');
-                element.disabled = false;
-                element.readOnly = false;
-                
-                // Quitar clases que pueden bloquear interacción
-                var restrictiveClasses = [
-                    'disabled', 'readonly', 'not-allowed', 'pointer-events-none',
-                    'dp__input_readonly', 'dp__pointer', 'dp__disabled'
-                ];
-                
-                restrictiveClasses.forEach(function(className) {
-                    element.classList.remove(className);
-                });
-                
-                // Habilitar estilos
-                element.style.pointerEvents = 'auto';
-                element.style.cursor = 'auto';
-                element.style.opacity = '1';
-                element.style.visibility = 'visible';
-                element.style.display = 'block';
-                
-                // Si es un input, asegurar que sea de tipo text
-                if (element.tagName.toLowerCase() === 'input') {
-                    if (element.getAttribute('inputmode') === 'none') {
-                        element.setAttribute('inputmode', 'text');
-                    }
-                    if (!element.type || element.type === 'hidden') {
-                        element.setAttribute('type', 'text');
-                    }
-                }
-                
-                // Habilitar contenedores padre que puedan estar bloqueando
-                var parent = element.parentElement;
-                var levels = 0;
-                while (parent && levels < 5) {
-                    parent.removeAttribute('disabled');
-                    parent.disabled = false;
-                    parent.style.pointerEvents = 'auto';
-                    
-                    restrictiveClasses.forEach(function(className) {
-                        parent.classList.remove(className);
-                    });
-                    
-                    parent = parent.parentElement;
-                    levels++;
-                }
-                
-                return true;
-                
-            } catch (error) {
-                console.error('Error habilitando elemento:', error);
-                return false;
-            }
-        """, element)
-
-        if result:
-            return True
-        else:
-            logging.warning("No se pudo habilitar el elemento")
-            return False
-
+        element.is_displayed()
+        if preferred != 'basic':
+            page_helper(driver, 'scrollCenter', element, False)
+            make_element_interactable(driver, element)
+        strategy(driver, element)
+        return True
     except Exception as e:
-        logging.error(f"Error en make_element_interactable: {e}")
+        logging.debug(f"Método recordado {preferred} falló: {e}")
         return False
+
+
+def _remember(site, locator, strategy):
+    strategy_cache.remember('click_element', site, locator, strategy)
+    count_strategy('click_element', strategy)
@@ -0,0 +1,325 @@
+import atexit
+import inspect
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from actions.browser_profiles import open_url, resolve_profile
+from actions.driver_registry import current_owner, set_driver_owner
+from actions.web_driver import close_driver, create_driver, resolve_page_load_strategy
+from utils.config import (
+    BASE_URL,
+    DRIVER_POOL_LEASE_TIMEOUT,
+    DRIVER_POOL_MAX_AGE,
+    DRIVER_POOL_MAX_IDLE,
+    DRIVER_POOL_MAX_USES,
+    DRIVER_POOL_PREWARM,
+    DRIVER_POOL_SIZE,
+    NETWORK_IDLE_CDP,
+)
+from utils.download_sandbox import set_download_directory
+from utils.error import messageError
+from utils.maintenance import register_maintenance_task
+from utils.metrics import register_metrics_collector
+
+
+# One pool per (browser type, profile, page load strategy) and process (each gunicorn worker has its own)
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+class PooledDriver:
+    """
+    Driver managed by a DriverPool together with its usage bookkeeping.
+    """
+
+    def __init__(self, driver):
+        self.driver = driver
+        self.created_at = time.monotonic()
+        self.last_used = self.created_at
+        self.uses = 0
+
+
+class DriverPool:
+    """
+    Keeps up to `size` pre-launched drivers and leases them to controllers.
+
+    Drivers are reset when returned (tabs, cookies, storage, about:blank) and
+    recycled after `max_uses` leases, `max_age` seconds of life or `max_idle`
+    seconds without being used.
+
+    Args:
+        factory: Callable without arguments that returns a new WebDriver
+        size: Maximum number of drivers alive at the same time
+        max_idle: Seconds an idle driver is kept before quitting it
+        max_uses: Leases before a driver is recycled
+        max_age: Seconds since creation before a driver is recycled
+        lease_timeout: Seconds to wait for a free driver before failing
+    """
+
+    def __init__(self, factory, size=DRIVER_POOL_SIZE, max_idle=DRIVER_POOL_MAX_IDLE,
+                 max_uses=DRIVER_POOL_MAX_USES, max_age=DRIVER_POOL_MAX_AGE,
+                 lease_timeout=DRIVER_POOL_LEASE_TIMEOUT):
+        self.factory = factory
+        self.size = max(1, size)
+        self.max_idle = max_idle
+        self.max_uses = max_uses
+        self.max_age = max_age
+        self.lease_timeout = lease_timeout
+        self._idle = []
+        self._total = 0
+        self._closed = False
+        self._condition = threading.Condition()
+
+    @contextmanager
+    def lease(self):
+        """
+        Context manager that yields a ready-to-use driver and returns it to
+        the pool on exit. The driver downloads into the sandbox of the
+        current request (see utils/download_sandbox.py).
+        """
+        entry = self._acquire()
+        try:
+            set_download_directory(entry.driver)
+            yield entry.driver
+        finally:
+            self._release(entry)
+
+    def warm(self):
+        """
+        Launches drivers until the pool holds `size` of them.
+        """
+        logging.info(f"START || {inspect.currentframe().f_code.co_name}")
+        while True:
+            with self._condition:
+                if self._closed or self._total >= self.size:
+                    return
+                self._total += 1
+            try:
+                entry = PooledDriver(self.factory())
+                set_driver_owner(entry.driver, None)
+            except Exception as e:
+                with self._condition:
+                    self._total -= 1
+                    self._condition.notify()
+                logging.warning(f"Could not pre-launch pooled driver: {e}")
+                return
+            with self._condition:
+                self._idle.append(entry)
+                self._condition.notify()
+
+    def prune(self):
+        """
+        Quits idle drivers that exceeded their idle time, age or uses.
+        """
+        with self._condition:
+            expired = [entry for entry in self._idle if self._is_expired(entry, idle=True)]
+            for entry in expired:
+                self._idle.remove(entry)
+                self._total -= 1
+            if expired:
+                self._condition.notify_all()
+        for entry in expired:
+            self._quit(entry)
+        return len(expired)
+
+    def close(self):
+        """
+        Quits every idle driver and rejects new leases.
+        """
+        with self._condition:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._total -= len(idle)
+            self._condition.notify_all()
+        for entry in idle:
+            self._quit(entry)
+
+    def stats(self):
+        with self._condition:
+            return {'idle': len(self._idle), 'total': self._total, 'size': self.size}
+
+    def _acquire(self):
+        self.prune()
+        deadline = time.monotonic() + self.lease_timeout
+        with self._condition:
+            while True:
+                if self._closed:
+                    raise messageError("The driver pool is closed")
+                if self._idle:
+                    # LIFO keeps the hottest drivers busy and lets the rest go idle
+                    entry = self._idle.pop()
+                    set_driver_owner(entry.driver, current_owner())
+                    return entry
+                if self._total < self.size:
+                    self._total += 1
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise messageError(
+                        f"No driver available after waiting {self.lease_timeout}s")
+                self._condition.wait(remaining)
+
+        try:
+            return PooledDriver(self.factory())
+        except Exception:
+            with self._condition:
+                self._total -= 1
+                self._condition.notify()
+            raise
+
+    def _release(self, entry):
+        entry.uses += 1
+        entry.last_used = time.monotonic()
+
+        keep = not self._closed and not self._is_expired(entry) and reset_driver_state(entry.driver)
+        if keep:
+            with self._condition:
+                if not self._closed:
+                    # Idle drivers belong to the pool, not to the request that used them
+                    set_driver_owner(entry.driver, None)
+                    self._idle.append(entry)
+                    self._condition.notify()
+                    return
+
+        with self._condition:
+            self._total -= 1
+            self._condition.notify()
+        self._quit(entry)
+
+    def _is_expired(self, entry, idle=False):
+        now = time.monotonic()
+        if self.max_uses and entry.uses >= self.max_uses:
+            return True
+        if self.max_age and now - entry.created_at >= self.max_age:
+            return True
+        return idle and bool(self.max_idle) and now - entry.last_used >= self.max_idle
+
+    @staticmethod
+    def _quit(entry):
+        close_driver(entry.driver)
+
+
+def reset_driver_state(driver):
+    """
+    Leaves a driver as a freshly launched one: a single tab on about:blank
+    without cookies or web storage.
+
+    Returns:
+        bool: True if the driver can be reused, False if it should be discarded
+    """
+    try:
+        handles = driver.window_handles
+        for handle in handles[1:]:
+            driver.switch_to.window(handle)
+            driver.close()
+        driver.switch_to.window(handles[0])
+
+        # Web storage is per origin, so it has to be cleared before leaving the page
+        driver.execute_script(
+            "try { window.localStorage.clear(); window.sessionStorage.clear(); } catch (e) {}")
+        if hasattr(driver, 'execute_cdp_cmd'):
+            # Chromium: wipe the cookies of every domain, not only the current one
+            driver.execute_cdp_cmd('Network.clearBrowserCookies', {})
+            if NETWORK_IDLE_CDP:
+                _drain_performance_log(driver)
+        driver.delete_all_cookies()
+        driver.get('about:blank')
+        return True
+    except Exception as e:
+        logging.warning(f"Discarding pooled driver, reset failed: {e}")
+        return False
+
+
+def _drain_performance_log(driver):
+    # Network events buffered for the 'networkidle' readiness are not carried to the next lease
+    try:
+        driver.get_log('performance')
+    except Exception:
+        pass
+
+
+def get_driver_pool(browser='chrome', profile=None, page_load_strategy=None):
+    """
+    Returns the process-wide pool for a browser type, profile and page load
+    strategy, creating it on first use. Drivers of different profiles or
+    strategies are never shared.
+    """
+    profile = resolve_profile(profile)
+    page_load_strategy = resolve_page_load_strategy(page_load_strategy)
+    key = (browser, profile, page_load_strategy)
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None:
+            pool = DriverPool(lambda: create_driver(browser, profile, page_load_strategy))
+            _pools[key] = pool
+            if DRIVER_POOL_MAX_IDLE:
+                # Idle drivers are also closed between requests, not only on the next lease
+                register_maintenance_task(
+                    'driver_pool_prune', prune_driver_pools, max(1, DRIVER_POOL_MAX_IDLE // 2))
+            if DRIVER_POOL_PREWARM:
+                threading.Thread(target=pool.warm, daemon=True,
+                                 name=f"driver-pool-warm-{browser}-{profile}-{page_load_strategy}").start()
+        return pool
+
+
+@contextmanager
+def lease_page(browser='chrome', url=BASE_URL, profile=None, page_load_strategy=None, ready=None):
+    """
+    Pooled equivalent of get_page: leases a driver, opens `url` and gives the
+    driver back to the pool when the block finishes.
+
+    `profile` selects the browser profile, e.g. 'lean' to block images, fonts,
+    media and trackers (default: the request's profile or DRIVER_PROFILE).
+    `page_load_strategy` and `ready` work as in get_page, e.g.
+    lease_page(page_load_strategy='none', ready=(By.ID, 'results')).
+
+    Example:
+        with lease_page('firefox') as driver:
+            driver = login(driver, username, password)
+
+        with lease_page(profile='lean') as driver:
+            rows = extract(driver, (By.CSS_SELECTOR, 'table tbody'), schema)
+    """
+    logging.info(
+        f"START || {inspect.currentframe().f_code.co_name} - Browser: {browser}, URL: {url}")
+    profile = resolve_profile(profile)
+    with get_driver_pool(browser, profile, page_load_strategy).lease() as driver:
+        logging.info('Getting URL')
+        yield open_url(driver, url, profile, ready)
+
+
+def prune_driver_pools():
+    with _pools_lock:
+        pools = list(_pools.values())
+    return sum(pool.prune() for pool in pools)
+
+
+def close_driver_pools():
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        pool.close()
+
+
+def driver_pool_metrics():
+    with _pools_lock:
+        stats = {key: pool.stats() for key, pool in _pools.items()}
+
+    def labels(key):
+        browser, profile, page_load_strategy = key
+        return {'browser': browser, 'profile': profile, 'page_load_strategy': page_load_strategy}
+
+    return [
+        ('scraper_driver_pool_drivers', 'gauge', 'Drivers open in each pool (idle or leased).',
+         [(labels(key), s['total']) for key, s in stats.items()]),
+        ('scraper_driver_pool_idle_drivers', 'gauge', 'Idle drivers ready to be leased.',
+         [(labels(key), s['idle']) for key, s in stats.items()]),
+        ('scraper_driver_pool_size', 'gauge', 'Maximum drivers of each pool.',
+         [(labels(key), s['size']) for key, s in stats.items()]),
+    ]
+
+
+register_metrics_collector('driver_pool', driver_pool_metrics)
+atexit.register(close_driver_pools)
@@ -0,0 +1,250 @@
+import logging
+import threading
+import time
+import weakref
+from contextlib import contextmanager
+from contextvars import ContextVar
+import psutil
+from utils.config import DRIVER_REAPER_INTERVAL
+
+
+# Index of the process trees spawned by this worker: id(driver) -> DriverTree.
+# An id is reused once its driver is garbage collected, so every lookup checks
+# that the tree still belongs to the driver (DriverTree.driver_ref)
+_trees = {}
+_lock = threading.Lock()
+_reaper = None
+
+# Owner of the drivers created in the current request, batch item or job, see driver_owner()
+_current_owner = ContextVar('driver_owner', default=None)
+
+
+class RequestOwner:
+    """
+    Owner of the drivers created during one request, batch item or job.
+
+    gunicorn sync workers and the batch and job pools reuse their threads,
+    so a thread never dies with the request that leaked a driver: the end
+    of the request is what makes its drivers orphans.
+    """
+
+    def __init__(self, label=None):
+        self.label = label
+        self._alive = True
+
+    def is_alive(self):
+        return self._alive
+
+    def finish(self):
+        self._alive = False
+
+
+@contextmanager
+def driver_owner(label=None):
+    """
+    Makes the block the owner of the drivers created or leased inside it.
+    Drivers still registered when it exits are killed by the next reaper
+    pass, whether or not the thread goes on serving other requests.
+
+    Example:
+        with driver_owner(request_id):
+            message = controller_function(data)
+    """
+    owner = RequestOwner(label)
+    token = _current_owner.set(owner)
+    try:
+        yield owner
+    finally:
+        _current_owner.reset(token)
+        owner.finish()
+
+
+def current_owner():
+    """
+    Owner of the current request (see driver_owner), or the current thread outside of one.
+    """
+    return _current_owner.get() or threading.current_thread()
+
+
+class DriverTree:
+    """
+    Processes that belong to one WebDriver: the driver service (chromedriver,
+    geckodriver) and the browser processes it launched.
+
+    Each pid is stored with its creation time so a recycled pid owned by an
+    unrelated process is never killed. Browsers keep spawning processes
+    (renderers, GPU...) after launch, so the children of the root are
+    looked up again before killing.
+    """
+
+    def __init__(self, driver, owner):
+        self.driver_ref = weakref.ref(driver)
+        self.owner = owner
+        self.root = None
+        self.processes = {}
+        self.created_at = time.monotonic()
+
+    def add(self, proc):
+        try:
+            self.processes[proc.pid] = proc.create_time()
+        except psutil.Error:
+            pass
+
+    def add_tree(self, root):
+        self.add(root)
+        if root.pid in self.processes:
+            self.root = root.pid
+        for child in root.children(recursive=True):
+            self.add(child)
+
+    def refresh(self):
+        # Children spawned since registration, only while the root is still the same process
+        if self.root is None:
+            return
+        try:
+            root = psutil.Process(self.root)
+            if root.create_time() == self.processes[self.root]:
+                for child in root.children(recursive=True):
+                    self.add(child)
+        except psutil.Error:
+            pass
+
+    def is_orphan(self):
+        if self.driver_ref() is None:
+            return True
+        return self.owner is not None and not self.owner.is_alive()
+
+    def kill(self):
+        self.refresh()
+        killed = 0
+        for pid, create_time in self.processes.items():
+            try:
+                proc = psutil.Process(pid)
+                if proc.create_time() != create_time:
+                    continue
+                proc.kill()
+                killed += 1
+            except psutil.Error:
+                pass
+        return killed
+
+
+def register_driver(driver, owner=None):
+    """
+    Records the pids of the driver service and its browser tree.
+
+    The tree of the service process is walked here and again when it is
+    killed (for the processes spawned in between), never on every cleanup.
+
+    Args:
+        driver: WebDriver just created
+        owner: Request or thread responsible for the driver (default:
+            current_owner()). When the owner ends without closing the
+            driver, the reaper kills it.
+    """
+    tree = DriverTree(driver, owner or current_owner())
+    process = getattr(getattr(driver, 'service', None), 'process', None)
+    if process is not None:
+        try:
+            tree.add_tree(psutil.Process(process.pid))
+        except psutil.Error as e:
+            logging.warning(f"Could not inspect driver process tree: {e}")
+
+    with _lock:
+        previous = _trees.get(id(driver))
+        _trees[id(driver)] = tree
+    if previous is not None and previous.driver_ref() is not driver:
+        # The id of a collected driver whose tree was not reaped yet: kill it instead of losing it
+        killed = previous.kill()
+        logging.warning(f"Reaped the driver tree of a collected driver ({killed} processes)")
+    _start_reaper()
+    return tree
+
+
+def set_driver_owner(driver, owner=None):
+    """
+    Transfers a driver to another owner (request or thread). `owner=None` marks it as held
+    by the driver pool, which the reaper never touches.
+    """
+    with _lock:
+        tree = _tree_of(driver)
+        if tree is not None:
+            tree.owner = owner
+
+
+def unregister_driver(driver):
+    with _lock:
+        tree = _tree_of(driver)
+        if tree is not None:
+            del _trees[id(driver)]
+        return tree
+
+
+def _tree_of(driver):
+    # Called with the lock held
+    tree = _trees.get(id(driver))
+    if tree is not None and tree.driver_ref() is driver:
+        return tree
+    return None
+
+
+def kill_driver_tree(driver):
+    """
+    Kills only the processes spawned for `driver` and forgets them.
+
+    Returns:
+        int: Number of processes killed
+    """
+    tree = unregister_driver(driver)
+    if tree is None:
+        return 0
+    return tree.kill()
+
+
+def kill_owned_trees(owner=None):
+    """
+    Kills every tree owned by `owner` (default: current_owner()).
+    """
+    owner = owner or current_owner()
+    with _lock:
+        keys = [key for key, tree in _trees.items() if tree.owner is owner]
+        trees = [_trees.pop(key) for key in keys]
+    return sum(tree.kill() for tree in trees)
+
+
+def reap_orphans():
+    """
+    Kills the trees whose driver was garbage collected or whose owner
+    (request or thread) finished without closing it.
+    """
+    with _lock:
+        keys = [key for key, tree in _trees.items() if tree.is_orphan()]
+        trees = [_trees.pop(key) for key in keys]
+    killed = sum(tree.kill() for tree in trees)
+    if trees:
+        logging.warning(
+            f"Reaped {len(trees)} orphaned driver trees ({killed} processes)")
+    return killed
+
+
+def registered_drivers():
+    with _lock:
+        return len(_trees)
+
+
+def _reaper_loop():
+    while True:
+        time.sleep(DRIVER_REAPER_INTERVAL)
+        try:
+            reap_orphans()
+        except Exception as e:
+            logging.error(f"Error reaping orphaned drivers: {e}")
+
+
+def _start_reaper():
+    global _reaper
+    with _lock:
+        if _reaper is None or not _reaper.is_alive():
+            _reaper = threading.Thread(
+                target=_reaper_loop, daemon=True, name="driver-reaper")
+            _reaper.start()
@@ -0,0 +1,171 @@
+import json
+import logging
+import os
+import re
+import shutil
+import subprocess
+import threading
+from webdriver_manager.chrome import ChromeDriverManager
+from utils.config import DRIVER_MANIFEST_PATH
+
+
+# Results resolved by this process: name -> value. Filled once, read lock-free.
+_resolved = {}
+_lock = threading.RLock()  # Probes may resolve other names (chromedriver -> chrome_binary)
+
+_MISSING = object()
+# Version of a browser that is missing or can not be probed
+UNKNOWN_VERSION = 'unknown'
+
+
+def _resolve_once(name, probe):
+    value = _resolved.get(name, _MISSING)
+    if value is not _MISSING:
+        return value
+    with _lock:
+        value = _resolved.get(name, _MISSING)
+        if value is _MISSING:
+            value = probe()
+            _resolved[name] = value
+        return value
+
+
+def _first_existing(candidates):
+    return next((path for path in candidates if path and os.path.exists(path)), None)
+
+
+def get_chrome_binary():
+    """
+    Chrome/Chromium binary to launch, or None to let Selenium use the default one.
+    """
+    return _resolve_once('chrome_binary', lambda: _first_existing([
+        os.environ.get("CHROME_BIN"),
+        "/usr/bin/chromium-browser",
+        "/usr/bin/chromium",
+    ]))
+
+
+def get_firefox_binary():
+    """
+    Firefox binary to launch, or None to let Selenium use the default one.
+    """
+    return _resolve_once('firefox_binary', lambda: _first_existing([
+        os.environ.get("FIREFOX_BIN"),
+        "/usr/bin/firefox",
+        "/usr/bin/firefox-esr",
+        "/usr/lib/firefox/firefox",
+        "/usr/lib/firefox-esr/firefox-esr",
+    ]))
+
+
+def get_browser_version(binary):
+    """
+    Runs `<binary> --version` and returns the version number (e.g. '126.0.6478.126').
+
+    Returns:
+        str: Version found, or UNKNOWN_VERSION if the binary can not be probed
+    """
+    if not binary:
+        return UNKNOWN_VERSION
+    try:
+        output = subprocess.run([binary, '--version'], capture_output=True,
+                                text=True, timeout=10).stdout
+    except (OSError, subprocess.SubprocessError) as e:
+        logging.warning(f"Could not get version of {binary}: {e}")
+        return UNKNOWN_VERSION
+    match = re.search(r'\d+(\.\d+)+', output)
+    return match.group(0) if match else UNKNOWN_VERSION
+
+
+def get_chromedriver_path():
+    """
+    Path to a chromedriver matching the installed Chrome.
+
+    Inside Docker the packaged driver is used. Otherwise ChromeDriverManager
+    runs only when the on-disk manifest has no entry for the current Chrome
+    version, and the result is reused for the rest of the process.
+    """
+    def probe():
+        if os.getenv("DOCKERIZED") == "true":
+            return '/usr/bin/chromedriver'
+
+        chrome_binary = get_chrome_binary() or _first_existing([
+            shutil.which("google-chrome"),
+            shutil.which("google-chrome-stable"),
+        ])
+        version = get_browser_version(chrome_binary)
+        return _from_manifest('chromedriver', version, lambda: ChromeDriverManager().install())
+
+    return _resolve_once('chromedriver', probe)
+
+
+def get_geckodriver_path():
+    """
+    Path to geckodriver, or None to let Selenium Manager resolve it.
+    """
+    def probe():
+        version = get_browser_version(get_firefox_binary())
+        return _from_manifest('geckodriver', version, lambda: _first_existing([
+            '/usr/bin/geckodriver',
+            shutil.which('geckodriver'),
+        ]))
+
+    return _resolve_once('geckodriver', probe)
+
+
+def invalidate_driver_manifest(name=None):
+    """
+    Forgets resolved drivers so they are probed again.
+
+    Args:
+        name: 'chromedriver', 'geckodriver' or None to forget everything
+    """
+    with _lock:
+        manifest = _read_manifest()
+        if name is None:
+            _resolved.clear()
+            manifest = {}
+        else:
+            _resolved.pop(name, None)
+            manifest.pop(name, None)
+        _write_manifest(manifest)
+
+
+def _from_manifest(name, version, install):
+    if version == UNKNOWN_VERSION:
+        # Nothing to invalidate the entry with when the browser changes: resolved for this process only
+        logging.info(f"Resolving {name} without a known browser version")
+        return install()
+
+    manifest = _read_manifest()
+    entry = manifest.get(name, {}).get(version)
+    if entry and os.path.exists(entry['path']):
+        return entry['path']
+
+    logging.info(f"Resolving {name} for browser version {version}")
+    path = install()
+    if path:
+        manifest = _read_manifest()
+        manifest.setdefault(name, {})[version] = {'path': path}
+        _write_manifest(manifest)
+    return path
+
+
+def _read_manifest():
+    try:
+        with open(DRIVER_MANIFEST_PATH, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _write_manifest(manifest):
+    try:
+        os.makedirs(os.path.dirname(DRIVER_MANIFEST_PATH), exist_ok=True)
+        temp_path = f"{DRIVER_MANIFEST_PATH}.{os.getpid()}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, indent=2)
+        # Atomic so concurrent workers never read a half-written manifest
+        os.replace(temp_path, DRIVER_MANIFEST_PATH)
+    except OSError as e:
+        logging.warning(f"Could not write driver manifest: {e}")
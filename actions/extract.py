@@ -0,0 +1,151 @@
+import inspect
+import logging
+from actions.click_element import click_element
+from actions.page_helpers import page_helper
+from actions.search_element import search_element
+from actions.wait_until import wait_until
+from utils.config import EXTRACT_CHUNK_SIZE, EXTRACT_MAX_PAGES, PAGE_MAX_TIMEOUT
+from utils.error import messageError
+from utils.metrics import instrument
+
+
+def parse_schema(schema):
+    """
+    Convierte el esquema en la lista de campos del helper JavaScript.
+
+    Cada valor es un selector CSS relativo a la fila, opcionalmente con
+    '@atributo' al final. Sin atributo se lee el texto; '@html' lee el
+    innerHTML y un selector vacío lee la propia fila:
+
+        {'name': 'td.name', 'link': 'a@href', 'id': '@data-id'}
+
+    También se admite una tupla (selector, atributo).
+
+    Returns:
+        list: [[nombre, selector, atributo], ...]
+    """
+    fields = []
+    for name, spec in schema.items():
+        if isinstance(spec, (tuple, list)):
+            selector, attr = spec
+        elif '@' in spec:
+            selector, attr = spec.rsplit('@', 1)
+        else:
+            selector, attr = spec, None
+        fields.append([name, selector.strip(), attr or None])
+    return fields
+
+
+def iter_extract(driver, container_locator, schema, rows=None, chunk_size=EXTRACT_CHUNK_SIZE):
+    """
+    Igual que extract, pero devuelve las filas por bloques de `chunk_size`
+    (un execute_script por bloque) para no serializar un DOM muy grande en
+    una sola respuesta.
+
+    Yields:
+        list: Bloque de filas, cada una un dict {campo: valor}
+    """
+    logging.info(f"START || {inspect.currentframe().f_code.co_name} - Container: {container_locator}")
+    fields = parse_schema(schema)
+    container = search_element(driver, container_locator)
+
+    offset = 0
+    while True:
+        chunk = page_helper(driver, 'extract', container, rows, fields, offset, chunk_size)
+        if chunk is None:
+            raise messageError(f"Error {inspect.currentframe().f_code.co_name}: no rows returned for {container_locator}")
+        if chunk['rows']:
+            yield chunk['rows']
+        offset += len(chunk['rows'])
+        if not chunk['rows'] or offset >= chunk['total']:
+            return
+
+
+@instrument
+def extract(driver, container_locator, schema, rows=None, chunk_size=EXTRACT_CHUNK_SIZE):
+    """
+    Extrae datos estructurados de las filas de un contenedor (tabla, lista...)
+    con un execute_script por cada `chunk_size` filas, en lugar de un
+    get_attribute/.text por celda.
+
+    Args:
+        driver: WebDriver de Selenium
+        container_locator: Localizador del contenedor, p. ej. (By.CSS_SELECTOR, 'table tbody')
+        schema (dict): {campo: 'selector css[@atributo]'} (ver parse_schema)
+        rows: Selector CSS de las filas dentro del contenedor. None = hijos directos (default: None)
+        chunk_size: Filas por execute_script (default: EXTRACT_CHUNK_SIZE)
+
+    Returns:
+        list: Una entrada {campo: valor} por fila; None si el campo no existe en la fila
+
+    Raises:
+        messageError: Si no se encuentra el contenedor o falla el script
+    """
+    try:
+        return [row for chunk in iter_extract(driver, container_locator, schema, rows, chunk_size) for row in chunk]
+    except Exception as e:
+        raise messageError(
+            f"Error {inspect.currentframe().f_code.co_name}: {e}")
+
+
+def iter_pages(driver, container_locator, schema, next_locator, rows=None,
+               max_pages=EXTRACT_MAX_PAGES, chunk_size=EXTRACT_CHUNK_SIZE):
+    """
+    Recorre una tabla paginada: extrae la página actual, pulsa "siguiente" y
+    espera a que el contenido cambie. Termina cuando no hay botón siguiente,
+    la página no cambia o se alcanza `max_pages`.
+
+    Yields:
+        list: Filas de cada página
+    """
+    logging.info(f"START || {inspect.currentframe().f_code.co_name} - Next: {next_locator}")
+    fields = parse_schema(schema)
+    for page in range(max_pages):
+        page_rows = [row for chunk in iter_extract(driver, container_locator, schema, rows, chunk_size) for row in chunk]
+        yield page_rows
+
+        if page == max_pages - 1:
+            return
+        next_button = search_element(driver, next_locator, wait_to_search=False, raise_exception=False)
+        if next_button is None or not next_button.is_enabled():
+            return
+
+        before = _page_signature(driver, container_locator, rows, fields)
+        driver = click_element(driver, next_button, locator=next_locator)
+        # The container may be replaced while the next page loads: look it up on every check
+        changed = wait_until(
+            lambda: _page_signature(driver, container_locator, rows, fields) not in (None, before),
+            PAGE_MAX_TIMEOUT, ignored=(Exception,))
+        if not changed:
+            logging.warning(f"{inspect.currentframe().f_code.co_name}: page {page + 2} did not load, stopping")
+            return
+
+
+@instrument
+def extract_pages(driver, container_locator, schema, next_locator, rows=None,
+                  max_pages=EXTRACT_MAX_PAGES, chunk_size=EXTRACT_CHUNK_SIZE):
+    """
+    Extrae todas las páginas de una tabla paginada (ver iter_pages).
+
+    Args:
+        next_locator: Localizador del botón "siguiente página"
+        max_pages: Máximo de páginas a recorrer (default: EXTRACT_MAX_PAGES)
+
+    Returns:
+        list: Filas de todas las páginas, en orden
+    """
+    try:
+        return [row for page in iter_pages(driver, container_locator, schema, next_locator,
+                                           rows, max_pages, chunk_size) for row in page]
+    except Exception as e:
+        raise messageError(
+            f"Error {inspect.currentframe().f_code.co_name}: {e}")
+
+
+def _page_signature(driver, container_locator, rows, fields):
+    # Row count and first row: enough to tell two pages apart without reading them whole
+    container = search_element(driver, container_locator, wait_to_search=False, raise_exception=False)
+    if container is None:
+        return None
+    chunk = page_helper(driver, 'extract', container, rows, fields, 0, 1)
+    return chunk and (chunk['total'], chunk['rows'])
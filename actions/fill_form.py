@@ -0,0 +1,49 @@
+import inspect
+import logging
+from actions.page_helpers import page_helper
+from actions.search_element import search_element
+from actions.write_element import write_element
+from utils.error import messageError
+from utils.metrics import count_strategy, instrument
+
+
+@instrument
+def fill_form(driver, fields, clear=True):
+    """
+    Escribe varios campos de un formulario en un único execute_script.
+
+    Los campos que no se encuentran o cuyo valor no se verifica se escriben
+    uno a uno con search_element + write_element.
+
+    Args:
+        driver: WebDriver de Selenium
+        fields (dict): {locator: valor}, p. ej. {(By.ID, 'email'): 'user@example.com'}
+        clear: Si reemplazar el valor actual (True) o añadir al final (default: True)
+
+    Returns:
+        driver: WebDriver actualizado
+
+    Raises:
+        messageError: Si algún campo no se puede escribir
+    """
+    # Values are not logged: forms usually carry passwords
+    logging.info(f"START || {inspect.currentframe().f_code.co_name} - Fields: {list(fields)}")
+    try:
+        items = list(fields.items())
+        # Resolves, writes and verifies every field in one round-trip (window.__sq.fillForm)
+        statuses = page_helper(
+            driver, 'fillForm', [[by, value, str(text), clear] for (by, value), text in items])
+
+        for ((locator, text), status) in zip(items, statuses or [None] * len(items)):
+            if status == 'ok':
+                count_strategy('fill_form', 'batch')
+                continue
+            logging.info(f"fill_form: {locator} {status}, writing it with write_element")
+            element = search_element(driver, locator)
+            driver = write_element(driver, element, str(text), clear=clear)
+            count_strategy('fill_form', 'write_element')
+
+        return driver
+    except Exception as e:
+        raise messageError(
+            f"Error {inspect.currentframe().f_code.co_name}: {e}")
@@ -2,9 +2,11 @@ import inspect
 import logging
 from time import sleep
 from utils.error import messageError
+from utils.metrics import instrument
 from selenium.webdriver.common.action_chains import ActionChains
 
 
+@instrument
 def hover_element(driver, element, pause_time=0.5):
     logging.info(f"START || {inspect.currentframe().f_code.co_name} - Element: {element}")
     """
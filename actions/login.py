@@ -1,34 +1,82 @@
 import inspect
 from actions.click_element import click_element
-from actions.search_element import search_element
-from actions.write_element import write_element
+from actions.fill_form import fill_form
+from actions.reload_driver import reload_driver
+from actions.search_element import search_any, search_element
+from actions.session_store import clear_session, restore_session, save_session, session_store
 from utils.error import messageError
+from utils.metrics import instrument
 from selenium.webdriver.common.by import By
 import logging
 
 # The driver must have accessed the target url
 # TODO: Modify login for hacerlo coincide with the web site
+LOGIN_BUTTON_LOCATOR = (By.CSS_SELECTOR, '[data-testid="login-submit-button"]')
+# Element only shown to logged-in users: the probe that tells whether a saved session is still valid
+# TODO: Change it for the target web site
+LOGGED_IN_LOCATOR = (By.CSS_SELECTOR, '[data-testid="user-menu"]')
 
 
+@instrument
 def login(driver, username, password):
     logging.info(f"START || {inspect.currentframe().f_code.co_name}")
     try:
-        user_input = search_element(driver, (
-            By.CSS_SELECTOR, 'input[placeholder="Escriba su correo electrónico"]'
-        ))
-        driver = write_element(driver, user_input, username)
+        # Waiting for the button also waits for the form to be rendered
+        button_input = search_element(driver, LOGIN_BUTTON_LOCATOR)
 
-        password_input = search_element(driver, (
-            By.CSS_SELECTOR, 'input[type="password"][placeholder="Escriba su contraseña"]'
-        ))
-        driver = write_element(driver, password_input, password)
+        # Both fields are written and verified in a single browser round-trip
+        driver = fill_form(driver, {
+            (By.CSS_SELECTOR, 'input[placeholder="Escriba su correo electrónico"]'): username,
+            (By.CSS_SELECTOR, 'input[type="password"][placeholder="Escriba su contraseña"]'): password,
+        })
 
-        button_input = search_element(driver, (
-            By.CSS_SELECTOR, '[data-testid="login-submit-button"]'
-        ))
-        driver = click_element(driver, button_input)
+        driver = click_element(driver, button_input, locator=LOGIN_BUTTON_LOCATOR)
 
         return driver
     except Exception as e:
         raise messageError(
             f"Error {inspect.currentframe().f_code.co_name}: {e}")
+
+
+@instrument
+def cached_login(driver, username, password, site=None):
+    """
+    login() que reutiliza la sesión guardada (cookies y localStorage) de
+    `username` en el sitio mientras siga siendo válida (actions/session_store.py).
+
+    Con una sesión guardada se carga en el driver, se recarga la página y una
+    sola espera comprueba qué aparece antes: LOGGED_IN_LOCATOR (sesión válida)
+    o el botón de login (caducada). Solo en ese caso, o sin sesión guardada,
+    se hace el login completo, y la sesión nueva se guarda al confirmarlo.
+
+    Args:
+        driver: WebDriver de Selenium en una página del sitio
+        username: Usuario
+        password: Contraseña
+        site: Clave del sitio en el almacén (default: el host de la página actual)
+
+    Returns:
+        driver: WebDriver con la sesión iniciada
+    """
+    logging.info(f"START || {inspect.currentframe().f_code.co_name}")
+    try:
+        if restore_session(driver, site, username):
+            driver = reload_driver(driver)
+            _, locator = search_any(driver, [LOGGED_IN_LOCATOR, LOGIN_BUTTON_LOCATOR], raise_exception=False)
+            if locator == LOGGED_IN_LOCATOR:
+                session_store.count_lookup('hit')
+                logging.info("Saved session reused, login skipped")
+                return driver
+            session_store.count_lookup('invalid')
+            logging.info("Saved session rejected by the site, logging in")
+            clear_session(driver, site, username)
+            driver = reload_driver(driver)
+
+        driver = login(driver, username, password)
+        # Saved only once the site shows the user as logged in
+        search_element(driver, LOGGED_IN_LOCATOR)
+        save_session(driver, site, username)
+        return driver
+    except Exception as e:
+        raise messageError(
+            f"Error {inspect.currentframe().f_code.co_name}: {e}")
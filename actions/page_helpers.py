@@ -0,0 +1,246 @@
+import logging
+
+# Page-side helper library shared by the actions. It is installed once per
+# document, so each call only sends a one-line script over the WebDriver wire:
+#   - Chrome: registered with CDP Page.addScriptToEvaluateOnNewDocument when the
+#     driver is created (install_page_helpers), so every new page has it.
+#   - Other browsers: injected by page_helper() the first time a page lacks it.
+PAGE_HELPERS_JS = """
+(function() {
+    if (window.__sq) return;
+
+    var RESTRICTIVE_CLASSES = [
+        'disabled', 'readonly', 'not-allowed', 'pointer-events-none',
+        'dp__input_readonly', 'dp__pointer', 'dp__disabled'
+    ];
+
+    function removeRestrictions(node) {
+        node.removeAttribute('disabled');
+        node.disabled = false;
+        RESTRICTIVE_CLASSES.forEach(function(className) {
+            node.classList.remove(className);
+        });
+    }
+
+    function nativeSetValue(element, value) {
+        var proto = element instanceof HTMLTextAreaElement ? HTMLTextAreaElement.prototype :
+            element instanceof HTMLSelectElement ? HTMLSelectElement.prototype :
+            element instanceof HTMLInputElement ? HTMLInputElement.prototype : null;
+        var descriptor = proto && Object.getOwnPropertyDescriptor(proto, 'value');
+        if (descriptor && descriptor.set) {
+            // Native setter so React/Vue inputs notice the change
+            descriptor.set.call(element, value);
+        } else {
+            element.value = value;
+        }
+    }
+
+    function find(by, value) {
+        switch (by) {
+            case 'css selector': return document.querySelector(value);
+            case 'id': return document.getElementById(value);
+            case 'name': return document.getElementsByName(value)[0] || null;
+            case 'class name': return document.getElementsByClassName(value)[0] || null;
+            case 'tag name': return document.getElementsByTagName(value)[0] || null;
+            case 'xpath':
+                return document.evaluate(value, document, null,
+                    XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+        }
+        return undefined;
+    }
+
+    // attr: null for the text, 'html' for innerHTML, otherwise an attribute
+    // (href/src are read as properties so they come back as absolute URLs)
+    function readField(node, attr) {
+        if (!attr) return (node.textContent || '').replace(/\\s+/g, ' ').trim();
+        if (attr === 'html') return node.innerHTML;
+        if ((attr === 'href' || attr === 'src') && typeof node[attr] === 'string') return node[attr];
+        return node.getAttribute(attr);
+    }
+
+    var helpers = {
+        // Removes attributes, classes and styles that block interaction
+        // from the element and up to 5 parent containers
+        enable: function(element) {
+            try {
+                removeRestrictions(element);
+                element.removeAttribute('readonly');
+                element.readOnly = false;
+
+                element.style.pointerEvents = 'auto';
+                element.style.cursor = 'auto';
+                element.style.opacity = '1';
+                element.style.visibility = 'visible';
+                element.style.display = 'block';
+
+                // Si es un input, asegurar que sea de tipo text
+                if (element.tagName.toLowerCase() === 'input') {
+                    if (element.getAttribute('inputmode') === 'none') {
+                        element.setAttribute('inputmode', 'text');
+                    }
+                    if (!element.type || element.type === 'hidden') {
+                        element.setAttribute('type', 'text');
+                    }
+                }
+
+                var parent = element.parentElement;
+                for (var levels = 0; parent && levels < 5; levels++) {
+                    removeRestrictions(parent);
+                    parent.style.pointerEvents = 'auto';
+                    parent = parent.parentElement;
+                }
+                return true;
+            } catch (error) {
+                console.error('Error habilitando elemento:', error);
+                return false;
+            }
+        },
+
+        scrollCenter: function(element, smooth) {
+            element.scrollIntoView({
+                behavior: smooth ? 'smooth' : 'auto',
+                block: 'center',
+                inline: 'center'
+            });
+            return true;
+        },
+
+        // [top, left, inViewport] of the element
+        rect: function(element) {
+            var r = element.getBoundingClientRect();
+            var inView = r.bottom > 0 && r.right > 0 &&
+                r.top < (window.innerHeight || document.documentElement.clientHeight) &&
+                r.left < (window.innerWidth || document.documentElement.clientWidth);
+            return [r.top, r.left, inView];
+        },
+
+        click: function(element) {
+            element.click();
+            return true;
+        },
+
+        focus: function(element) {
+            element.focus();
+            return document.activeElement === element;
+        },
+
+        isFocused: function(element) {
+            return document.activeElement === element;
+        },
+
+        // Sets the value and dispatches input/change/keyup/blur (unless events === false)
+        setValue: function(element, text, events) {
+            nativeSetValue(element, text);
+            if (events !== false) {
+                ['input', 'change', 'keyup', 'blur'].forEach(function(eventType) {
+                    element.dispatchEvent(new Event(eventType, { bubbles: true, cancelable: true }));
+                });
+            }
+            return element.value;
+        },
+
+        // fields: [[by, locator, text, clear], ...]
+        // Returns one status per field: 'ok', 'missing', 'unsupported' or 'unverified'
+        fillForm: function(fields) {
+            return fields.map(function(field) {
+                var by = field[0], locator = field[1], text = field[2], clear = field[3];
+                var element;
+                try {
+                    element = find(by, locator);
+                } catch (error) {
+                    return 'missing';
+                }
+                if (element === undefined) return 'unsupported';
+                if (!element || element.disabled || element.readOnly || !('value' in element)) return 'missing';
+
+                element.focus();
+                var value = helpers.setValue(element, clear ? text : element.value + text);
+                return String(value).indexOf(text) !== -1 ? 'ok' : 'unverified';
+            });
+        },
+
+        // Serializes rows [offset, offset + limit) of the container.
+        // fields: [[name, selector, attr], ...]; an empty selector reads the row itself
+        // Returns {total: rows in the container, rows: [{name: value, ...}, ...]}
+        extract: function(container, rowSelector, fields, offset, limit) {
+            var rows = rowSelector ? container.querySelectorAll(rowSelector) : container.children;
+            var end = Math.min(rows.length, offset + limit);
+            var result = [];
+            for (var i = offset; i < end; i++) {
+                var item = {};
+                for (var f = 0; f < fields.length; f++) {
+                    var node = fields[f][1] ? rows[i].querySelector(fields[f][1]) : rows[i];
+                    item[fields[f][0]] = node ? readField(node, fields[f][2]) : null;
+                }
+                result.push(item);
+            }
+            return { total: rows.length, rows: result };
+        }
+    };
+
+    // Not enumerable, so page scripts listing window properties do not see it
+    Object.defineProperty(window, '__sq', { value: helpers, enumerable: false });
+})();
+"""
+
+# Returned by the call script when the current document has no helpers yet
+_MISSING = '__sq_missing__'
+_call_scripts = {}
+
+
+def install_page_helpers(driver):
+    """
+    Registers the helper library for every document the driver opens from now
+    on (Chrome DevTools Protocol). Browsers without CDP get it on first use.
+
+    Returns:
+        bool: True if it was registered through CDP
+    """
+    try:
+        driver.execute_cdp_cmd('Page.addScriptToEvaluateOnNewDocument', {'source': PAGE_HELPERS_JS})
+        return True
+    except Exception as e:
+        logging.debug(f"Page helpers will be injected on demand: {e}")
+        return False
+
+
+def page_helper(driver, name, *args):
+    """
+    Calls `window.__sq.<name>(*args)` in the current page, injecting the
+    library first if the page does not have it.
+
+    Example:
+        page_helper(driver, 'scrollCenter', element, True)
+    """
+    script = _call_scripts.get(name)
+    if script is None:
+        script = _call_scripts[name] = (
+            f"return window.__sq ? window.__sq.{name}.apply(null, arguments) : '{_MISSING}';")
+    result = driver.execute_script(script, *args)
+    if result == _MISSING:
+        result = driver.execute_script(
+            f"{PAGE_HELPERS_JS}\nreturn window.__sq.{name}.apply(null, arguments);", *args)
+    return result
+
+
+def make_element_interactable(driver, element):
+    """
+    Intenta hacer un elemento interactuable removiendo restricciones comunes
+
+    Args:
+        driver: WebDriver de Selenium
+        element: Elemento web a hacer interactuable
+
+    Returns:
+        bool: True si el elemento fue habilitado exitosamente
+    """
+    try:
+        if page_helper(driver, 'enable', element):
+            return True
+        else:
+            logging.warning("No se pudo habilitar el elemento")
+            return False
+
+    except Exception as e:
+        logging.error(f"Error en make_element_interactable: {e}")
+        return False
@@ -0,0 +1,194 @@
+import json
+import logging
+import time
+from actions.wait_until import wait_until
+from utils.config import NETWORK_IDLE_TIME, PAGE_MAX_TIMEOUT
+from utils.error import messageError
+from selenium.common.exceptions import WebDriverException
+
+PAGE_LOAD_STRATEGIES = ('normal', 'eager', 'none')
+
+# Readiness implied by each page load strategy when a page is reloaded with JavaScript
+# (window.location.reload() returns at once, whatever the strategy of the driver)
+STRATEGY_READINESS = {'normal': 'load', 'eager': 'domcontentloaded', 'none': None}
+
+# A readiness condition is a factory: it is called with the driver *before* the
+# navigation starts (to take a snapshot, e.g. drain the network log) and returns
+# a function without arguments that is polled afterwards until it is truthy.
+
+
+def dom_content_loaded():
+    """
+    The HTML has been parsed (DOMContentLoaded), images and iframes may still load.
+    """
+    def prepare(driver):
+        return lambda: driver.execute_script('return document.readyState') in ('interactive', 'complete')
+    return prepare
+
+
+def page_loaded():
+    """
+    The load event has fired (same as pageLoadStrategy 'normal').
+    """
+    def prepare(driver):
+        return lambda: driver.execute_script('return document.readyState') == 'complete'
+    return prepare
+
+
+def element_present(locator):
+    """
+    At least one element matches `locator`, e.g. (By.CSS_SELECTOR, 'table tbody tr').
+    """
+    def prepare(driver):
+        return lambda: bool(driver.find_elements(*locator))
+    return prepare
+
+
+def network_idle(idle_time=NETWORK_IDLE_TIME, max_inflight=0):
+    """
+    No more than `max_inflight` requests pending for `idle_time` seconds.
+
+    In-flight requests are followed through the CDP Network events of the
+    Chrome performance log (NETWORK_IDLE_CDP=True, off by default because
+    Chrome buffers every event for the life of the driver). Without it
+    (Firefox, or the log disabled) the page counts as idle when it has loaded
+    and no resource has finished downloading for `idle_time` seconds.
+    """
+    def prepare(driver):
+        tracker = NetworkTracker(driver)
+        quiet_since = []
+
+        def condition():
+            if tracker.available:
+                busy = tracker.inflight() > max_inflight
+            else:
+                busy = not tracker.resources_settled()
+            now = time.monotonic()
+            if busy:
+                quiet_since[:] = []
+                return False
+            if not quiet_since:
+                quiet_since.append(now)
+            return now - quiet_since[0] >= idle_time
+
+        return condition
+    return prepare
+
+
+class NetworkTracker:
+    """
+    Pending requests of a driver, read from the CDP events of its performance
+    log. Creating it discards the events logged so far.
+    """
+
+    def __init__(self, driver):
+        self.driver = driver
+        self.pending = set()
+        self.available = self._read() is not None
+        self._resources = None
+
+    def _read(self):
+        try:
+            return self.driver.get_log('performance')
+        except Exception:
+            return None
+
+    def inflight(self):
+        for entry in self._read() or []:
+            try:
+                message = json.loads(entry['message'])['message']
+            except (KeyError, TypeError, ValueError):
+                continue
+            method = message.get('method')
+            request_id = message.get('params', {}).get('requestId')
+            if method == 'Network.requestWillBeSent':
+                self.pending.add(request_id)
+            elif method in ('Network.loadingFinished', 'Network.loadingFailed'):
+                self.pending.discard(request_id)
+        return len(self.pending)
+
+    def resources_settled(self):
+        # Fallback: the page has loaded and the number of finished resources did not change
+        state = self.driver.execute_script(
+            "return [document.readyState, performance.getEntriesByType('resource').length];")
+        settled = state[0] == 'complete' and state == self._resources
+        self._resources = state
+        return settled
+
+
+READINESS = {
+    'domcontentloaded': dom_content_loaded,
+    'load': page_loaded,
+    'networkidle': network_idle,
+}
+
+
+def readiness_conditions(ready):
+    """
+    Normalizes a readiness spec into condition factories:
+    None, 'domcontentloaded', 'load', 'networkidle', a locator tuple,
+    a factory (see above) or a list of any of them (all must hold).
+    """
+    if ready is None:
+        return []
+    if isinstance(ready, list):
+        return [factory for item in ready for factory in readiness_conditions(item)]
+    if isinstance(ready, str):
+        if ready not in READINESS:
+            raise messageError(f"Unknown readiness '{ready}'. Available: {', '.join(READINESS)}")
+        return [READINESS[ready]()]
+    if isinstance(ready, tuple):
+        return [element_present(ready)]
+    if callable(ready):
+        return [ready]
+    raise messageError(f"Invalid readiness condition: {ready!r}")
+
+
+def navigate(driver, go, ready=None, timeout=PAGE_MAX_TIMEOUT, new_document=None):
+    """
+    Runs the navigation `go()` and waits until the new page satisfies `ready`.
+
+    Args:
+        driver: WebDriver de Selenium
+        go: Function that starts the navigation (driver.get, a reload...)
+        ready: Readiness spec (see readiness_conditions)
+        timeout: Maximum seconds to wait for the conditions
+        new_document: Also wait until the document has been replaced. Needed
+            when `go` returns before the navigation commits (JavaScript reloads,
+            pageLoadStrategy 'none'). Default: only with pageLoadStrategy 'none'
+
+    Raises:
+        messageError: If the page is not ready within `timeout`
+    """
+    if new_document is None:
+        new_document = page_load_strategy(driver) == 'none'
+    before = _document_origin(driver) if new_document else None
+    conditions = [factory(driver) for factory in readiness_conditions(ready)]
+
+    go()
+
+    if not conditions and not new_document:
+        return driver
+    ready_now = wait_until(
+        lambda: (not new_document or _document_origin(driver) not in (None, before))
+        and all(condition() for condition in conditions),
+        timeout, ignored=(WebDriverException,))
+    if not ready_now:
+        raise messageError(f"Page not ready after {timeout}s (readiness: {ready})")
+    return driver
+
+
+def page_load_strategy(driver):
+    try:
+        return driver.capabilities.get('pageLoadStrategy') or 'normal'
+    except Exception:
+        return 'normal'
+
+
+def _document_origin(driver):
+    # Different for every document, including reloads of the same URL
+    try:
+        return driver.execute_script('return performance.timeOrigin;')
+    except WebDriverException as e:
+        logging.debug(f"Document not available yet: {e}")
+        return None
@@ -0,0 +1,180 @@
+import hashlib
+import importlib.util
+import inspect
+import logging
+import threading
+from collections import OrderedDict
+from urllib.parse import urljoin
+from bs4 import BeautifulSoup
+from actions.extract import parse_schema
+from selenium.webdriver.common.by import By
+from utils.config import PARSE_CACHE_SIZE
+from utils.error import messageError
+from utils.metrics import instrument, register_metrics_collector
+
+# lxml is several times faster than the standard library parser; it is optional
+HTML_PARSER = 'lxml' if importlib.util.find_spec('lxml') is not None else 'html.parser'
+
+
+class SoupCache:
+    """
+    Parsed documents keyed by a hash of their HTML, so the same page source
+    is parsed once however many selectors run on it. LRU, at most
+    `max_entries` documents.
+
+    The documents are shared: callers must not modify them.
+    """
+
+    def __init__(self, max_entries=PARSE_CACHE_SIZE):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, html):
+        key = hashlib.blake2b(html.encode('utf-8', 'surrogatepass'), digest_size=16).digest()
+        with self._lock:
+            soup = self._entries.get(key)
+            if soup is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return soup
+            self.misses += 1
+
+        # Parsed outside the lock: two threads may parse the same page once each
+        soup = BeautifulSoup(html, HTML_PARSER)
+        with self._lock:
+            self._entries[key] = soup
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return soup
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
+
+    def metrics(self):
+        with self._lock:
+            hits, misses, entries = self.hits, self.misses, len(self._entries)
+        return [
+            ('scraper_soup_cache_lookups_total', 'counter',
+             'Parsed page lookups by result (hit, miss).',
+             [({'result': 'hit'}, hits), ({'result': 'miss'}, misses)]),
+            ('scraper_soup_cache_entries', 'gauge', 'Parsed pages in the cache.',
+             [({}, entries)]),
+        ]
+
+
+soup_cache = SoupCache()
+register_metrics_collector('soup_cache', soup_cache.metrics)
+
+
+def parse_html(html):
+    """
+    BeautifulSoup document of `html` (cached by content hash).
+    """
+    return soup_cache.get(html)
+
+
+@instrument
+def page_soup(driver):
+    """
+    Descarga driver.page_source una sola vez y la devuelve parseada, para
+    ejecutar selectores en Python sin más llamadas al WebDriver.
+
+    Útil solo para lectura: el documento es una copia del DOM en ese momento.
+    """
+    logging.info(f"START || {inspect.currentframe().f_code.co_name}")
+    try:
+        return parse_html(driver.page_source)
+    except Exception as e:
+        raise messageError(
+            f"Error {inspect.currentframe().f_code.co_name}: {e}")
+
+
+def select_locator(soup, locator):
+    """
+    Elementos del documento que coinciden con un localizador de Selenium.
+    XPath no está soportado (BeautifulSoup solo entiende selectores CSS).
+    """
+    by, value = locator
+    if by == By.CSS_SELECTOR:
+        return soup.select(value)
+    if by == By.ID:
+        return soup.find_all(id=value)
+    if by == By.NAME:
+        return soup.find_all(attrs={'name': value})
+    if by == By.CLASS_NAME:
+        return soup.find_all(class_=value)
+    if by == By.TAG_NAME:
+        return soup.find_all(value)
+    if by in (By.LINK_TEXT, By.PARTIAL_LINK_TEXT):
+        exact = by == By.LINK_TEXT
+        return [a for a in soup.find_all('a', href=True)
+                if (a.get_text(strip=True) == value if exact else value in a.get_text())]
+    raise messageError(f"Locator {by} is not supported in page source mode, use a CSS selector")
+
+
+def extract_html(soup, container_locator, schema, rows=None, base_url=None):
+    """
+    Versión en Python de extract() sobre un documento ya parseado. Devuelve el
+    mismo formato: una entrada {campo: valor} por fila.
+
+    Args:
+        soup: Documento de parse_html/page_soup
+        container_locator: Localizador del contenedor (CSS, id, name, clase, etiqueta)
+        schema (dict): {campo: 'selector css[@atributo]'} (ver parse_schema)
+        rows: Selector CSS de las filas dentro del contenedor. None = hijos directos
+        base_url: URL de la página, para devolver href/src absolutos como extract()
+    """
+    containers = select_locator(soup, container_locator)
+    if not containers:
+        raise messageError(f"Container {container_locator} not found in page source")
+    container = containers[0]
+
+    fields = parse_schema(schema)
+    row_nodes = container.select(rows) if rows else container.find_all(recursive=False)
+    result = []
+    for row in row_nodes:
+        item = {}
+        for name, selector, attr in fields:
+            node = row.select_one(selector) if selector else row
+            item[name] = _read_field(node, attr, base_url) if node is not None else None
+        result.append(item)
+    return result
+
+
+@instrument
+def extract_source(driver, container_locator, schema, rows=None):
+    """
+    Igual que extract(), pero leyendo driver.page_source una vez y resolviendo
+    los selectores en Python. Para páginas de solo lectura sin contenido que
+    dependa de la interacción.
+
+    Returns:
+        list: Una entrada {campo: valor} por fila
+    """
+    try:
+        return extract_html(page_soup(driver), container_locator, schema, rows, driver.current_url)
+    except Exception as e:
+        raise messageError(
+            f"Error {inspect.currentframe().f_code.co_name}: {e}")
+
+
+def _read_field(node, attr, base_url):
+    # Same rules as readField in page_helpers.py
+    if not attr:
+        return ' '.join(node.get_text().split())
+    if attr == 'html':
+        return node.decode_contents()
+    value = node.get(attr)
+    if isinstance(value, list):
+        value = ' '.join(value)
+    if attr in ('href', 'src') and value is not None and base_url:
+        return urljoin(base_url, value)
+    return value
@@ -1,14 +1,28 @@
 import inspect
 import logging
 import time
-from utils.config import PAGE_MAX_TIMEOUT
+from actions.page_ready import STRATEGY_READINESS, navigate, page_load_strategy as driver_page_load_strategy
 from utils.error import messageError
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
+from utils.metrics import instrument
 from selenium.webdriver.support import expected_conditions as EC
 
 
-def reload_driver(driver):
+@instrument
+def reload_driver(driver, page_load_strategy=None, ready=None):
+    """
+    Recarga la página actual aceptando diálogos beforeunload/alert.
+
+    Args:
+        driver: WebDriver de Selenium
+        page_load_strategy: Hasta cuándo esperar, como en get_page: 'normal' (evento
+            load), 'eager' (DOMContentLoaded) o 'none' (solo el documento nuevo).
+            Default: la estrategia con la que se creó el driver
+        ready: Condición de disponibilidad adicional ('networkidle', un localizador...,
+            ver actions/page_ready.py). Si se indica, sustituye a la de la estrategia
+
+    Returns:
+        driver: WebDriver actualizado
+    """
     logging.info(f"START || {inspect.currentframe().f_code.co_name}")
     try:
         logging.info("Recargando la página...")
@@ -16,29 +30,25 @@ def reload_driver(driver):
         # Primero, deshabilitar cualquier evento beforeunload que dispara el diálogo
         logging.info("Deshabilitando eventos beforeunload...")
         driver.execute_script("window.onbeforeunload = null;")
-        time.sleep(0.2)
 
-        # Manejar cualquier alerta ya abierta
+        # Manejar cualquier alerta ya abierta (comprobación inmediata, sin esperar)
         try:
-            alert = WebDriverWait(driver, 1).until(EC.alert_is_present())
-            logging.info("Alert detected, accepting it...")
-            alert.accept()
-            time.sleep(0.5)
+            alert = EC.alert_is_present()(driver)
+            if alert:
+                logging.info("Alert detected, accepting it...")
+                alert.accept()
+                time.sleep(0.5)
         except Exception:
             # No hay alerta nativa, continuar
             pass
 
-        # Usar JavaScript para recargar la página
+        # Usar JavaScript para recargar la página. Vuelve enseguida, así que se espera
+        # a que el documento sea otro (el anterior ya estaba 'complete') y a que esté listo
         logging.info("Ejecutando recarga vía JavaScript...")
-        driver.execute_script("window.location.reload();")
-
-        # Esperar a que la página esté completamente cargada
-        wait = WebDriverWait(driver, PAGE_MAX_TIMEOUT)
-        wait.until(lambda d: d.execute_script(
-            'return document.readyState') == 'complete')
-
-        # Pequeño delay adicional para Docker/headless mode
-        time.sleep(0.5)
+        if ready is None:
+            ready = STRATEGY_READINESS[page_load_strategy or driver_page_load_strategy(driver)]
+        navigate(driver, lambda: driver.execute_script("window.location.reload();"),
+                 ready, new_document=True)
 
         logging.info("Página recargada exitosamente")
     
@@ -4,23 +4,23 @@ from actions.click_element import click_element
 from actions.search_element import search_element
 from utils.config import STAGE
 from utils.error import messageError
+from utils.metrics import instrument
 from selenium.webdriver.common.by import By
 
 
+@instrument
 def sample_action(driver):
     logging.info(f"START || {inspect.currentframe().f_code.co_name}")
     try:
-        accept_button = search_element(driver, (
-            By.XPATH, "//span[text()='Accept']"
-        ))
-        driver = click_element(driver, accept_button)
+        accept_locator = (By.XPATH, "//span[text()='Accept']")
+        accept_button = search_element(driver, accept_locator)
+        driver = click_element(driver, accept_button, locator=accept_locator)
 
         # Sample action of production action
         if STAGE == "production" or STAGE == "testing":
-            send_button = search_element(driver, (
-                By.XPATH, "//span[text()='Delete']"
-            ))
-            driver = click_element(driver, send_button)
+            send_locator = (By.XPATH, "//span[text()='Delete']")
+            send_button = search_element(driver, send_locator)
+            driver = click_element(driver, send_button, locator=send_locator)
         else:
             logging.info(
                 '- Skipping access send button')
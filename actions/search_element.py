@@ -1,19 +1,23 @@
-import inspect
 import logging
+import sys
 from actions.web_driver import get_wait
 from utils.error import messageError
+from utils.metrics import instrument
+from selenium.common.exceptions import NoSuchElementException, StaleElementReferenceException
 from selenium.webdriver.support import expected_conditions
 
 # This function searches for an element on the page, scrolls to it, and click to it.
 
 
+@instrument
 def search_element(driver, locator, wait_to_search=True, raise_exception=True):
-    logging.info(f"START || {inspect.currentframe().f_code.co_name} - Locator: {locator}")
+    # Lazy %-formatting: the message is only built if INFO is enabled
+    logging.info("START || search_element - Locator: %s", locator)
     # locator  example: driver, (By.XPATH, "//span[contains(@class, 'x-menu-item-text') and contains(text(), '{}')]".format(xpath))
-    
-    wait = get_wait(driver)
+
     try:
         if wait_to_search:
+            wait = get_wait(driver)
             element = wait.until(lambda d:
                         # expected_conditions.presence_of_element_located(locator)(d) or
                         expected_conditions.element_to_be_clickable(locator)(d) or
@@ -26,11 +30,71 @@ def search_element(driver, locator, wait_to_search=True, raise_exception=True):
     except Exception as e:
         if raise_exception:
             # Get information from the function that called Search_element
-            caller = inspect.stack()[1]
+            caller = _caller_frame()
             error_message = (
-                f"Error in function '{caller.function}' at {caller.filename}:{caller.lineno} - "
+                f"Error in function '{caller.f_code.co_name}' at {caller.f_code.co_filename}:{caller.f_lineno} - "
                 f"Failed to locate element {locator}: {str(e)}"
             )
             raise messageError(error_message)
         else:
-            pass
+            logging.debug("Element %s not found: %s", locator, e)
+
+
+def _caller_frame():
+    """
+    Frame of the function that called search_element/search_any, skipping
+    the @instrument wrapper. Unlike inspect.stack() it reads no source code and
+    does not build frame info objects for the whole stack.
+    """
+    frame = sys._getframe(2)  # 0: _caller_frame, 1: search_element
+    # By module, not by file: co_filename and __file__ differ in the pyc-only Docker image
+    while frame.f_back is not None and frame.f_globals.get('__name__') == instrument.__module__:
+        frame = frame.f_back
+    return frame
+
+
+@instrument
+def search_any(driver, locators, raise_exception=True):
+    """
+    Busca varios localizadores alternativos a la vez y devuelve el primero que
+    aparece. Todos se comprueban en cada sondeo de un único WebDriverWait, así
+    que el peor caso es PAGE_MAX_TIMEOUT y no N × PAGE_MAX_TIMEOUT.
+
+    Si en un mismo sondeo aparecen varios, gana el que va antes en la lista.
+
+    Args:
+        driver: WebDriver de Selenium
+        locators (list): Localizadores en orden de preferencia,
+            p. ej. [(By.ID, 'submit'), (By.XPATH, "//button[@type='submit']")]
+        raise_exception: Si lanzar messageError cuando ninguno aparece (default: True)
+
+    Returns:
+        tuple: (elemento, localizador que lo encontró), o (None, None) si no se
+            encontró ninguno y raise_exception es False
+    """
+    logging.info("START || search_any - Locators: %s", locators)
+    locators = list(locators)
+
+    def first_match(d):
+        for locator in locators:
+            try:
+                element = (expected_conditions.element_to_be_clickable(locator)(d) or
+                           expected_conditions.visibility_of_element_located(locator)(d))
+            except (NoSuchElementException, StaleElementReferenceException):
+                continue
+            if element:
+                return element, locator
+        return False
+
+    try:
+        return get_wait(driver).until(first_match)
+    except Exception as e:
+        if raise_exception:
+            caller = _caller_frame()
+            error_message = (
+                f"Error in function '{caller.f_code.co_name}' at {caller.f_code.co_filename}:{caller.f_lineno} - "
+                f"Failed to locate any of {locators}: {str(e)}"
+            )
+            raise messageError(error_message)
+        logging.debug("None of %s found: %s", locators, e)
+        return None, None
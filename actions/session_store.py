@@ -0,0 +1,269 @@
+import base64
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from urllib.parse import urlparse
+from utils.config import SESSION_MAX_ENTRIES, SESSION_STORE_KEY, SESSION_STORE_PATH, SESSION_TTL
+from utils.metrics import register_metrics_collector
+
+try:
+    from cryptography.fernet import Fernet, InvalidToken
+except ImportError:  # Optional: without it sessions are only kept in memory
+    Fernet = None
+    InvalidToken = ValueError
+
+_KEY_SALT = b'selenium-scraper-session-store'
+
+# Every key of the page's localStorage, restored with the cookies
+_READ_STORAGE_JS = """
+var items = {};
+for (var i = 0; i < window.localStorage.length; i++) {
+    var key = window.localStorage.key(i);
+    items[key] = window.localStorage.getItem(key);
+}
+return {origin: window.location.origin, items: items};
+"""
+_WRITE_STORAGE_JS = """
+var items = arguments[0];
+Object.keys(items).forEach(function(key) { window.localStorage.setItem(key, items[key]); });
+"""
+
+
+class SessionStore:
+    """
+    Logged-in sessions (cookies and localStorage) by site and username, so
+    a login can be skipped while the site still accepts them.
+
+    Entries expire `ttl` seconds after they were saved and at most
+    `max_entries` are kept (LRU). With a `path` every entry is also written
+    there, encrypted with Fernet (cryptography), so the sessions survive
+    restarts and are shared by the gunicorn workers. Without a `key` or
+    without cryptography installed nothing is written to disk.
+
+    Args:
+        path (str): Directory of the encrypted entries, or None to keep them in memory
+        ttl (int): Seconds a saved session is trusted
+        max_entries (int): Maximum (site, username) sessions kept
+        key (str): Secret the encryption key is derived from (required to use `path`)
+    """
+
+    def __init__(self, path=None, ttl=SESSION_TTL, max_entries=SESSION_MAX_ENTRIES, key=None):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        # 'miss' (nothing saved), 'expired' (older than ttl), 'hit' / 'invalid' (accepted / rejected by the site)
+        self.lookups = {'hit': 0, 'miss': 0, 'expired': 0, 'invalid': 0}
+        self._fernet = None
+        self.path = None
+        if path and not key:
+            # A default key would be public: cookies on disk must not be readable with it
+            logging.warning("SESSION_STORE_KEY is not set: sessions are only kept in memory")
+        elif path and Fernet is None:
+            logging.warning("cryptography is not installed: sessions are only kept in memory")
+        elif path:
+            self.path = os.path.abspath(path)
+            self._fernet = Fernet(base64.urlsafe_b64encode(
+                hashlib.pbkdf2_hmac('sha256', key.encode(), _KEY_SALT, 100000)))
+
+    def get(self, site, username):
+        """
+        Saved session of `username` in `site`, or None if there is none or it expired.
+        """
+        key = (site, username)
+        with self._lock:
+            entry = self._entries.get(key) or self._read(key)
+            if entry is None:
+                self.lookups['miss'] += 1
+                return None
+            if time.time() - entry['saved_at'] >= self.ttl:
+                self._remove(key)
+                self.lookups['expired'] += 1
+                return None
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            self._evict()
+            if self.path is not None:
+                # Recently used on disk too, for the LRU of _evict_files
+                try:
+                    os.utime(self._file(key))
+                except OSError:
+                    pass
+            return entry
+
+    def put(self, site, username, cookies, local_storage=None, origin=None):
+        entry = {'cookies': cookies, 'local_storage': local_storage or {}, 'origin': origin,
+                 'saved_at': time.time()}
+        key = (site, username)
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            self._write(key, entry)
+            self._evict()
+            self._evict_files()
+        return entry
+
+    def forget(self, site, username):
+        with self._lock:
+            self._remove((site, username))
+
+    def count_lookup(self, result):
+        with self._lock:
+            self.lookups[result] += 1
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
+
+    def metrics(self):
+        with self._lock:
+            lookups = dict(self.lookups)
+            entries = len(self._entries)
+        return [
+            ('scraper_session_store_lookups_total', 'counter',
+             'Saved session lookups by result (hit, miss, expired, invalid).',
+             [({'result': result}, count) for result, count in lookups.items()]),
+            ('scraper_session_store_entries', 'gauge', 'Sessions kept in memory by this process.',
+             [({}, entries)]),
+        ]
+
+    # Called with the lock held from here on
+
+    def _file(self, key):
+        # The site and username are only stored encrypted, not in the file name
+        return os.path.join(self.path, hashlib.sha256('\0'.join(key).encode()).hexdigest() + '.session')
+
+    def _read(self, key):
+        if self.path is None:
+            return None
+        try:
+            with open(self._file(key), 'rb') as f:
+                token = f.read()
+            entry = json.loads(self._fernet.decrypt(token))
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, InvalidToken) as e:
+            # Written with another key or damaged
+            logging.info(f"Discarding saved session: {e.__class__.__name__}")
+            self._remove(key)
+            return None
+        if entry.get('site') != key[0] or entry.get('username') != key[1]:
+            return None
+        return entry
+
+    def _write(self, key, entry):
+        if self.path is None:
+            return
+        data = dict(entry, site=key[0], username=key[1])
+        try:
+            os.makedirs(self.path, exist_ok=True)
+            path = self._file(key)
+            temp_path = f"{path}.{os.getpid()}.tmp"
+            with open(temp_path, 'wb') as f:
+                f.write(self._fernet.encrypt(json.dumps(data).encode()))
+            os.replace(temp_path, path)
+        except OSError as e:
+            logging.warning(f"Could not save session: {e}")
+
+    def _remove(self, key):
+        self._entries.pop(key, None)
+        if self.path is not None:
+            try:
+                os.remove(self._file(key))
+            except OSError:
+                pass
+
+    def _evict(self):
+        # Only from memory: the file may be in use by another worker
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _evict_files(self):
+        if self.path is None:
+            return
+        # Entries of every worker count: the least recently used go first
+        try:
+            files = [entry for entry in os.scandir(self.path) if entry.name.endswith('.session')]
+        except FileNotFoundError:
+            return
+        if len(files) > self.max_entries:
+            files.sort(key=lambda entry: entry.stat().st_mtime)
+            for entry in files[:len(files) - self.max_entries]:
+                try:
+                    os.remove(entry.path)
+                except OSError:
+                    pass
+
+
+def save_session(driver, site=None, username=''):
+    """
+    Saves the cookies and localStorage of the page the driver is on as the
+    session of `username` in `site` (default: the host of the page).
+    """
+    storage = driver.execute_script(_READ_STORAGE_JS) or {}
+    now = time.time()
+    cookies = [cookie for cookie in driver.get_cookies() if cookie.get('expiry', now + 1) > now]
+    return session_store.put(site or _site(driver), username, cookies,
+                             storage.get('items'), storage.get('origin'))
+
+
+def restore_session(driver, site=None, username=''):
+    """
+    Loads the saved session of `username` in `site` into the driver.
+    The page has to be reloaded (or opened) afterwards to use it.
+
+    Returns:
+        bool: True if there was a session to restore
+    """
+    entry = session_store.get(site or _site(driver), username)
+    if entry is None:
+        return False
+
+    origin = entry.get('origin')
+    if origin and _origin(driver) != origin and (entry['local_storage'] or not hasattr(driver, 'execute_cdp_cmd')):
+        # add_cookie and localStorage only work on a page of the site
+        driver.get(origin)
+    if hasattr(driver, 'execute_cdp_cmd'):
+        # Chromium: every cookie in one command, whatever the current domain
+        driver.execute_cdp_cmd('Network.setCookies', {'cookies': [_cdp_cookie(cookie) for cookie in entry['cookies']]})
+    else:
+        for cookie in entry['cookies']:
+            driver.add_cookie(cookie)
+    if entry['local_storage']:
+        driver.execute_script(_WRITE_STORAGE_JS, entry['local_storage'])
+    return True
+
+
+def clear_session(driver, site=None, username=''):
+    """
+    Forgets a session rejected by the site and removes it from the driver.
+    """
+    session_store.forget(site or _site(driver), username)
+    driver.delete_all_cookies()
+    driver.execute_script("try { window.localStorage.clear(); } catch (e) {}")
+
+
+def _cdp_cookie(cookie):
+    cdp = {key: cookie[key] for key in ('name', 'value', 'domain', 'path', 'secure', 'httpOnly', 'sameSite')
+           if key in cookie}
+    if 'expiry' in cookie:
+        cdp['expires'] = cookie['expiry']
+    return cdp
+
+
+def _site(driver):
+    return urlparse(driver.current_url).netloc
+
+
+def _origin(driver):
+    url = urlparse(driver.current_url)
+    return f"{url.scheme}://{url.netloc}"
+
+
+# Shared by every driver of the process
+session_store = SessionStore(SESSION_STORE_PATH, key=SESSION_STORE_KEY)
+register_metrics_collector('session_store', session_store.metrics)
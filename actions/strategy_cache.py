@@ -0,0 +1,147 @@
+import atexit
+import json
+import logging
+import os
+import threading
+from collections import OrderedDict
+from urllib.parse import urlparse
+from utils.config import STRATEGY_CACHE_PATH, STRATEGY_CACHE_SIZE
+from utils.maintenance import register_maintenance_task
+from utils.metrics import register_metrics_collector
+
+# Seconds between saves of the cache to STRATEGY_CACHE_PATH
+_SAVE_INTERVAL = 300
+
+
+class StrategyCache:
+    """
+    Remembers which fallback strategy of an action (e.g. the JavaScript click)
+    worked for a site and locator, so it is tried first next time.
+
+    Entries are kept in LRU order and at most `max_entries` are stored. With a
+    `path` the cache is loaded from disk on first use and saved by save().
+
+    Args:
+        max_entries (int): Maximum (action, site, locator) entries kept
+        path (str): JSON file to persist the cache, or None to keep it in memory
+    """
+
+    def __init__(self, max_entries=STRATEGY_CACHE_SIZE, path=None):
+        self.max_entries = max_entries
+        self.path = path
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._loaded = path is None
+        self._dirty = False
+        # action -> {'hit': n, 'miss': n, 'stale': n}
+        self.lookups = {}
+
+    def get(self, action, site, locator):
+        """
+        Strategy that last worked for this site and locator, or None.
+        """
+        key = _key(action, site, locator)
+        with self._lock:
+            self._load()
+            strategy = self._entries.get(key)
+            if strategy is not None:
+                self._entries.move_to_end(key)
+            return strategy
+
+    def remember(self, action, site, locator, strategy):
+        key = _key(action, site, locator)
+        with self._lock:
+            self._load()
+            if self._entries.get(key) != strategy:
+                self._dirty = True
+            self._entries[key] = strategy
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._dirty = True
+
+    def forget(self, action, site, locator):
+        with self._lock:
+            if self._entries.pop(_key(action, site, locator), None) is not None:
+                self._dirty = True
+
+    def count_lookup(self, action, result):
+        """
+        Counts a lookup: 'hit' (the cached strategy worked), 'stale' (it
+        failed and the full fallback chain ran) or 'miss' (nothing cached).
+        """
+        with self._lock:
+            counts = self.lookups.setdefault(action, {'hit': 0, 'miss': 0, 'stale': 0})
+            counts[result] += 1
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
+
+    def save(self):
+        """
+        Writes the cache to `path` if it changed since the last save.
+        """
+        if self.path is None:
+            return
+        with self._lock:
+            if not self._dirty:
+                return
+            data = [list(key) + [strategy] for key, strategy in self._entries.items()]
+            self._dirty = False
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            temp_path = f"{self.path}.{os.getpid()}.tmp"
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump(data, f)
+            os.replace(temp_path, self.path)
+        except OSError as e:
+            logging.warning(f"Could not save strategy cache: {e}")
+
+    def _load(self):
+        # Called with the lock held
+        if self._loaded:
+            return
+        self._loaded = True
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        for action, site, locator, strategy in data[-self.max_entries:]:
+            self._entries[(action, site, locator)] = strategy
+
+    def metrics(self):
+        with self._lock:
+            lookups = {action: dict(counts) for action, counts in self.lookups.items()}
+            entries = len(self._entries)
+        return [
+            ('scraper_strategy_cache_lookups_total', 'counter',
+             'Strategy cache lookups by result (hit, miss, stale).',
+             [({'action': action, 'result': result}, count)
+              for action, counts in sorted(lookups.items()) for result, count in counts.items()]),
+            ('scraper_strategy_cache_entries', 'gauge', 'Entries in the strategy cache.',
+             [({}, entries)]),
+        ]
+
+
+def _key(action, site, locator):
+    return (action, site or '', str(locator) if locator is not None else '')
+
+
+def get_site(driver):
+    """
+    Host of the page the driver is on ('' if it can not be read).
+    """
+    try:
+        return urlparse(driver.current_url).netloc
+    except Exception:
+        return ''
+
+
+# Shared by every driver of the process
+strategy_cache = StrategyCache(path=STRATEGY_CACHE_PATH)
+register_metrics_collector('strategy_cache', strategy_cache.metrics)
+if strategy_cache.path:
+    register_maintenance_task('strategy_cache_save', strategy_cache.save, _SAVE_INTERVAL)
+    atexit.register(strategy_cache.save)
@@ -0,0 +1,112 @@
+import random
+import time
+from actions.page_helpers import page_helper
+from utils.config import (
+    TYPING_MAX_DELAY,
+    TYPING_MIN_DELAY,
+    TYPING_TIME_BUDGET,
+    WAIT_POLL_INTERVAL,
+)
+
+
+def wait_until(condition, timeout, poll=WAIT_POLL_INTERVAL, ignored=()):
+    """
+    Polls `condition()` every `poll` seconds until it returns a truthy value.
+    Unlike WebDriverWait it does not raise on timeout: the caller decides
+    what a condition that never held means.
+
+    Args:
+        condition: Function without arguments
+        timeout (float): Maximum seconds to wait
+        poll (float): Seconds between checks
+        ignored (tuple): Exceptions treated as "not yet"
+
+    Returns:
+        The first truthy result, or False on timeout
+    """
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            result = condition()
+            if result:
+                return result
+        except ignored:
+            pass
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return False
+        time.sleep(min(poll, remaining))
+
+
+def scroll_settled(driver, element):
+    """
+    Condition: the element is inside the viewport and did not move since the
+    previous check (smooth scrolling has finished).
+    """
+    previous = []
+
+    def condition():
+        rect = page_helper(driver, 'rect', element)
+        settled = bool(rect) and rect[2] and previous == rect[:2]
+        previous[:] = rect[:2] if rect else []
+        return settled
+
+    return condition
+
+
+def element_focused(driver, element):
+    """
+    Condition: the element is the active element of the document.
+    """
+    return lambda: page_helper(driver, 'isFocused', element)
+
+
+def element_enabled(element):
+    """
+    Condition: the element is displayed and accepts input.
+    """
+    return lambda: element.is_displayed() and element.is_enabled()
+
+
+def value_committed(element, text):
+    """
+    Condition: the element value contains `text` (an empty `text` means the
+    field has been cleared).
+    """
+    def condition():
+        value = element.get_attribute('value') or ''
+        return text in value if text else value == ''
+
+    return condition
+
+
+def humanized_delays(length, budget=TYPING_TIME_BUDGET,
+                     min_delay=TYPING_MIN_DELAY, max_delay=TYPING_MAX_DELAY):
+    """
+    Random pauses between keystrokes whose total never exceeds `budget`
+    seconds, whatever the length of the text.
+
+    Returns:
+        list: One delay per character
+    """
+    delays = [random.uniform(min_delay, max_delay) for _ in range(length)]
+    total = sum(delays)
+    if total > budget > 0:
+        scale = budget / total
+        delays = [delay * scale for delay in delays]
+    return delays
+
+
+def type_humanized(send_keys, text, budget=TYPING_TIME_BUDGET):
+    """
+    Sends `text` one character at a time with humanized pauses.
+
+    Args:
+        send_keys: Function that types one character (element.send_keys,
+            or a function that performs an ActionChains)
+        text (str): Text to type
+        budget (float): Maximum total seconds spent pausing
+    """
+    for char, delay in zip(text, humanized_delays(len(text), budget)):
+        send_keys(char)
+        time.sleep(delay)
@@ -1,24 +1,33 @@
 import inspect
 import logging
-import os
-from webdriver_manager.chrome import ChromeDriverManager
 from selenium import webdriver
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.firefox.service import Service as FirefoxService
 from selenium.webdriver.firefox.options import Options as FirefoxOptions
-from utils.config import PAGE_MAX_TIMEOUT, BASE_URL, DOWNLOAD_DIR, has_display
+from utils.config import PAGE_MAX_TIMEOUT, BASE_URL, DOWNLOAD_DIR, NETWORK_IDLE_CDP, PAGE_LOAD_STRATEGY, has_display
+from utils.download_sandbox import set_download_directory
+from utils.error import messageError
 from selenium_stealth import stealth
+from actions.driver_resolver import get_chrome_binary, get_chromedriver_path, get_firefox_binary, get_geckodriver_path
+from actions.driver_registry import kill_driver_tree, kill_owned_trees, register_driver
+from actions.browser_profiles import apply_profile_network, apply_profile_options, open_url, resolve_profile
+from actions.page_helpers import install_page_helpers
+from actions.page_ready import PAGE_LOAD_STRATEGIES
+from utils.metrics import instrument
 
-import psutil
 
-
-def get_driver_chrome():
+def get_driver_chrome(profile='default', page_load_strategy=PAGE_LOAD_STRATEGY):
     logging.info(f"START || {inspect.currentframe().f_code.co_name}")
     options = Options()
     options = add_generic_arguments(options)
     options = add_chrome_arguments(options)
+    options = apply_profile_options(options, profile, 'chrome')
+    options.page_load_strategy = page_load_strategy
+    if NETWORK_IDLE_CDP:
+        # CDP Network events for the 'networkidle' readiness (actions/page_ready.py)
+        options.set_capability('goog:loggingPrefs', {'performance': 'ALL'})
 
     # Set Chrome/Chromium binary location if found
     chrome_binary = get_chrome_binary()
@@ -26,22 +35,21 @@ def get_driver_chrome():
         logging.info(f'Using Chrome binary: {chrome_binary}')
         options.binary_location = chrome_binary
 
-    if (os.getenv("DOCKERIZED") == "true"):
-        # When running with Docker Compose
-        logging.info('Using local chromedriver')
-        service = Service('/usr/bin/chromedriver')
-    else:
-        # For local development
-        service = Service(ChromeDriverManager().install())
+    # Resolved once per process (packaged driver in Docker, cached ChromeDriverManager otherwise)
+    service = Service(get_chromedriver_path())
 
     driver = webdriver.Chrome(service=service, options=options)
+    register_driver(driver)
+    apply_profile_network(driver, profile)
     return driver
 
 
-def get_driver_firefox():
+def get_driver_firefox(profile='default', page_load_strategy=PAGE_LOAD_STRATEGY):
     logging.info(f"START || {inspect.currentframe().f_code.co_name}")
     options = FirefoxOptions()
     options = add_generic_arguments(options)
+    options = apply_profile_options(options, profile, 'firefox')
+    options.page_load_strategy = page_load_strategy
     options.accept_insecure_certs = True
 
     firefox_binary = get_firefox_binary()
@@ -49,27 +57,33 @@ def get_driver_firefox():
         options.binary_location = firefox_binary
 
     service = None
-    gecko_path = '/usr/bin/geckodriver'
-    if os.environ.get('DOCKERIZED', False) or os.path.exists(gecko_path):
-        # Prefer the packaged geckodriver inside containers to avoid Selenium Manager downloads
-        if os.path.exists(gecko_path):
-            service = FirefoxService(executable_path=gecko_path)
+    gecko_path = get_geckodriver_path()
+    if gecko_path:
+        # Prefer a known geckodriver to avoid Selenium Manager downloads
+        service = FirefoxService(executable_path=gecko_path)
 
     if service:
         driver = webdriver.Firefox(service=service, options=options)
     else:
         driver = webdriver.Firefox(options=options)
+    register_driver(driver)
     return driver
 
 
-def get_page(browser='chrome', url=BASE_URL):
+@instrument
+def create_driver(browser='chrome', profile=None, page_load_strategy=None):
+    # profile: see actions/browser_profiles.py (None = the request's profile or DRIVER_PROFILE)
+    # page_load_strategy: 'normal', 'eager' or 'none' (None = PAGE_LOAD_STRATEGY)
+    profile = resolve_profile(profile)
+    page_load_strategy = resolve_page_load_strategy(page_load_strategy)
     logging.info(
-        f"START || {inspect.currentframe().f_code.co_name} - Browser: {browser}, URL: {url}")
+        f"START || {inspect.currentframe().f_code.co_name} - Browser: {browser}, Profile: {profile}, "
+        f"Page load strategy: {page_load_strategy}")
 
     if browser == 'firefox':
-        driver = get_driver_firefox()
+        driver = get_driver_firefox(profile, page_load_strategy)
     else:
-        driver = get_driver_chrome()
+        driver = get_driver_chrome(profile, page_load_strategy)
         stealth(
             driver,
             user_agent="Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/126.0.0.0 Safari/537.36",
@@ -80,10 +94,34 @@ def get_page(browser='chrome', url=BASE_URL):
             renderer="Intel Iris OpenGL Engine",
             fix_hairline=True,
         )
+        # Helper library preloaded in every page (see actions/page_helpers.py)
+        install_page_helpers(driver)
+    return driver
+
+
+@instrument
+def get_page(browser='chrome', url=BASE_URL, profile=None, page_load_strategy=None, ready=None):
+    # ready: 'domcontentloaded', 'load', 'networkidle', a locator or a list of them
+    # (see actions/page_ready.py). With page_load_strategy='none' the controller
+    # gets the driver as soon as `ready` holds, e.g. ready=(By.CSS_SELECTOR, 'table tbody tr')
+    logging.info(
+        f"START || {inspect.currentframe().f_code.co_name} - Browser: {browser}, URL: {url}")
+
+    profile = resolve_profile(profile)
+    driver = create_driver(browser, profile, page_load_strategy)
+    # Downloads go to the sandbox of the current request (see utils/download_sandbox.py)
+    set_download_directory(driver)
     logging.info('Getting URL')
 
-    driver.get(url)
-    return driver
+    return open_url(driver, url, profile, ready)
+
+
+def resolve_page_load_strategy(page_load_strategy=None):
+    page_load_strategy = page_load_strategy or PAGE_LOAD_STRATEGY
+    if page_load_strategy not in PAGE_LOAD_STRATEGIES:
+        raise messageError(
+            f"Invalid page load strategy '{page_load_strategy}'. Available: {', '.join(PAGE_LOAD_STRATEGIES)}")
+    return page_load_strategy
 
 
 def get_wait(driver):
@@ -95,18 +133,22 @@ def get_wait(driver):
 def close_driver(driver):
     logging.info(f"START || {inspect.currentframe().f_code.co_name}")
     if driver:
-        driver.quit()
+        try:
+            driver.quit()
+        except Exception as e:
+            logging.warning(f"Error quitting driver, killing its processes: {e}")
+        finally:
+            # quit() may leave browser processes behind; only this driver's tree is touched
+            kill_driver_tree(driver)
 
 
-# This function, kill all chrome process
-def kill_driver_process():
+# This function kills the processes spawned for one driver (or for every driver
+# of the current request). Browsers of other requests and workers are never touched.
+def kill_driver_process(driver=None):
     logging.info(f"START || {inspect.currentframe().f_code.co_name}")
-    for proc in psutil.process_iter():
-        try:
-            if proc.name() == "chrome" or proc.name() == "chromedriver" or proc.name() == "chrome.exe":
-                proc.kill()
-        except psutil.NoSuchProcess:
-            pass
+    if driver is not None:
+        return kill_driver_tree(driver)
+    return kill_owned_trees()
 
 
 def add_generic_arguments(options):
@@ -133,28 +175,6 @@ def add_generic_arguments(options):
     return options
 
 
-def get_firefox_binary():
-    logging.info(f"START || {inspect.currentframe().f_code.co_name}")
-    candidates = [
-        os.environ.get("FIREFOX_BIN"),
-        "/usr/bin/firefox",
-        "/usr/bin/firefox-esr",
-        "/usr/lib/firefox/firefox",
-        "/usr/lib/firefox-esr/firefox-esr",
-    ]
-    return next((path for path in candidates if path and os.path.exists(path)), None)
-
-
-def get_chrome_binary():
-    logging.info(f"START || {inspect.currentframe().f_code.co_name}")
-    candidates = [
-        os.environ.get("CHROME_BIN"),
-        "/usr/bin/chromium-browser",
-        "/usr/bin/chromium",
-    ]
-    return next((path for path in candidates if path and os.path.exists(path)), None)
-
-
 def add_chrome_arguments(options):
     logging.info(f"START || {inspect.currentframe().f_code.co_name}")
     user_agent = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/96.0.4664.45 Safari/537.36"
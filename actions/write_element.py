@@ -1,9 +1,17 @@
-
 import inspect
 import logging
-import random
-from time import sleep
+from actions.page_helpers import make_element_interactable, page_helper
+from actions.wait_until import (
+    element_enabled,
+    element_focused,
+    scroll_settled,
+    type_humanized,
+    value_committed,
+    wait_until,
+)
+from utils.config import WAIT_SETTLE_TIMEOUT
 from utils.error import messageError
+from utils.metrics import count_strategy, instrument
 from selenium.webdriver.common.action_chains import ActionChains
 from selenium.webdriver.common.keys import Keys
 from selenium.common.exceptions import (
@@ -12,20 +20,30 @@ from selenium.common.exceptions import (
     InvalidElementStateException
 )
 
+# Seconds a written value may take to show up (frameworks that update it asynchronously)
+_VALUE_TIMEOUT = 0.3
 
-def _human_typing_delay(min_delay=0.05, max_delay=2):
-    """
-    Sleep for a random delay to simulate human typing.
-    """
-    sleep(random.uniform(min_delay, max_delay))
+
+def _written(element, text):
+    return wait_until(value_committed(element, text), _VALUE_TIMEOUT)
+
+
+def _cleared(element):
+    return wait_until(value_committed(element, ''), _VALUE_TIMEOUT)
 
 
 # This function searches for an element on the page, scrolls to it, and writes to it with multiple fallback strategies.
+@instrument
 def write_element(driver, element, text, clear=True, slow=False, max_attempts=3):
     logging.info(f"START || {inspect.currentframe().f_code.co_name} - Element: {element}, Text: {text}")
     """
     Segrating text safely to an element with multiple Fallback strategies
 
+    Instead of fixed sleeps every step waits for its real condition (scroll
+    finished, element focused, value committed) polling every WAIT_POLL_INTERVAL.
+    With slow=True the pauses between keystrokes never add up to more than
+    TYPING_TIME_BUDGET seconds.
+
     Args:
         driver: WebDriver de Selenium
         element: Elemento donde escribir
@@ -60,16 +78,14 @@ def write_element(driver, element, text, clear=True, slow=False, max_attempts=3)
                 element.clear()
 
             if slow:
-                for char in text:
-                    element.send_keys(char)
-                    _human_typing_delay()
+                type_humanized(element.send_keys, text)
             else:
                 element.send_keys(text)
 
             # Verify that it was written correctly
-            current_value = element.get_attribute('value')
-            if current_value and text in current_value:
+            if _written(element, text):
 
+                count_strategy('write_element', 'basic')
                 return driver
             else:
                 logging.debug(
@@ -99,42 +115,32 @@ def write_element(driver, element, text, clear=True, slow=False, max_attempts=3)
 
                 # Scroll al elemento con JavaScript más robusto
                 try:
-                    driver.execute_script("""
-                        arguments[0].scrollIntoView({
-                            behavior: 'smooth', 
-                            block: 'center',
-                            inline: 'center'
-                        });
-                    """, element)
-                    sleep(0.5)
+                    page_helper(driver, 'scrollCenter', element, True)
+                    wait_until(scroll_settled(driver, element), WAIT_SETTLE_TIMEOUT)
                 except Exception as e:
                     logging.warning(f"Error en scroll avanzado: {e}")
 
                 # Habilitar elemento usando make_element_interactable
                 make_element_interactable(driver, element)
-                sleep(0.2)
 
                 # Método 1: send_keys con ActionChains mejorado
                 try:
                     actions = ActionChains(driver)
                     actions.move_to_element(element).perform()
-                    sleep(0.1)
 
                     if clear:
                         element.clear()
-                        sleep(0.1)
+                        _cleared(element)
 
                     if slow:
-                        for char in text:
-                            element.send_keys(char)
-                            _human_typing_delay()
+                        type_humanized(element.send_keys, text)
                     else:
                         element.send_keys(text)
 
-                    current_value = element.get_attribute('value')
-                    if current_value and text in current_value:
+                    if _written(element, text):
                         logging.info(
                             "✅ Escritura avanzada con ActionChains exitosa")
+                        count_strategy('write_element', 'action_chains')
                         return driver
 
                 except (ElementNotInteractableException, InvalidElementStateException) as e:
@@ -144,17 +150,15 @@ def write_element(driver, element, text, clear=True, slow=False, max_attempts=3)
                 try:
                     if clear:
                         element.clear()
-                        sleep(0.1)
+                        _cleared(element)
 
                     if slow:
-                        for char in text:
-                            element.send_keys(char)
-                            _human_typing_delay()
+                        type_humanized(element.send_keys, text)
                     else:
                         element.send_keys(text)
 
-                    current_value = element.get_attribute('value')
-                    if current_value and text in current_value:
+                    if _written(element, text):
+                        count_strategy('write_element', 'direct')
                         return driver
 
                 except (ElementNotInteractableException, InvalidElementStateException) as e:
@@ -162,22 +166,11 @@ def write_element(driver, element, text, clear=True, slow=False, max_attempts=3)
 
                 # Método 3: JavaScript para establecer valor
                 try:
-                    driver.execute_script("""
-                        var element = arguments[0];
-                        var text = arguments[1];
-                        
-                        element.value = text;
-                        
-                        // Disparar eventos
-                        var events = ['input', 'change', 'keyup', 'blur'];
-                        events.forEach(function(eventType) {
-                            var event = new Event(eventType, { bubbles: true, cancelable: true });
-                            element.dispatchEvent(event);
-                        });
-                    """, element, text)
-
-                    current_value = element.get_attribute('value')
-                    if current_value and text in current_value:
+                    # Establece el valor y dispara input/change/keyup/blur
+                    page_helper(driver, 'setValue', element, text)
+
+                    if _written(element, text):
+                        count_strategy('write_element', 'javascript')
                         return driver
 
                 except Exception as e:
@@ -187,22 +180,19 @@ def write_element(driver, element, text, clear=True, slow=False, max_attempts=3)
                 try:
                     actions = ActionChains(driver)
                     actions.click(element).perform()
-                    sleep(0.2)
+                    wait_until(element_focused(driver, element), WAIT_SETTLE_TIMEOUT)
 
                     if clear:
                         actions.key_down(Keys.CONTROL).send_keys(
                             'a').key_up(Keys.CONTROL).perform()
-                        sleep(0.1)
 
                     if slow:
-                        for char in text:
-                            actions.send_keys(char).perform()
-                            _human_typing_delay()
+                        type_humanized(lambda char: ActionChains(driver).send_keys(char).perform(), text)
                     else:
                         actions.send_keys(text).perform()
 
-                    current_value = element.get_attribute('value')
-                    if current_value and text in current_value:
+                    if _written(element, text):
+                        count_strategy('write_element', 'action_chains_clear')
                         return driver
 
                 except Exception as e:
@@ -210,22 +200,20 @@ def write_element(driver, element, text, clear=True, slow=False, max_attempts=3)
 
                 # Método 5: Focus y tipo carácter por carácter
                 try:
-                    driver.execute_script("arguments[0].focus();", element)
-                    sleep(0.1)
+                    page_helper(driver, 'focus', element)
+                    wait_until(element_focused(driver, element), WAIT_SETTLE_TIMEOUT)
 
                     if clear:
-                        driver.execute_script(
-                            "arguments[0].value = '';", element)
-
-                    for char in text:
-                        element.send_keys(char)
-                        if slow:
-                            _human_typing_delay()
-                        else:
-                            sleep(0.01)
-
-                    current_value = element.get_attribute('value')
-                    if current_value and text in current_value:
+                        page_helper(driver, 'setValue', element, '', False)
+
+                    if slow:
+                        type_humanized(element.send_keys, text)
+                    else:
+                        for char in text:
+                            element.send_keys(char)
+
+                    if _written(element, text):
+                        count_strategy('write_element', 'focus_typing')
                         return driver
 
                 except Exception as e:
@@ -236,7 +224,9 @@ def write_element(driver, element, text, clear=True, slow=False, max_attempts=3)
                     f"⚠️ Todos los métodos avanzados fallaron en intento {attempt + 1}")
 
                 if attempt < max_attempts - 1:  # Si no es el último intento
-                    sleep(1)  # Esperar antes del siguiente intento
+                    # Esperar a que el elemento vuelva a estar disponible antes del siguiente intento
+                    wait_until(element_enabled(element), WAIT_SETTLE_TIMEOUT,
+                               ignored=(StaleElementReferenceException,))
 
             except StaleElementReferenceException:
                 logging.warning(
@@ -246,102 +236,16 @@ def write_element(driver, element, text, clear=True, slow=False, max_attempts=3)
                 logging.warning(
                     f"Error inesperado en intento avanzado {attempt + 1}: {e}")
                 if attempt < max_attempts - 1:
-                    sleep(1)
+                    wait_until(element_enabled(element), WAIT_SETTLE_TIMEOUT,
+                               ignored=(StaleElementReferenceException,))
                 continue
 
         # Si llegamos aquí, todos los intentos fallaron
         logging.error("❌ Todos los intentos de escritura fallaron")
+        count_strategy('write_element', 'failed')
         raise messageError(
             "No se pudo escribir en el elemento después de múltiples intentos")
 
     except Exception as e:
         raise messageError(
             f"Error {inspect.currentframe().f_code.co_name}: {e}")
-
-
-def make_element_interactable(driver, element):
-    """
-    Try to make an interactable element by removing common restrictions
-
-    ARGS:
-        Driver: Webdriver of Selenium
-        Element: Web element to be interactable
-
-    Returns:
-        BOOL: True if the element was successfully enabled
-    """
-    try:
-        logging.debug("Intentando hacer elemento interactuable para escritura")
-
-        # Script para habilitar elemento
-        result = driver.execute_script("""
-            var element = arguments[0];
-            
-            try {
-                // Quitar atributos restrictivos
-                element.removeAttribute('disabled');
-                element.removeAttribute('readonly');
-                element.disabled = false;
-                element.readOnly = false;
-                
-                // Quitar clases que pueden bloquear interacción
-                var restrictiveClasses = [
-                    'disabled', 'readonly', 'not-allowed', 'pointer-events-none',
-                    'dp__input_readonly', 'dp__pointer', 'dp__disabled'
-                ];
-                
-                restrictiveClasses.forEach(function(className) {
-                    element.classList.remove(className);
-                });
-                
-                // Habilitar estilos
-                element.style.pointerEvents = 'auto';
-                element.style.cursor = 'auto';
-                element.style.opacity = '1';
-                element.style.visibility = 'visible';
-                element.style.display = 'block';
-                
-                // Si es un input, asegurar que sea de tipo text
-                if (element.tagName.toLowerCase() === 'input') {
-                    if (element.getAttribute('inputmode') === 'none') {
-                        element.setAttribute('inputmode', 'text');
-                    }
-                    if (!element.type || element.type === 'hidden') {
-                        element.setAttribute('type', 'text');
-                    }
-                }
-                
-                // Habilitar contenedores padre que puedan estar bloqueando
-                var parent = element.parentElement;
-                var levels = 0;
-                while (parent && levels < 5) {
-                    parent.removeAttribute('disabled');
-                    parent.disabled = false;
-                    parent.style.pointerEvents = 'auto';
-                    
-                    restrictiveClasses.forEach(function(className) {
-                        parent.classList.remove(className);
-                    });
-                    
-                    parent = parent.parentElement;
-                    levels++;
-                }
-                
-                return true;
-                
-            } catch (error) {
-                console.error('Error habilitando elemento:', error);
-                return false;
-            }
-        """, element)
-
-        if result:
-            logging.debug("Elemento habilitado exitosamente para escritura")
-            return True
-        else:
-            logging.warning("No se pudo habilitar el elemento para escritura")
-            return False
-
-    except Exception as e:
-        logging.error(f"Error en make_element_interactable: {e}")
-        return False
@@ -1,7 +1,7 @@
 
 import inspect
 import logging
-from actions.web_driver import close_driver, get_page
+from actions.driver_pool import lease_page
 from utils.error import messageError
 
 # NO BORRAR PARA QUE LOS TEST DE LA PIPELINE NO DEN ERROR
@@ -16,25 +16,25 @@ def controller_sample(data):
     except KeyError as e:
         raise messageError(f"The field '{e.args[0]}' has not been sent")
 
-    driver = None
     try:
         message = "ok"
 
-        # You can choose betwen Chrome (default ) or firefox. Example: get_page('firefox')
-        driver = get_page()
+        # Drivers come from a warm pool and go back to it when the block ends.
+        # You can choose betwen Chrome (default ) or firefox. Example: lease_page('firefox')
+        # Read-only scraping can skip images, fonts and trackers: lease_page(profile='lean')
+        # To return a downloaded file: return FileResult(wait_for_download()) (see utils/artifacts.py)
+        with lease_page() as driver:
 
-        # TODO: decominate to use login
+            # TODO: decominate to use login
 
-        # driver = login(driver, username, password)
+            # driver = login(driver, username, password)
+            # Or reuse the saved session of the user while it is valid (actions/session_store.py):
+            # driver = cached_login(driver, username, password)
 
-        # Add actions
+            # Add actions
 
-        return message
+            return message
 
     except Exception as e:
         raise messageError(
             f"Error {inspect.currentframe().f_code.co_name}: {e}")
-
-    finally:
-        if driver is not None:
-            close_driver(driver)
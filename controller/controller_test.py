@@ -293,7 +293,7 @@ def controller_test(data=None):
                     logging.info(f"✓ Test 7/7: Capturando screenshot...")
                     test_results['total_tests'] += 1
                     try:
-                        screenshot_path = take_screenshot(driver, "logs")
+                        screenshot_path = take_screenshot(driver)
                         logging.info(
                             f"  ✅ Screenshot guardado en: {screenshot_path}")
 
@@ -336,7 +336,7 @@ def controller_test(data=None):
                         logging.warning(
                             f"⚠️  Error al cerrar driver de {browser}: {e}")
                         try:
-                            kill_driver_process()
+                            kill_driver_process(driver)
                         except:
                             pass
 
@@ -384,4 +384,4 @@ def controller_test(data=None):
             try:
                 close_driver(driver)
             except:
-                kill_driver_process()
+                kill_driver_process(driver)
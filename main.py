@@ -1,12 +1,30 @@
 from flask import Flask, jsonify
 from controller.controller_sample import controller_sample
 from controller.controller_test import controller_test
+from utils.handle_artifacts import handle_artifact_download
+from utils.handle_batch import handle_batch_endpoint
+from utils.handle_jobs import handle_job_status, handle_job_submit
+from utils.handle_logs import handle_logs_search
+from utils.handle_metrics import handle_metrics_endpoint
 from utils.handle_request import handle_request_endpoint
-from utils.config import PORT, STAGE
+from utils.jobs import start_job_workers
+from utils.logging_config import configure_logger
+from utils.metrics import start_metrics_snapshots
+from utils.config import PORT, STAGE, USE_X_SENDFILE
+
+# Controllers that can be run as background jobs, by name
+CONTROLLERS = {
+    'sample': controller_sample,
+    'test': controller_test,
+}
 
 def create_app():
+    # Before any background thread logs (logging.info would install a default stderr handler)
+    configure_logger()
 
     app = Flask(__name__)
+    # Files (FileResult, /artifacts) are sent by the proxy in front of gunicorn if it supports X-Sendfile
+    app.config['USE_X_SENDFILE'] = USE_X_SENDFILE
 
     @app.route('/')
     def index():
@@ -41,7 +59,76 @@ def create_app():
             app.logger.error("An error occurred: %s", str(e))
             return jsonify(error="An internal error has occurred."), 500
 
+    @app.route('/jobs', methods=['POST'])
+    def job_submit_endpoint():
+        """
+        Queues a long scrape and returns its job id right away.
+
+        Body: {"controller": "sample", "data": {...}}
+        """
+        try:
+            return handle_job_submit(CONTROLLERS)
+        except Exception as e:
+            app.logger.error("An error occurred: %s", str(e))
+            return jsonify(error="An internal error has occurred."), 500
+
+    @app.route('/jobs/<job_id>', methods=['GET'])
+    def job_status_endpoint(job_id):
+        """Status and result of a queued job."""
+        try:
+            return handle_job_status(job_id)
+        except Exception as e:
+            app.logger.error("An error occurred: %s", str(e))
+            return jsonify(error="An internal error has occurred."), 500
+
+    @app.route('/batch/<controller>', methods=['POST'])
+    def batch_endpoint(controller):
+        """
+        Runs a controller for many payloads in parallel browsers and streams
+        one NDJSON result per item.
+
+        Body: [{...}, {...}] or {"items": [...], "concurrency": 4, "timeout": 60}
+        """
+        try:
+            # An unknown controller is answered with 404 after checking the token
+            return handle_batch_endpoint(CONTROLLERS.get(controller), controller)
+        except Exception as e:
+            app.logger.error("An error occurred: %s", str(e))
+            return jsonify(error="An internal error has occurred."), 500
+
+    @app.route('/artifacts/<artifact_id>', methods=['GET'])
+    def artifact_endpoint(artifact_id):
+        """File returned by a controller (FileResult), referenced in the JSON response."""
+        try:
+            return handle_artifact_download(artifact_id)
+        except Exception as e:
+            app.logger.error("An error occurred: %s", str(e))
+            return jsonify(error="An internal error has occurred."), 500
+
+    @app.route('/logs', methods=['GET'])
+    def logs_endpoint():
+        """Log records of one request: /logs?request_id=<X-Request-ID of the response>"""
+        try:
+            return handle_logs_search()
+        except Exception as e:
+            app.logger.error("An error occurred: %s", str(e))
+            return jsonify(error="An internal error has occurred."), 500
+
+    @app.route('/metrics', methods=['GET'])
+    def metrics_endpoint():
+        """Action timings and counters in Prometheus text format."""
+        try:
+            return handle_metrics_endpoint()
+        except Exception as e:
+            app.logger.error("An error occurred: %s", str(e))
+            return jsonify(error="An internal error has occurred."), 500
+
     # TODO: Add more endpoints here as needed
+
+    # Jobs run in background threads so HTTP workers stay free
+    start_job_workers(CONTROLLERS)
+    # Each gunicorn worker shares its metrics with the others through METRICS_DIR
+    start_metrics_snapshots()
     return app
 
 
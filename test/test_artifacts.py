@@ -0,0 +1,129 @@
+"""
+Pruebas para las respuestas de archivos y los artefactos (utils/artifacts.py)
+"""
+import io
+import json
+import time
+from flask import Flask
+import utils.artifacts as artifacts_module
+import utils.download_sandbox as download_sandbox_module
+from utils.artifacts import FileResult, delete_old_artifacts, get_artifact, store_artifact
+from utils.download_sandbox import current_download_dir
+from utils.handle_batch import run_batch
+from utils.handle_request import handle_request_endpoint
+from main import app as main_app
+import pytest
+import sys
+import os
+sys.path.insert(0, os.path.abspath(
+    os.path.join(os.path.dirname(__file__), '..')))
+
+HEADERS = {"Authorization": "Bearer sample"}
+CONTENT = b'%PDF-1.4 ' + b'x' * 100000
+
+
+def controller_download(data):
+    # Like a controller that clicked a download button and waited for it
+    path = os.path.join(current_download_dir(), 'report.pdf')
+    with open(path, 'wb') as f:
+        f.write(CONTENT)
+    return FileResult(path)
+
+
+@pytest.fixture
+def maintenance_tasks(monkeypatch):
+    tasks = []
+    monkeypatch.setattr(artifacts_module, 'register_maintenance_task', lambda *args: tasks.append(args))
+    monkeypatch.setattr(artifacts_module, '_cleanup_registered', False)
+    return tasks
+
+
+@pytest.fixture(autouse=True)
+def storage(tmp_path, monkeypatch, maintenance_tasks):
+    monkeypatch.setattr(artifacts_module, 'ARTIFACTS_DIR', str(tmp_path / 'artifacts'))
+    monkeypatch.setattr(download_sandbox_module, 'DOWNLOAD_DIR', str(tmp_path / 'downloads'))
+    monkeypatch.setattr(download_sandbox_module, 'register_maintenance_task', lambda *args: None)
+    return tmp_path
+
+
+@pytest.fixture
+def client():
+    app = Flask(__name__)
+    app.add_url_rule('/json', 'json', lambda: handle_request_endpoint(controller_download))
+    app.add_url_rule('/file', 'file', lambda: handle_request_endpoint(controller_download, decode_response=False))
+    app.config['TESTING'] = True
+    with app.test_client() as client:
+        yield client
+
+
+def test_file_result_streamed(client):
+    """Verifica que con decode_response=False el archivo se envía como cuerpo de la respuesta"""
+    response = client.get('/file', headers=HEADERS, json={})
+
+    assert response.status_code == 200
+    assert response.mimetype == 'application/pdf'
+    assert 'attachment; filename=report.pdf' in response.headers['Content-Disposition']
+    assert response.headers['X-Request-ID']
+    assert response.data == CONTENT
+    response.close()
+
+
+def test_file_result_as_artifact(client, storage):
+    """Verifica que en modo JSON se devuelve la referencia y el archivo se mueve a los artefactos"""
+    response = client.get('/json', headers=HEADERS, json={})
+    message = response.json['message']
+
+    assert response.status_code == 200
+    assert message['url'] == f"/artifacts/{message['id']}"
+    assert message['size'] == len(CONTENT) and message['name'] == 'report.pdf'
+    # Moved from the download sandbox, not copied
+    assert not any(name for _, _, names in os.walk(storage / 'downloads') for name in names)
+
+    main_app.config['TESTING'] = True
+    with main_app.test_client() as main_client:
+        download = main_client.get(message['url'], headers=HEADERS)
+        assert download.data == CONTENT
+        download.close()
+
+        partial = main_client.get(message['url'], headers=dict(HEADERS, Range='bytes=0-3'))
+        assert partial.status_code == 206
+        assert partial.data == b'%PDF'
+        partial.close()
+
+
+def test_artifact_endpoint_errors():
+    """Verifica los errores 401 sin token y 404 con ids desconocidos o no válidos"""
+    main_app.config['TESTING'] = True
+    with main_app.test_client() as main_client:
+        assert main_client.get('/artifacts/' + 'a' * 32).status_code == 401
+        assert main_client.get('/artifacts/' + 'a' * 32, headers=HEADERS).status_code == 404
+        assert main_client.get('/artifacts/..%2Fmain.py', headers=HEADERS).status_code == 404
+
+
+def test_file_object_and_batch_results(maintenance_tasks):
+    """Verifica artefactos desde objetos de archivo y en los resultados de un batch, con una sola limpieza programada"""
+    artifact = store_artifact(FileResult(io.BytesIO(b'a,b\n1,2\n'), 'data.csv'))
+    assert artifact['mimetype'] == 'text/csv'
+    with open(get_artifact(artifact['id'])['path'], 'rb') as f:
+        assert f.read() == b'a,b\n1,2\n'
+
+    lines = [json.loads(line) for line in run_batch(controller_download, [{}, {}], 2, 10)]
+    ids = {line['message']['id'] for line in lines[:-1]}
+    assert len(ids) == 2 and all(get_artifact(artifact_id) for artifact_id in ids)
+    assert [task[0] for task in maintenance_tasks] == ['artifact_cleanup']
+
+
+def test_delete_old_artifacts(storage):
+    """Verifica que se eliminan los artefactos caducados y los restos de escrituras interrumpidas"""
+    old = store_artifact(FileResult(io.BytesIO(b'old'), 'old.txt'))
+    (storage / 'artifacts' / '.tmp1234.part').write_bytes(b'partial')
+    time.sleep(0.01)
+    now = time.time() + 60
+    new = store_artifact(FileResult(io.BytesIO(b'new'), 'new.txt'))
+    metadata = storage / 'artifacts' / f"{new['id']}.json"
+    metadata.write_text(json.dumps(dict(new, created_at=now)))
+
+    assert delete_old_artifacts(max_age=30, now=now) == 2
+    assert get_artifact(old['id']) is None
+    assert get_artifact(new['id']) is not None
+    assert sorted(os.listdir(storage / 'artifacts')) == [new['id'], f"{new['id']}.json"]
@@ -0,0 +1,151 @@
+"""
+Pruebas para los perfiles de navegador (actions/browser_profiles.py)
+"""
+import actions.driver_pool as driver_pool_module
+from actions.browser_profiles import (
+    LEAN_BLOCKED_URLS,
+    ProfileStats,
+    apply_profile_network,
+    apply_profile_options,
+    browser_profile,
+    open_url,
+    profile_stats,
+    resolve_profile,
+)
+from main import app
+from selenium.webdriver.chrome.options import Options
+from selenium.webdriver.firefox.options import Options as FirefoxOptions
+import utils.error as error_module
+from utils.error import messageError
+import pytest
+import re
+import sys
+import os
+sys.path.insert(0, os.path.abspath(
+    os.path.join(os.path.dirname(__file__), '..')))
+
+
+class FakeDriver:
+    def __init__(self, cdp_error=None, transferred=2048):
+        self.cdp_commands = []
+        self.cdp_error = cdp_error
+        self.transferred = transferred
+        self.visited = []
+
+    def execute_cdp_cmd(self, command, params):
+        if self.cdp_error:
+            raise self.cdp_error
+        self.cdp_commands.append((command, params))
+
+    def get(self, url):
+        self.visited.append(url)
+
+    def execute_script(self, script, *args):
+        return self.transferred
+
+
+@pytest.fixture(autouse=True)
+def quiet_errors(monkeypatch):
+    monkeypatch.setattr(error_module, 'STAGE', 'production')
+
+
+def test_lean_options_keep_existing_prefs():
+    """Verifica que el perfil lean añade sus preferencias sin borrar las de add_chrome_arguments"""
+    options = Options()
+    options.add_experimental_option('prefs', {'download.prompt_for_download': False})
+
+    apply_profile_options(options, 'lean', 'chrome')
+    prefs = options.experimental_options['prefs']
+    assert prefs['download.prompt_for_download'] is False
+    assert prefs['profile.managed_default_content_settings.images'] == 2
+
+    firefox = apply_profile_options(FirefoxOptions(), 'lean', 'firefox')
+    assert firefox.preferences['permissions.default.image'] == 2
+
+
+def test_lean_network_blocks_urls():
+    """Verifica que lean bloquea las URLs por CDP y que default no envía nada"""
+    driver = FakeDriver()
+    assert apply_profile_network(driver, 'lean')
+    assert driver.cdp_commands[-1] == ('Network.setBlockedURLs', {'urls': LEAN_BLOCKED_URLS})
+
+    driver = FakeDriver()
+    assert apply_profile_network(driver, 'default')
+    assert driver.cdp_commands == []
+
+    assert not apply_profile_network(FakeDriver(cdp_error=RuntimeError('no CDP')), 'lean')
+
+
+def blocked(url, patterns=LEAN_BLOCKED_URLS):
+    # Same matching as Network.setBlockedURLs: the whole URL, '*' for any text
+    return any(re.fullmatch(re.escape(pattern).replace(r'\*', '.*'), url) for pattern in patterns)
+
+
+def test_lean_patterns_anchored_to_extension():
+    """Verifica que lean bloquea por extensión del recurso y no por nombres de host parecidos"""
+    assert blocked('https://cdn.shop.com/img/logo.png')
+    assert blocked('https://shop.com/photo.jpg?v=2')
+    assert blocked('https://shop.com/fonts/icons.woff2')
+    assert blocked('https://www.google-analytics.com/analytics.js')
+
+    assert not blocked('https://www.gifts.com/')
+    assert not blocked('https://www.icons.com/index.html')
+    assert not blocked('https://www.webmd.com/api/data.json')
+    assert not blocked('https://www.wavelength.com/search?q=png')
+
+
+def test_resolve_profile_precedence():
+    """Verifica la prioridad: argumento, perfil de la petición y DRIVER_PROFILE"""
+    assert resolve_profile() == 'default'
+    with browser_profile('lean'):
+        assert resolve_profile() == 'lean'
+        assert resolve_profile('default') == 'default'
+        with browser_profile(None):
+            assert resolve_profile() == 'lean'
+    assert resolve_profile() == 'default'
+
+    with pytest.raises(messageError):
+        resolve_profile('turbo')
+
+
+def test_open_url_reports_by_profile():
+    """Verifica que se registran tiempo de carga y bytes por perfil"""
+    stats = ProfileStats()
+    stats.record('lean', 0.5, 1000)
+    stats.record('lean', 1.5, 3000)
+    stats.record('default', 2.0, None)
+
+    report = stats.report()
+    assert report['lean'] == {'pages': 2, 'avg_load_seconds': 1.0, 'avg_bytes': 2000, 'bytes': 4000}
+    assert report['default']['avg_bytes'] is None
+
+    profile_stats.reset()
+    driver = open_url(FakeDriver(transferred=512), 'https://example.com', 'lean')
+    assert driver.visited == ['https://example.com']
+    assert profile_stats.report()['lean']['bytes'] == 512
+
+
+def test_driver_pool_per_profile(monkeypatch):
+    """Verifica que cada perfil tiene su propio pool de drivers"""
+    monkeypatch.setattr(driver_pool_module, 'DRIVER_POOL_PREWARM', False)
+    monkeypatch.setattr(driver_pool_module, 'DRIVER_POOL_MAX_IDLE', 0)
+    created = []
+    monkeypatch.setattr(driver_pool_module, 'create_driver',
+                        lambda browser, profile, page_load_strategy: created.append(profile) or FakeDriver())
+    try:
+        lean = driver_pool_module.get_driver_pool('chrome', 'lean')
+        assert driver_pool_module.get_driver_pool('chrome') is not lean
+        with browser_profile('lean'):
+            assert driver_pool_module.get_driver_pool('chrome') is lean
+    finally:
+        driver_pool_module.close_driver_pools()
+
+
+def test_unknown_profile_header():
+    """Verifica que un X-Browser-Profile desconocido devuelve 400"""
+    app.config['TESTING'] = True
+    headers = {"Authorization": "Bearer sample", "X-Browser-Profile": "turbo"}
+    with app.test_client() as client:
+        response = client.get('/sample', headers=headers, json={"username": "a", "password": "b"})
+    assert response.status_code == 400
+    assert "Unknown browser profile 'turbo'" in response.json['message']
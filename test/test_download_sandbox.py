@@ -0,0 +1,198 @@
+"""
+Pruebas para los directorios de descarga por petición (utils/download_sandbox.py)
+"""
+import threading
+import time
+import utils.download_sandbox as download_sandbox_module
+from utils.download_sandbox import (
+    clean_download_sandboxes,
+    current_download_dir,
+    download_sandbox,
+    set_download_directory,
+)
+from utils.download_watcher import DownloadWatcher
+from actions.driver_pool import DriverPool
+import psutil
+import pytest
+import sys
+import os
+sys.path.insert(0, os.path.abspath(
+    os.path.join(os.path.dirname(__file__), '..')))
+
+
+class CDPDriver:
+    """Driver de Chromium mínimo que registra los comandos CDP"""
+
+    def __init__(self, unsupported=()):
+        self.commands = []
+        self.unsupported = unsupported
+        self.window_handles = ['main']
+        self.switch_to = self
+
+    def execute_cdp_cmd(self, command, params):
+        if command in self.unsupported:
+            raise RuntimeError(f"'{command}' wasn't found")
+        self.commands.append((command, params))
+
+    def window(self, handle):
+        pass
+
+    def execute_script(self, script, *args):
+        return None
+
+    def get_log(self, name):
+        return []
+
+    def delete_all_cookies(self):
+        pass
+
+    def get(self, url):
+        pass
+
+    def quit(self):
+        pass
+
+
+@pytest.fixture
+def maintenance_tasks(monkeypatch):
+    tasks = []
+    monkeypatch.setattr(download_sandbox_module, 'register_maintenance_task', lambda *args: tasks.append(args))
+    monkeypatch.setattr(download_sandbox_module, '_janitor_registered', False)
+    return tasks
+
+
+@pytest.fixture
+def download_dir(tmp_path, monkeypatch, maintenance_tasks):
+    monkeypatch.setattr(download_sandbox_module, 'DOWNLOAD_DIR', str(tmp_path))
+    return tmp_path
+
+
+def test_sandbox_per_request(download_dir, maintenance_tasks):
+    """Verifica que cada bloque tiene su directorio, que fuera se usa DOWNLOAD_DIR y que el janitor se programa una vez"""
+    assert current_download_dir() == str(download_dir)
+    paths = []
+
+    def request(label):
+        with download_sandbox(label) as path:
+            assert current_download_dir() == path
+            time.sleep(0.05)
+            paths.append(path)
+
+    threads = [threading.Thread(target=request, args=('req/1',)) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(set(paths)) == 3
+    assert all(os.path.isdir(path) and os.path.dirname(path) == str(download_dir) for path in paths)
+    start = int(psutil.Process().create_time())
+    assert all(os.path.basename(path).startswith(f"{os.getpid()}-{start}-req1-") for path in paths)
+    assert current_download_dir() == str(download_dir)
+    assert [task[0] for task in maintenance_tasks] == ['download_janitor']
+
+
+def test_set_download_directory_cdp(download_dir):
+    """Verifica el comando CDP, la alternativa Page.* y los drivers sin CDP"""
+    driver = CDPDriver()
+    with download_sandbox() as path:
+        assert set_download_directory(driver)
+    assert driver.commands == [('Browser.setDownloadBehavior', {'behavior': 'allow', 'downloadPath': path})]
+
+    driver = CDPDriver(unsupported=('Browser.setDownloadBehavior',))
+    assert set_download_directory(driver, '/tmp/downloads')
+    assert driver.commands[0][0] == 'Page.setDownloadBehavior'
+
+    assert not set_download_directory(object())
+
+
+def test_pool_lease_uses_request_sandbox(download_dir):
+    """Verifica que el mismo driver del pool descarga en el sandbox de cada petición"""
+    driver = CDPDriver()
+    pool = DriverPool(lambda: driver, size=1, max_idle=0, max_uses=0, max_age=0)
+    paths = []
+    for _ in range(2):
+        with download_sandbox() as path:
+            with pool.lease() as leased:
+                assert leased is driver
+            paths.append(path)
+
+    directories = [params['downloadPath'] for command, params in driver.commands
+                   if command == 'Browser.setDownloadBehavior']
+    assert directories == paths
+    pool.close()
+
+
+def test_wait_for_download_in_sandbox(download_dir):
+    """Verifica que la espera de descargas usa el sandbox de la petición por defecto"""
+    watcher = DownloadWatcher(poll_interval=0.02)
+    with download_sandbox() as path:
+        existing = watcher.snapshot()
+        with open(os.path.join(path, 'report.pdf'), 'wb') as f:
+            f.write(b'pdf')
+        assert watcher.wait(timeout=2, existing=existing) == [os.path.join(path, 'report.pdf')]
+
+
+def test_wait_in_sandbox_without_snapshot(download_dir):
+    """Verifica que en un sandbox se encuentra sin instantánea una descarga terminada antes de esperar, y solo una vez"""
+    watcher = DownloadWatcher(poll_interval=0.02)
+    with download_sandbox() as path:
+        with open(os.path.join(path, 'fast.pdf'), 'wb') as f:
+            f.write(b'pdf')
+        assert watcher.wait(timeout=2) == [os.path.join(path, 'fast.pdf')]
+
+        with open(os.path.join(path, 'second.pdf'), 'wb') as f:
+            f.write(b'pdf')
+        assert watcher.wait(timeout=2) == [os.path.join(path, 'second.pdf')]
+
+
+def test_janitor_age_and_size_quota(download_dir):
+    """Verifica que el janitor respeta los sandboxes abiertos y aplica antigüedad y tamaño"""
+    finished = []
+    for size in (300, 200, 100):
+        with download_sandbox() as path:
+            with open(os.path.join(path, 'file.bin'), 'wb') as f:
+                f.write(b'x' * size)
+            finished.append(path)
+        time.sleep(0.01)
+
+    orphan = download_dir / '999999999-0-old-abc'  # process that no longer exists
+    orphan.mkdir()
+    parent_start = int(psutil.Process(os.getppid()).create_time())
+    other_worker = download_dir / f"{os.getppid()}-{parent_start}-busy-abc"
+    other_worker.mkdir()
+    (download_dir / 'manual.pdf').write_bytes(b'keep')
+
+    with download_sandbox() as active:
+        with open(os.path.join(active, 'big.bin'), 'wb') as f:
+            f.write(b'x' * 500)
+
+        # Young and under quota: nothing to do
+        assert clean_download_sandboxes(max_age=60, max_bytes=0) == 0
+        # Over quota (1100 > 800): the oldest finished sandbox goes first
+        assert clean_download_sandboxes(max_age=60, max_bytes=800) == 1
+        assert not os.path.exists(finished[0])
+        assert os.path.exists(finished[1])
+        # Old enough: every finished sandbox and the orphan
+        assert clean_download_sandboxes(max_age=60, max_bytes=0, now=time.time() + 120) == 3
+
+        assert os.path.isdir(active)
+        assert other_worker.is_dir()
+        assert (download_dir / 'manual.pdf').exists()
+        assert not orphan.exists()
+
+
+def test_janitor_pid_reused_after_restart(download_dir):
+    """Verifica que un pid reutilizado tras reiniciar el contenedor no protege los sandboxes del proceso anterior"""
+    start = int(psutil.Process().create_time())
+    previous_container = download_dir / f"{os.getpid()}-{start - 3600}-old-abc"
+    previous_container.mkdir()
+    reused_parent = download_dir / f"{os.getppid()}-{start - 3600}-old-abc"
+    reused_parent.mkdir()
+    own = download_dir / f"{os.getpid()}-{start}-lost-abc"  # de este proceso: solo si terminó aquí
+    own.mkdir()
+
+    assert clean_download_sandboxes(max_age=60, max_bytes=0, now=time.time() + 120) == 2
+    assert not previous_container.exists()
+    assert not reused_parent.exists()
+    assert own.is_dir()
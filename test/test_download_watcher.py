@@ -0,0 +1,112 @@
+"""
+Pruebas para la espera de descargas (utils/download_watcher.py)
+"""
+import os
+import threading
+import time
+from utils.download_watcher import DownloadWatcher
+import utils.error as error_module
+from utils.error import messageError
+import pytest
+import sys
+sys.path.insert(0, os.path.abspath(
+    os.path.join(os.path.dirname(__file__), '..')))
+
+
+@pytest.fixture(autouse=True)
+def quiet_errors(monkeypatch):
+    monkeypatch.setattr(error_module, 'STAGE', 'production')
+
+
+@pytest.fixture(params=['inotify', 'polling'])
+def watcher(request):
+    watcher = DownloadWatcher(poll_interval=0.02, use_inotify=request.param == 'inotify')
+    if request.param == 'inotify' and not watcher.uses_inotify:
+        pytest.skip('inotify not available')
+    return watcher
+
+
+def later(delay, function, *args):
+    timer = threading.Timer(delay, function, args)
+    timer.start()
+    return timer
+
+
+def chrome_download(directory, name, content=b'data', delay=0.1):
+    """Como Chrome: escribe name.crdownload y lo renombra al terminar"""
+    partial = os.path.join(directory, name + '.crdownload')
+    with open(partial, 'wb') as f:
+        f.write(content[:1])
+    time.sleep(delay)
+    with open(partial, 'ab') as f:
+        f.write(content[1:])
+    os.rename(partial, os.path.join(directory, name))
+
+
+def test_waits_for_chrome_download(watcher, tmp_path):
+    """Verifica que se ignora el .crdownload y se devuelve el archivo final"""
+    (tmp_path / 'old.pdf').write_bytes(b'old')
+    later(0.05, chrome_download, str(tmp_path), 'report.pdf')
+
+    start = time.monotonic()
+    path = watcher.wait(str(tmp_path), timeout=3)
+
+    assert path == [str(tmp_path / 'report.pdf')]
+    assert (tmp_path / 'report.pdf').read_bytes() == b'data'
+    assert time.monotonic() - start < 1
+
+
+def test_firefox_placeholder_ignored_until_part_removed(watcher, tmp_path):
+    """Verifica que el archivo vacío de Firefox no cuenta aunque se cierre antes de que aparezca name.part"""
+    # Los archivos vacíos solo se confirman tras poll_interval sin cambios: más que el hueco
+    # entre el placeholder y name.part
+    watcher.poll_interval = 0.5
+
+    def firefox_download():
+        (tmp_path / 'data.csv').write_bytes(b'')
+        time.sleep(0.1)
+        (tmp_path / 'data.csv.part').write_bytes(b'a,b')
+        time.sleep(0.2)
+        os.replace(tmp_path / 'data.csv.part', tmp_path / 'data.csv')
+
+    later(0.05, firefox_download)
+    path = watcher.wait(str(tmp_path), timeout=3)[0]
+
+    assert open(path, 'rb').read() == b'a,b'
+
+
+def test_concurrent_downloads_and_waiters(watcher, tmp_path):
+    """Verifica varias descargas simultáneas y que cada archivo se entrega a un solo waiter"""
+    existing = watcher.snapshot(str(tmp_path))
+    results = []
+
+    def wait_one():
+        results.append(watcher.wait(str(tmp_path), timeout=3, existing=existing)[0])
+
+    waiters = [threading.Thread(target=wait_one) for _ in range(2)]
+    for thread in waiters:
+        thread.start()
+    for index in range(5):
+        later(0.02 * index, chrome_download, str(tmp_path), f"file{index}.txt", b'xy', 0.05)
+
+    paths = watcher.wait(str(tmp_path), timeout=3, existing=existing, count=3)
+    for thread in waiters:
+        thread.join()
+
+    assert len(set(paths + results)) == 5
+
+
+def test_pattern_and_timeout(watcher, tmp_path):
+    """Verifica el filtro por nombre y el messageError al agotar el tiempo"""
+    later(0.02, chrome_download, str(tmp_path), 'image.png', b'png', 0.01)
+
+    with pytest.raises(messageError):
+        watcher.wait(str(tmp_path), timeout=0.3, pattern='*.pdf')
+
+
+def test_download_finished_before_wait(watcher, tmp_path):
+    """Verifica que con la instantánea previa se encuentra una descarga ya terminada"""
+    existing = watcher.snapshot(str(tmp_path))
+    chrome_download(str(tmp_path), 'fast.zip', delay=0)
+
+    assert watcher.wait(str(tmp_path), timeout=2, existing=existing) == [str(tmp_path / 'fast.zip')]
@@ -0,0 +1,159 @@
+"""
+Pruebas para el pool de drivers (actions/driver_pool.py)
+"""
+from actions.driver_pool import DriverPool, reset_driver_state
+from utils.error import messageError
+import threading
+import pytest
+import sys
+import os
+sys.path.insert(0, os.path.abspath(
+    os.path.join(os.path.dirname(__file__), '..')))
+
+
+class FakeSwitchTo:
+    def __init__(self, driver):
+        self.driver = driver
+
+    def window(self, handle):
+        self.driver.current_handle = handle
+
+
+class FakeDriver:
+    """Driver mínimo que registra las llamadas que recibe"""
+
+    def __init__(self, fail_reset=False):
+        self.window_handles = ['main']
+        self.current_handle = 'main'
+        self.switch_to = FakeSwitchTo(self)
+        self.visited = []
+        self.cookies_cleared = 0
+        self.quit_called = False
+        self.fail_reset = fail_reset
+
+    def close(self):
+        self.window_handles.remove(self.current_handle)
+
+    def execute_script(self, script, *args):
+        return None
+
+    def delete_all_cookies(self):
+        if self.fail_reset:
+            raise RuntimeError("browser crashed")
+        self.cookies_cleared += 1
+
+    def get(self, url):
+        self.visited.append(url)
+
+    def quit(self):
+        self.quit_called = True
+
+
+def make_pool(**kwargs):
+    created = []
+
+    def factory():
+        driver = FakeDriver()
+        created.append(driver)
+        return driver
+
+    options = {'size': 1, 'max_idle': 0, 'max_uses': 0,
+               'max_age': 0, 'lease_timeout': 1}
+    options.update(kwargs)
+    return DriverPool(factory, **options), created
+
+
+def test_lease_reuses_driver():
+    """Verifica que el mismo driver se reutiliza entre préstamos"""
+    pool, created = make_pool()
+    with pool.lease() as first:
+        pass
+    with pool.lease() as second:
+        pass
+    assert first is second
+    assert len(created) == 1
+
+
+def test_release_resets_driver_state():
+    """Verifica que al devolver un driver se limpian pestañas, cookies y página"""
+    pool, _ = make_pool()
+    with pool.lease() as driver:
+        driver.window_handles.append('popup')
+    assert driver.window_handles == ['main']
+    assert driver.cookies_cleared == 1
+    assert driver.visited[-1] == 'about:blank'
+
+
+def test_driver_recycled_after_max_uses():
+    """Verifica que el driver se recicla al alcanzar max_uses"""
+    pool, created = make_pool(max_uses=2)
+    for _ in range(3):
+        with pool.lease():
+            pass
+    assert len(created) == 2
+    assert created[0].quit_called
+
+
+def test_driver_recycled_after_max_age():
+    """Verifica que el driver se recicla cuando supera max_age"""
+    pool, created = make_pool(max_age=0.01)
+    with pool.lease():
+        threading.Event().wait(0.02)
+    with pool.lease():
+        pass
+    assert len(created) == 2
+    assert created[0].quit_called
+
+
+def test_prune_quits_idle_drivers():
+    """Verifica que prune cierra los drivers inactivos más de max_idle"""
+    pool, created = make_pool(max_idle=0.01)
+    with pool.lease():
+        pass
+    threading.Event().wait(0.02)
+    assert pool.prune() == 1
+    assert created[0].quit_called
+    assert pool.stats()['total'] == 0
+
+
+def test_failed_reset_discards_driver():
+    """Verifica que un driver que no se puede limpiar no vuelve al pool"""
+    pool = DriverPool(lambda: FakeDriver(fail_reset=True), size=1, lease_timeout=1)
+    with pool.lease() as driver:
+        pass
+    assert driver.quit_called
+    assert pool.stats() == {'idle': 0, 'total': 0, 'size': 1}
+
+
+def test_lease_timeout_when_pool_exhausted():
+    """Verifica que se lanza messageError si no hay drivers libres a tiempo"""
+    pool, _ = make_pool(lease_timeout=0.05)
+    with pool.lease():
+        with pytest.raises(messageError):
+            with pool.lease():
+                pass
+
+
+def test_factory_error_frees_slot():
+    """Verifica que un fallo al crear el driver no ocupa hueco en el pool"""
+    def factory():
+        raise RuntimeError("no browser")
+
+    pool = DriverPool(factory, size=1, lease_timeout=0.05)
+    with pytest.raises(RuntimeError):
+        with pool.lease():
+            pass
+    assert pool.stats()['total'] == 0
+
+
+def test_warm_fills_pool():
+    """Verifica que warm pre-lanza drivers hasta el tamaño del pool"""
+    pool, created = make_pool(size=3)
+    pool.warm()
+    assert len(created) == 3
+    assert pool.stats()['idle'] == 3
+
+
+def test_reset_driver_state_reports_failure():
+    """Verifica que reset_driver_state devuelve False si el navegador falla"""
+    assert reset_driver_state(FakeDriver(fail_reset=True)) is False
@@ -0,0 +1,210 @@
+"""
+Pruebas para el registro de procesos de drivers (actions/driver_registry.py)
+"""
+import actions.driver_registry as driver_registry_module
+from actions.driver_registry import (
+    driver_owner,
+    kill_driver_tree,
+    kill_owned_trees,
+    reap_orphans,
+    register_driver,
+    set_driver_owner,
+    unregister_driver
+)
+import subprocess
+import threading
+import psutil
+import pytest
+import sys
+import os
+sys.path.insert(0, os.path.abspath(
+    os.path.join(os.path.dirname(__file__), '..')))
+
+
+class FakeService:
+    def __init__(self, process):
+        self.process = process
+
+
+class FakeDriver:
+    """Driver cuyo 'servicio' es un proceso shell con un hijo, como chromedriver + chrome"""
+
+    def __init__(self):
+        process = subprocess.Popen(['sh', '-c', 'sleep 60 & wait'])
+        self.service = FakeService(process)
+        # Esperar a que el hijo exista para que se registre el árbol completo
+        root = psutil.Process(process.pid)
+        for _ in range(100):
+            if root.children():
+                break
+            threading.Event().wait(0.01)
+
+    def pids(self):
+        root = psutil.Process(self.service.process.pid)
+        return [root.pid] + [child.pid for child in root.children(recursive=True)]
+
+
+def is_alive(pid):
+    try:
+        return psutil.Process(pid).status() != psutil.STATUS_ZOMBIE
+    except psutil.NoSuchProcess:
+        return False
+
+
+def wait_dead(driver, pids):
+    driver.service.process.wait(timeout=5)
+    for _ in range(500):
+        if not any(is_alive(pid) for pid in pids):
+            return True
+        threading.Event().wait(0.01)
+    return False
+
+
+@pytest.fixture
+def driver():
+    driver = FakeDriver()
+    yield driver
+    # Seguridad: no dejar procesos vivos si el test falla
+    kill_driver_tree(driver)
+    for pid in driver_pids_safe(driver):
+        try:
+            psutil.Process(pid).kill()
+        except psutil.Error:
+            pass
+    driver.service.process.wait(timeout=5)
+
+
+def driver_pids_safe(driver):
+    try:
+        return driver.pids()
+    except psutil.Error:
+        return []
+
+
+def test_register_records_service_and_children(driver):
+    """Verifica que se registran el proceso del servicio y sus hijos"""
+    tree = register_driver(driver)
+    assert set(driver.pids()) == set(tree.processes)
+    assert len(tree.processes) == 2
+    unregister_driver(driver)
+
+
+def test_kill_driver_tree_only_kills_its_processes(driver):
+    """Verifica que solo se matan los procesos del driver indicado"""
+    other = FakeDriver()
+    try:
+        register_driver(driver)
+        register_driver(other)
+        pids = driver.pids()
+
+        assert kill_driver_tree(driver) == 2
+        assert wait_dead(driver, pids)
+        assert other.service.process.poll() is None
+    finally:
+        kill_driver_tree(other)
+        other.service.process.wait(timeout=5)
+
+
+def test_kill_unregistered_driver_is_noop():
+    """Verifica que matar un driver no registrado no hace nada"""
+    assert kill_driver_tree(object()) == 0
+
+
+def test_kill_owned_trees_uses_current_thread(driver):
+    """Verifica que kill_owned_trees mata los árboles del hilo actual"""
+    register_driver(driver)
+    pids = driver.pids()
+    assert kill_owned_trees() == 2
+    assert wait_dead(driver, pids)
+
+
+def test_reap_orphans_when_owner_thread_finished(driver):
+    """Verifica que el reaper mata árboles cuyo hilo propietario terminó"""
+    owner = threading.Thread(target=lambda: None)
+    owner.start()
+    owner.join()
+    register_driver(driver, owner=owner)
+    pids = driver.pids()
+
+    assert reap_orphans() == 2
+    assert wait_dead(driver, pids)
+
+
+def test_reap_orphans_skips_pool_owned_drivers(driver):
+    """Verifica que los drivers en el pool (sin propietario) no se reclaman"""
+    owner = threading.Thread(target=lambda: None)
+    owner.start()
+    owner.join()
+    register_driver(driver, owner=owner)
+    set_driver_owner(driver, None)
+
+    assert reap_orphans() == 0
+    assert driver.service.process.poll() is None
+
+
+def test_reap_orphans_when_request_finished(driver):
+    """Verifica que el reaper mata los drivers de una petición terminada aunque su hilo siga vivo"""
+    with driver_owner('req-1'):
+        register_driver(driver)
+        assert reap_orphans() == 0
+    pids = driver.pids()
+
+    assert threading.current_thread().is_alive()
+    assert reap_orphans() == 2
+    assert wait_dead(driver, pids)
+
+
+def test_kill_includes_children_spawned_after_register():
+    """Verifica que al matar el árbol se incluyen los procesos lanzados después del registro"""
+    # Like chrome spawning renderers: the child only starts when a line is written
+    process = subprocess.Popen(['sh', '-c', 'read line; sleep 60 & wait'], stdin=subprocess.PIPE)
+    driver = FakeDriver.__new__(FakeDriver)
+    driver.service = FakeService(process)
+    try:
+        tree = register_driver(driver)
+        assert list(tree.processes) == [process.pid]
+
+        process.stdin.write(b'go\n')
+        process.stdin.flush()
+        root = psutil.Process(process.pid)
+        for _ in range(100):
+            if root.children():
+                break
+            threading.Event().wait(0.01)
+        pids = driver.pids()
+
+        assert kill_driver_tree(driver) == 2
+        assert wait_dead(driver, pids)
+    finally:
+        for pid in driver_pids_safe(driver):
+            try:
+                psutil.Process(pid).kill()
+            except psutil.Error:
+                pass
+        process.wait(timeout=5)
+
+
+def test_reused_id_kills_previous_tree(driver):
+    """Verifica que si el id de un driver recolectado se reutiliza, su árbol se mata en vez de sobrescribirse"""
+    other = FakeDriver()
+    try:
+        register_driver(other)
+        pids = other.pids()
+        # Como si 'other' se hubiera recolectado y 'driver' ocupara su id
+        with driver_registry_module._lock:
+            driver_registry_module._trees[id(driver)] = driver_registry_module._trees.pop(id(other))
+
+        set_driver_owner(driver, None)
+        assert unregister_driver(driver) is None
+        assert driver_registry_module._trees[id(driver)].owner is not None
+
+        register_driver(driver)
+        assert wait_dead(other, pids)
+        assert driver_registry_module._trees[id(driver)].driver_ref() is driver
+    finally:
+        for pid in driver_pids_safe(other):
+            try:
+                psutil.Process(pid).kill()
+            except psutil.Error:
+                pass
+        other.service.process.wait(timeout=5)
@@ -0,0 +1,115 @@
+"""
+Pruebas para el resolvedor de binarios de drivers (actions/driver_resolver.py)
+"""
+import actions.driver_resolver as driver_resolver
+from actions.driver_resolver import (
+    get_chromedriver_path,
+    get_geckodriver_path,
+    invalidate_driver_manifest
+)
+import json
+import pytest
+import sys
+import os
+sys.path.insert(0, os.path.abspath(
+    os.path.join(os.path.dirname(__file__), '..')))
+
+
+@pytest.fixture
+def resolver(tmp_path, monkeypatch):
+    """Resolvedor aislado con manifiesto temporal y ChromeDriverManager simulado"""
+    driver_path = tmp_path / "chromedriver"
+    driver_path.write_text("")
+    installs = []
+
+    class FakeManager:
+        def install(self):
+            installs.append(1)
+            return str(driver_path)
+
+    state = {'version': '126.0.1'}
+    monkeypatch.delenv("DOCKERIZED", raising=False)
+    monkeypatch.setattr(driver_resolver, 'DRIVER_MANIFEST_PATH',
+                        str(tmp_path / "cache" / "manifest.json"))
+    monkeypatch.setattr(driver_resolver, 'ChromeDriverManager', FakeManager)
+    monkeypatch.setattr(driver_resolver, 'get_browser_version',
+                        lambda binary: state['version'])
+    monkeypatch.setattr(driver_resolver, '_resolved', {})
+    state['installs'] = installs
+    state['driver_path'] = driver_path
+    return state
+
+
+def test_chromedriver_resolved_once_per_process(resolver):
+    """Verifica que ChromeDriverManager solo se ejecuta una vez por proceso"""
+    first = get_chromedriver_path()
+    second = get_chromedriver_path()
+    assert first == second == str(resolver['driver_path'])
+    assert len(resolver['installs']) == 1
+
+
+def test_manifest_reused_by_new_process(resolver, monkeypatch):
+    """Verifica que un proceso nuevo reutiliza el manifiesto en disco"""
+    get_chromedriver_path()
+    monkeypatch.setattr(driver_resolver, '_resolved', {})
+    get_chromedriver_path()
+    assert len(resolver['installs']) == 1
+
+
+def test_manifest_keyed_by_browser_version(resolver, monkeypatch):
+    """Verifica que un cambio de versión del navegador fuerza una nueva resolución"""
+    get_chromedriver_path()
+    monkeypatch.setattr(driver_resolver, '_resolved', {})
+    resolver['version'] = '127.0.0'
+    get_chromedriver_path()
+    assert len(resolver['installs']) == 2
+
+    with open(driver_resolver.DRIVER_MANIFEST_PATH) as f:
+        manifest = json.load(f)
+    assert set(manifest['chromedriver']) == {'126.0.1', '127.0.0'}
+
+
+def test_unknown_version_not_persisted(resolver, monkeypatch):
+    """Verifica que sin versión conocida del navegador el driver no se guarda en el manifiesto"""
+    resolver['version'] = driver_resolver.UNKNOWN_VERSION
+    get_chromedriver_path()
+    monkeypatch.setattr(driver_resolver, '_resolved', {})
+    get_chromedriver_path()
+
+    assert len(resolver['installs']) == 2
+    assert not os.path.exists(driver_resolver.DRIVER_MANIFEST_PATH)
+
+
+def test_missing_driver_file_is_resolved_again(resolver, monkeypatch):
+    """Verifica que si el binario del manifiesto ya no existe se resuelve de nuevo"""
+    get_chromedriver_path()
+    monkeypatch.setattr(driver_resolver, '_resolved', {})
+    os.remove(resolver['driver_path'])
+    get_chromedriver_path()
+    assert len(resolver['installs']) == 2
+
+
+def test_invalidate_driver_manifest(resolver):
+    """Verifica que invalidar el manifiesto obliga a resolver de nuevo"""
+    get_chromedriver_path()
+    invalidate_driver_manifest('chromedriver')
+    get_chromedriver_path()
+    assert len(resolver['installs']) == 2
+
+
+def test_dockerized_uses_packaged_chromedriver(resolver, monkeypatch):
+    """Verifica que en Docker se usa el chromedriver del sistema sin resolver"""
+    monkeypatch.setenv("DOCKERIZED", "true")
+    assert get_chromedriver_path() == '/usr/bin/chromedriver'
+    assert resolver['installs'] == []
+
+
+def test_geckodriver_cached(resolver, monkeypatch):
+    """Verifica que la búsqueda de geckodriver se cachea por proceso"""
+    calls = []
+    monkeypatch.setattr(driver_resolver, '_first_existing',
+                        lambda candidates: calls.append(1) or None)
+    assert get_geckodriver_path() is None
+    probes = len(calls)
+    assert get_geckodriver_path() is None
+    assert len(calls) == probes
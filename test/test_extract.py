@@ -0,0 +1,126 @@
+"""
+Pruebas para la extracción de datos en bloque (actions/extract.py)
+"""
+import actions.extract as extract_module
+from actions.extract import extract, extract_pages, iter_extract, parse_schema
+from selenium.webdriver.common.by import By
+import utils.error as error_module
+from utils.error import messageError
+import pytest
+import sys
+import os
+sys.path.insert(0, os.path.abspath(
+    os.path.join(os.path.dirname(__file__), '..')))
+
+CONTAINER = (By.CSS_SELECTOR, 'table tbody')
+NEXT = (By.CSS_SELECTOR, 'button.next')
+
+
+class FakeDriver:
+    """Simula window.__sq.extract sobre páginas de filas ya serializadas"""
+
+    def __init__(self, pages):
+        self.pages = pages
+        self.page = 0
+        self.calls = []
+
+    def execute_script(self, script, *args):
+        assert 'window.__sq.extract' in script
+        container, rows, fields, offset, limit = args
+        self.calls.append((offset, limit))
+        data = self.pages[self.page]
+        return {'total': len(data), 'rows': data[offset:offset + limit]}
+
+
+class NextButton:
+    def __init__(self, driver):
+        self.driver = driver
+
+    def is_enabled(self):
+        return self.driver.page < len(self.driver.pages) - 1
+
+
+@pytest.fixture(autouse=True)
+def fake_page(monkeypatch):
+    """El contenedor siempre existe; el botón siguiente avanza de página"""
+    monkeypatch.setattr(error_module, 'STAGE', 'production')
+
+    def search_element(driver, locator, wait_to_search=True, raise_exception=True):
+        return NextButton(driver) if locator == NEXT else 'container'
+
+    def click_element(driver, element, locator=None):
+        driver.page += 1
+        return driver
+
+    monkeypatch.setattr(extract_module, 'search_element', search_element)
+    monkeypatch.setattr(extract_module, 'click_element', click_element)
+
+
+def rows(count, prefix='r'):
+    return [{'name': f"{prefix}{i}"} for i in range(count)]
+
+
+def test_parse_schema():
+    """Verifica el formato 'selector@atributo', el texto por defecto y las tuplas"""
+    fields = parse_schema({
+        'name': 'td.name',
+        'link': 'a@href',
+        'id': '@data-id',
+        'price': ('span.price', 'data-value'),
+    })
+
+    assert fields == [
+        ['name', 'td.name', None],
+        ['link', 'a', 'href'],
+        ['id', '', 'data-id'],
+        ['price', 'span.price', 'data-value'],
+    ]
+
+
+def test_extract_one_script_per_chunk():
+    """Verifica que 1.200 filas se leen con 3 execute_script (bloques de 500)"""
+    driver = FakeDriver([rows(1200)])
+
+    result = extract(driver, CONTAINER, {'name': 'td'}, rows='tr', chunk_size=500)
+
+    assert len(result) == 1200
+    assert result[-1] == {'name': 'r1199'}
+    assert driver.calls == [(0, 500), (500, 500), (1000, 500)]
+
+
+def test_iter_extract_streams_chunks():
+    """Verifica que los bloques se piden a medida que se consumen"""
+    driver = FakeDriver([rows(5)])
+    chunks = iter_extract(driver, CONTAINER, {'name': 'td'}, chunk_size=2)
+
+    assert next(chunks) == rows(2)
+    assert len(driver.calls) == 1
+    assert [len(chunk) for chunk in chunks] == [2, 1]
+
+
+def test_extract_pages_until_last_page():
+    """Verifica que se recorren las páginas hasta que el botón siguiente se deshabilita"""
+    driver = FakeDriver([rows(2, 'a'), rows(2, 'b'), rows(1, 'c')])
+
+    result = extract_pages(driver, CONTAINER, {'name': 'td'}, NEXT)
+
+    assert [row['name'] for row in result] == ['a0', 'a1', 'b0', 'b1', 'c0']
+
+
+def test_extract_pages_respects_max_pages():
+    """Verifica que no se pasa de max_pages"""
+    driver = FakeDriver([rows(1, 'a'), rows(1, 'b'), rows(1, 'c')])
+
+    result = extract_pages(driver, CONTAINER, {'name': 'td'}, NEXT, max_pages=2)
+
+    assert [row['name'] for row in result] == ['a0', 'b0']
+    assert driver.page == 1
+
+
+def test_extract_error():
+    """Verifica que un fallo del script se convierte en messageError"""
+    driver = FakeDriver([rows(1)])
+    driver.execute_script = lambda script, *args: None
+
+    with pytest.raises(messageError):
+        extract(driver, CONTAINER, {'name': 'td'})
@@ -1,15 +1,25 @@
 """
 Pruebas para el archivo file_manager.py
 """
+from utils.config import HTTP_POOL_SIZE
 from utils.error import messageError
+import utils.file_manager as file_manager_module
 from utils.file_manager import (
     clear_directory,
     create_download_directory,
+    create_download_directory_once,
     clean_filename,
     get_file,
-    createTempFile
+    createTempFile,
+    get_http_session,
+    iter_base64_decode,
+    save_file,
+    temp_file
 )
 import base64
+import io
+import pytest
+import requests
 import tempfile
 import sys
 import os
@@ -45,6 +55,22 @@ def test_create_download_directory_already_exists():
             os.chdir(old_cwd)
 
 
+def test_create_download_directory_once():
+    """Verifica que el directorio solo se crea la primera vez por proceso"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        old_cwd = os.getcwd()
+        try:
+            os.chdir(temp_dir)
+            result = create_download_directory_once("once_downloads")
+            assert os.path.isdir(result)
+
+            os.rmdir(result)
+            create_download_directory_once("once_downloads")
+            assert not os.path.exists(result)
+        finally:
+            os.chdir(old_cwd)
+
+
 def test_clean_filename_basic():
     """Verifica limpieza básica de nombres de archivo"""
     # El punto también se elimina según la implementación
@@ -101,7 +127,7 @@ def test_clear_directory_with_files():
 
 
 def test_clear_directory_nested():
-    """Verifica que se limpian subdirectorios recursivamente"""
+    """Verifica que se eliminan los subdirectorios con su contenido"""
     with tempfile.TemporaryDirectory() as temp_dir:
         # Crear estructura de directorios
         subdir = os.path.join(temp_dir, "subdir")
@@ -116,8 +142,10 @@ def test_clear_directory_nested():
         # Limpiar directorio
         clear_directory(temp_dir)
 
-        # Verificar que se eliminó el archivo anidado
+        # Verificar que se eliminaron el archivo anidado y el subdirectorio
         assert not os.path.exists(test_file)
+        assert not os.path.exists(subdir)
+        assert os.path.isdir(temp_dir)
 
 
 def test_clear_directory_nonexistent():
@@ -210,3 +238,112 @@ def test_clean_filename_only_special_chars():
     """Verifica limpieza cuando solo hay caracteres especiales"""
     result = clean_filename("@#$%^&*()")
     assert result == ""
+
+
+class FakeResponse:
+    """Respuesta de requests en streaming que genera los bloques al vuelo"""
+
+    def __init__(self, chunks, headers=None, status_error=None):
+        self.chunks = chunks
+        self.headers = headers or {}
+        self.status_error = status_error
+
+    def raise_for_status(self):
+        if self.status_error:
+            raise self.status_error
+
+    def iter_content(self, chunk_size):
+        return iter(self.chunks)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        return False
+
+
+class FakeSession:
+    def __init__(self, response):
+        self.response = response
+        self.calls = []
+
+    def get(self, url, **kwargs):
+        self.calls.append((url, kwargs))
+        return self.response
+
+
+def test_save_file_streams_url(monkeypatch, tmp_path):
+    """Verifica que una URL se descarga por bloques sin cargarla entera en memoria"""
+    import tracemalloc
+    chunk = b'x' * (1024 * 1024)
+    session = FakeSession(FakeResponse(chunk for _ in range(32)))
+    monkeypatch.setattr(file_manager_module, 'get_http_session', lambda: session)
+
+    tracemalloc.start()
+    path = save_file('https://example.com/files/report%20final.pdf?token=1', str(tmp_path))
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    assert path == str(tmp_path / 'report final.pdf')
+    assert os.path.getsize(path) == 32 * 1024 * 1024
+    assert peak < 8 * 1024 * 1024
+    assert session.calls[0][1]['stream'] is True
+    assert os.listdir(tmp_path) == ['report final.pdf']
+
+
+def test_save_file_content_disposition_name(monkeypatch, tmp_path):
+    """Verifica que se usa el nombre de Content-Disposition sin permitir rutas"""
+    response = FakeResponse([b'data'], {'Content-Disposition': 'attachment; filename="../../etc/factura.pdf"'})
+    monkeypatch.setattr(file_manager_module, 'get_http_session', lambda: FakeSession(response))
+
+    path = save_file('https://example.com/download?id=7', str(tmp_path))
+
+    assert path == str(tmp_path / 'factura.pdf')
+
+
+def test_save_file_failed_download_leaves_nothing(monkeypatch, tmp_path):
+    """Verifica que un fallo a mitad de descarga no deja archivos parciales"""
+    def broken():
+        yield b'first'
+        raise requests.ConnectionError('connection reset')
+
+    monkeypatch.setattr(file_manager_module, 'get_http_session', lambda: FakeSession(FakeResponse(broken())))
+
+    with pytest.raises(messageError) as error:
+        save_file('https://example.com/big.zip', str(tmp_path))
+    assert 'Error al descargar el archivo' in str(error.value)
+    assert os.listdir(tmp_path) == []
+
+
+def test_save_file_base64_and_binary(tmp_path):
+    """Verifica la decodificación Base64 por bloques (con saltos de línea) y los binarios"""
+    original = os.urandom(10000)
+    wrapped = base64.encodebytes(original).decode('ascii')  # 76 chars per line
+
+    path = save_file(wrapped, str(tmp_path), 'doc.pdf', chunk_size=1000)
+    with open(path, 'rb') as f:
+        assert f.read() == original
+
+    assert b''.join(iter_base64_decode(wrapped, chunk_size=7)) == original
+    with pytest.raises(messageError):
+        save_file('QUJDR', str(tmp_path), 'bad.pdf')
+
+    path = save_file(io.BytesIO(b'stream'), str(tmp_path), chunk_size=2)
+    assert path.endswith('.bin')
+    with open(path, 'rb') as f:
+        assert f.read() == b'stream'
+
+
+def test_temp_file_removed_after_block():
+    """Verifica que temp_file borra el archivo al salir del bloque"""
+    with temp_file(b'content', 'upload.txt') as path:
+        assert os.path.exists(path)
+    assert not os.path.exists(path)
+
+
+def test_http_session_is_shared():
+    """Verifica que la sesión HTTP se reutiliza con un pool de conexiones"""
+    session = get_http_session()
+
+    assert get_http_session() is session
+    assert session.get_adapter('https://example.com')._pool_maxsize == HTTP_POOL_SIZE
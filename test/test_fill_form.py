@@ -0,0 +1,64 @@
+"""
+Pruebas para el rellenado de formularios en bloque (actions/fill_form.py)
+"""
+import actions.fill_form as fill_form_module
+from actions.fill_form import fill_form
+from selenium.webdriver.common.by import By
+from utils.error import messageError
+import pytest
+import sys
+import os
+sys.path.insert(0, os.path.abspath(
+    os.path.join(os.path.dirname(__file__), '..')))
+
+
+class FakeDriver:
+    def __init__(self, statuses):
+        self.statuses = statuses
+        self.scripts = []
+
+    def execute_script(self, script, *args):
+        self.scripts.append(args)
+        return self.statuses
+
+
+@pytest.fixture
+def written(monkeypatch):
+    """Registra los campos escritos uno a uno con write_element"""
+    written = []
+    monkeypatch.setattr(fill_form_module, 'search_element', lambda driver, locator: locator)
+    monkeypatch.setattr(fill_form_module, 'write_element',
+                        lambda driver, element, text, clear=True: written.append((element, text)) or driver)
+    return written
+
+
+def test_fill_form_single_round_trip(written):
+    """Verifica que todos los campos se envían en un único execute_script"""
+    driver = FakeDriver(['ok', 'ok'])
+    fill_form(driver, {(By.ID, 'user'): 'ana', (By.NAME, 'age'): 30})
+
+    assert len(driver.scripts) == 1
+    assert driver.scripts[0][0] == [['id', 'user', 'ana', True], ['name', 'age', '30', True]]
+    assert written == []
+
+
+def test_fill_form_falls_back_only_for_failed_fields(written):
+    """Verifica que solo los campos no verificados se escriben con write_element"""
+    driver = FakeDriver(['ok', 'unverified', 'missing'])
+    fill_form(driver, {
+        (By.ID, 'user'): 'ana',
+        (By.CSS_SELECTOR, '.masked'): '123',
+        (By.LINK_TEXT, 'Otro'): 'x',
+    })
+
+    assert written == [((By.CSS_SELECTOR, '.masked'), '123'), ((By.LINK_TEXT, 'Otro'), 'x')]
+
+
+def test_fill_form_raises_message_error(monkeypatch):
+    """Verifica que un campo que tampoco se puede escribir uno a uno lanza messageError"""
+    def fail(driver, locator):
+        raise messageError("not found")
+
+    monkeypatch.setattr(fill_form_module, 'search_element', fail)
+    with pytest.raises(messageError):
+        fill_form(FakeDriver(['missing']), {(By.ID, 'user'): 'ana'})
@@ -0,0 +1,148 @@
+"""
+Pruebas para el endpoint de lotes (utils/handle_batch.py)
+"""
+import utils.download_sandbox as download_sandbox_module
+import utils.handle_batch as handle_batch_module
+from utils.handle_batch import run_batch
+from main import app
+import json
+import threading
+import time
+import pytest
+import sys
+import os
+sys.path.insert(0, os.path.abspath(
+    os.path.join(os.path.dirname(__file__), '..')))
+
+
+@pytest.fixture(autouse=True)
+def download_dir(tmp_path, monkeypatch):
+    # Los sandboxes de descarga van a tmp_path, no al temp_downloads/ del repositorio
+    monkeypatch.setattr(download_sandbox_module, 'DOWNLOAD_DIR', str(tmp_path / 'downloads'))
+    monkeypatch.setattr(download_sandbox_module, 'register_maintenance_task', lambda *args: None)
+    return tmp_path / 'downloads'
+
+
+@pytest.fixture
+def client():
+    app.config['TESTING'] = True
+    with app.test_client() as client:
+        yield client
+
+
+def parse(lines):
+    return [json.loads(line) for line in lines]
+
+
+def test_run_batch_reports_every_item_and_summary():
+    """Verifica que hay una línea por item y un resumen final"""
+    results = parse(run_batch(lambda data: data['n'] * 2, [{'n': 1}, {'n': 2}, {'n': 3}], 2, 5))
+    items, summary = results[:-1], results[-1]
+
+    assert sorted(item['index'] for item in items) == [0, 1, 2]
+    assert {item['index']: item['message'] for item in items} == {0: 2, 1: 4, 2: 6}
+    assert all(item['status'] == 'OK' and 'time' in item for item in items)
+    assert summary['summary'] is True
+    assert summary['status'] == 'OK'
+    assert summary['message'] == {'total': 3, 'succeeded': 3, 'failed': 0}
+
+
+def test_run_batch_partial_failure():
+    """Verifica que los fallos se reportan por item y el resumen es PARTIAL"""
+    def controller(data):
+        if data.get('fail'):
+            raise ValueError("bad item")
+        return 'ok'
+
+    results = parse(run_batch(controller, [{}, {'fail': True}], 2, 5))
+    failed = next(item for item in results if item.get('index') == 1)
+
+    assert failed['status'] == 'ERROR'
+    assert 'bad item' in failed['message']
+    assert results[-1]['status'] == 'PARTIAL'
+
+
+def test_run_batch_item_timeout(monkeypatch):
+    """Verifica que un item lento se reporta como timeout sin bloquear al resto y se matan sus navegadores"""
+    release = threading.Event()
+    killed = []
+    monkeypatch.setattr(handle_batch_module, 'kill_owned_trees', lambda owner: killed.append(owner.label))
+
+    def controller(data):
+        if data.get('slow'):
+            release.wait(5)
+        return 'ok'
+
+    try:
+        results = parse(run_batch(controller, [{'slow': True}, {}], 2, 0.2))
+    finally:
+        release.set()
+    slow = next(item for item in results if item.get('index') == 0)
+
+    assert slow['status'] == 'ERROR'
+    assert 'Timed out' in slow['message']
+    assert results[-1]['message']['succeeded'] == 1
+    assert killed == ['0']
+
+
+def test_run_batch_streams_in_completion_order():
+    """Verifica que los resultados se emiten en cuanto terminan"""
+    first_done = threading.Event()
+
+    def controller(data):
+        if data['n'] == 0:
+            first_done.wait(5)
+            time.sleep(0.2)
+        else:
+            first_done.set()
+        return data['n']
+
+    results = parse(run_batch(controller, [{'n': 0}, {'n': 1}], 2, 5))
+    assert [item['index'] for item in results[:-1]] == [1, 0]
+
+
+def test_batch_endpoint_requires_auth(client):
+    """Verifica que /batch requiere autenticación"""
+    response = client.post('/batch/sample', json=[{}])
+    assert response.status_code == 401
+
+
+def test_batch_endpoint_unknown_controller(client):
+    """Verifica que un controlador desconocido devuelve 404, solo después de autenticar"""
+    assert client.post('/batch/unknown', json=[{}]).status_code == 401
+    headers = {"Authorization": "Bearer sample"}
+    response = client.post('/batch/unknown', headers=headers, json=[{}])
+    assert response.status_code == 404
+
+
+def test_batch_concurrency_capped_by_driver_pool(client, monkeypatch):
+    """Verifica que la concurrencia pedida no supera el tamaño del pool de drivers"""
+    calls = []
+    monkeypatch.setattr(handle_batch_module, 'DRIVER_POOL_SIZE', 2)
+    monkeypatch.setattr(handle_batch_module, 'run_batch', lambda controller, items, concurrency, *args:
+                        calls.append(concurrency) or iter([]))
+    headers = {"Authorization": "Bearer sample"}
+
+    client.post('/batch/sample', headers=headers, json={'items': [{}], 'concurrency': 8})
+    assert calls == [2]
+
+
+def test_batch_endpoint_requires_items(client):
+    """Verifica que se rechaza un lote vacío"""
+    headers = {"Authorization": "Bearer sample"}
+    response = client.post('/batch/sample', headers=headers, json={'items': []})
+    assert response.status_code == 400
+
+
+def test_batch_endpoint_streams_ndjson(client):
+    """Verifica que la respuesta es NDJSON con una línea por item y el resumen"""
+    headers = {"Authorization": "Bearer sample"}
+    response = client.post('/batch/sample', headers=headers, json={'items': [{}, {}]})
+
+    assert response.status_code == 200
+    assert response.mimetype == 'application/x-ndjson'
+    lines = parse(response.data.decode().splitlines())
+    assert len(lines) == 3
+    # Sin username/password el controlador falla en ambos items
+    assert all(line['status'] == 'ERROR' for line in lines[:-1])
+    assert lines[-1]['message']['failed'] == 2
@@ -1,6 +1,7 @@
 """
 Pruebas para el archivo handle_request.py
 """
+import utils.download_sandbox as download_sandbox_module
 from main import app
 import json
 import pytest
@@ -10,6 +11,14 @@ sys.path.insert(0, os.path.abspath(
     os.path.join(os.path.dirname(__file__), '..')))
 
 
+@pytest.fixture(autouse=True)
+def download_dir(tmp_path, monkeypatch):
+    # Los sandboxes de descarga van a tmp_path, no al temp_downloads/ del repositorio
+    monkeypatch.setattr(download_sandbox_module, 'DOWNLOAD_DIR', str(tmp_path / 'downloads'))
+    monkeypatch.setattr(download_sandbox_module, 'register_maintenance_task', lambda *args: None)
+    return tmp_path / 'downloads'
+
+
 @pytest.fixture
 def client():
     app.config['TESTING'] = True
@@ -0,0 +1,226 @@
+"""
+Pruebas para la cola de trabajos asíncronos (utils/jobs.py y endpoints /jobs)
+"""
+import utils.download_sandbox as download_sandbox_module
+import utils.jobs as jobs
+from utils.jobs import (
+    DONE,
+    FAILED,
+    QUEUED,
+    RUNNING,
+    JobWorkerPool,
+    claim_next_job,
+    enqueue_job,
+    get_job,
+    recover_jobs
+)
+import json
+import time
+import pytest
+import sys
+import os
+sys.path.insert(0, os.path.abspath(
+    os.path.join(os.path.dirname(__file__), '..')))
+
+
+@pytest.fixture(autouse=True)
+def download_dir(tmp_path, monkeypatch):
+    # Los sandboxes de descarga van a tmp_path, no al temp_downloads/ del repositorio
+    monkeypatch.setattr(download_sandbox_module, 'DOWNLOAD_DIR', str(tmp_path / 'downloads'))
+    monkeypatch.setattr(download_sandbox_module, 'register_maintenance_task', lambda *args: None)
+    return tmp_path / 'downloads'
+
+
+@pytest.fixture(autouse=True)
+def job_store(tmp_path, monkeypatch):
+    """Base de datos de trabajos temporal y sin workers en segundo plano"""
+    jobs.stop_job_workers()
+    monkeypatch.setattr(jobs, 'JOBS_DB_PATH', str(tmp_path / "jobs.sqlite3"))
+    yield
+
+
+def test_enqueue_and_get_job():
+    """Verifica que un trabajo encolado se puede consultar"""
+    job_id = enqueue_job('sample', {'username': 'user'})
+    job = get_job(job_id)
+    assert job['id'] == job_id
+    assert job['status'] == QUEUED
+    assert job['controller'] == 'sample'
+    assert 'payload' not in job
+
+
+def test_get_unknown_job():
+    """Verifica que un id inexistente devuelve None"""
+    assert get_job('does-not-exist') is None
+
+
+def test_claim_is_fifo_and_exclusive():
+    """Verifica que los trabajos se reclaman en orden y una sola vez"""
+    first = enqueue_job('sample', {'n': 1})
+    second = enqueue_job('sample', {'n': 2})
+    assert claim_next_job('w1')['id'] == first
+    assert claim_next_job('w2')['id'] == second
+    assert claim_next_job('w3') is None
+    assert get_job(first)['status'] == RUNNING
+
+
+def test_worker_runs_controller_and_stores_result():
+    """Verifica que el worker ejecuta el controlador y guarda el resultado"""
+    pool = JobWorkerPool({'echo': lambda data: {'echo': data['value']}}, workers=0)
+    job_id = enqueue_job('echo', {'value': 42})
+    assert pool.run_next('test-worker') is True
+
+    job = get_job(job_id)
+    assert job['status'] == DONE
+    assert job['result'] == {'echo': 42}
+    assert job['finished_at'] >= job['started_at']
+
+
+def test_worker_records_controller_errors():
+    """Verifica que los errores del controlador dejan el trabajo como fallido"""
+    def failing(data):
+        raise RuntimeError("boom")
+
+    pool = JobWorkerPool({'fail': failing}, workers=0)
+    job_id = enqueue_job('fail', {})
+    pool.run_next('test-worker')
+
+    job = get_job(job_id)
+    assert job['status'] == FAILED
+    assert 'boom' in job['error']
+
+
+def test_worker_records_errors_without_message():
+    """Verifica que una excepción sin mensaje también deja el trabajo como fallido"""
+    def timeout(data):
+        raise TimeoutError()
+
+    pool = JobWorkerPool({'timeout': timeout}, workers=0)
+    job_id = enqueue_job('timeout', {})
+    pool.run_next('test-worker')
+
+    job = get_job(job_id)
+    assert job['status'] == FAILED
+    assert job['error'] == 'TimeoutError()'
+    assert job['result'] is None
+
+
+def test_payload_removed_after_finishing():
+    """Verifica que el payload (con posibles credenciales) se borra al terminar"""
+    pool = JobWorkerPool({'echo': lambda data: 'ok'}, workers=0)
+    enqueue_job('echo', {'password': 'secret'})
+    pool.run_next('test-worker')
+
+    with jobs._connect() as connection:
+        payloads = [row[0] for row in connection.execute("SELECT payload FROM jobs")]
+    assert payloads == [None]
+
+
+def test_recover_jobs_of_dead_process():
+    """Verifica que los trabajos de un proceso muerto vuelven a la cola"""
+    job_id = enqueue_job('sample', {})
+    dead_worker = f"{jobs.socket.gethostname()}:999999:0.0:job-worker-0"
+    claim_next_job(dead_worker)
+
+    assert recover_jobs() == 1
+    assert get_job(job_id)['status'] == QUEUED
+
+
+def test_recover_jobs_keeps_live_process():
+    """Verifica que no se reencolan trabajos de procesos vivos"""
+    job_id = enqueue_job('sample', {})
+    claim_next_job(f"{jobs._process_id()}:job-worker-0")
+
+    assert recover_jobs() == 0
+    assert get_job(job_id)['status'] == RUNNING
+
+
+def expire_lease(job_id, seconds=1000):
+    with jobs._connect() as connection:
+        connection.execute("UPDATE jobs SET heartbeat_at = ? WHERE id = ?", (time.time() - seconds, job_id))
+
+
+def test_recover_jobs_with_expired_lease_on_any_host():
+    """Verifica que un trabajo sin heartbeat vuelve a la cola aunque su worker sea de otro host"""
+    job_id = enqueue_job('sample', {})
+    claim_next_job("other-host:1:0.0:job-worker-0")
+    assert recover_jobs(lease_timeout=60) == 0
+
+    expire_lease(job_id)
+    assert recover_jobs(lease_timeout=60) == 1
+    assert get_job(job_id)['status'] == QUEUED
+
+
+def test_heartbeat_renews_lease_and_discards_late_result(monkeypatch):
+    """Verifica que el heartbeat mantiene el trabajo y que el resultado de un trabajo reencolado se descarta"""
+    tasks = []
+    monkeypatch.setattr(jobs, 'register_maintenance_task', lambda *args: tasks.append(args))
+    JobWorkerPool({}, workers=0).start()
+    assert [task[0] for task in tasks] == ['job_heartbeat']
+
+    statuses = []
+
+    def slow(data):
+        with jobs._connect() as connection:
+            job_id = connection.execute("SELECT id FROM jobs WHERE status = ?", (RUNNING,)).fetchone()[0]
+        expire_lease(job_id)
+        pool.heartbeat()
+        statuses.append(get_job(job_id)['status'])
+        if data.get('lost'):
+            expire_lease(job_id)
+            recover_jobs(lease_timeout=60)
+        return 'done'
+
+    pool = JobWorkerPool({'slow': slow}, workers=1)
+    kept = enqueue_job('slow', {})
+    pool.run_next('test-worker')
+    lost = enqueue_job('slow', {'lost': True})
+    pool.run_next('test-worker')
+
+    assert statuses == [RUNNING, RUNNING]
+    assert get_job(kept)['status'] == DONE
+    assert get_job(lost)['status'] == QUEUED
+    assert get_job(lost)['result'] is None
+
+
+class TestJobEndpoints:
+    """Tests para los endpoints /jobs en Flask"""
+
+    @pytest.fixture
+    def client(self):
+        from main import app
+        jobs.stop_job_workers()
+        app.config['TESTING'] = True
+        with app.test_client() as client:
+            yield client
+
+    def test_submit_requires_auth(self, client):
+        """Verifica que POST /jobs requiere autenticación"""
+        response = client.post('/jobs', json={'controller': 'sample'})
+        assert response.status_code == 401
+
+    def test_submit_unknown_controller(self, client):
+        """Verifica que se rechaza un controlador desconocido"""
+        headers = {"Authorization": "Bearer sample"}
+        response = client.post('/jobs', headers=headers, json={'controller': 'nope'})
+        assert response.status_code == 400
+
+    def test_submit_and_poll_job(self, client):
+        """Verifica que se devuelve un id y su estado se puede consultar"""
+        headers = {"Authorization": "Bearer sample"}
+        response = client.post('/jobs', headers=headers, json={
+            'controller': 'sample', 'data': {'username': 'u', 'password': 'p'}})
+        assert response.status_code == 202
+        job_id = json.loads(response.data)['message']['id']
+
+        response = client.get(f'/jobs/{job_id}', headers=headers)
+        assert response.status_code == 200
+        data = json.loads(response.data)
+        assert data['status'] == 'OK'
+        assert data['message']['status'] == QUEUED
+
+    def test_status_unknown_job(self, client):
+        """Verifica que un trabajo inexistente devuelve 404"""
+        headers = {"Authorization": "Bearer sample"}
+        response = client.get('/jobs/unknown', headers=headers)
+        assert response.status_code == 404
@@ -1,6 +1,7 @@
 """
 Pruebas para el archivo main.py usando pytest y Flask.
 """
+import utils.download_sandbox as download_sandbox_module
 from main import app
 import pytest
 import sys
@@ -9,6 +10,14 @@ sys.path.insert(0, os.path.abspath(
     os.path.join(os.path.dirname(__file__), '..')))
 
 
+@pytest.fixture(autouse=True)
+def download_dir(tmp_path, monkeypatch):
+    # Los sandboxes de descarga van a tmp_path, no al temp_downloads/ del repositorio
+    monkeypatch.setattr(download_sandbox_module, 'DOWNLOAD_DIR', str(tmp_path / 'downloads'))
+    monkeypatch.setattr(download_sandbox_module, 'register_maintenance_task', lambda *args: None)
+    return tmp_path / 'downloads'
+
+
 @pytest.fixture
 def client():
     app.config['TESTING'] = True
@@ -36,6 +45,23 @@ def test_sample_endpoint_missing_data(client):
     response = client.get('/sample', headers=headers, json={})
     assert response.status_code == 400  # Bad Request
 
+
+def test_sample_endpoint_returns_request_id(client):
+    """Verifica que la respuesta devuelve el X-Request-ID enviado por el cliente"""
+    headers = {"Authorization": "Bearer sample", "X-Request-ID": "client-42"}
+    response = client.get('/sample', headers=headers, json={})
+    assert response.headers['X-Request-ID'] == 'client-42'
+
+
+def test_logs_endpoint(client):
+    """Verifica la autenticación y validación de /logs"""
+    assert client.get('/logs?request_id=abc').status_code == 401
+    headers = {"Authorization": "Bearer sample"}
+    assert client.get('/logs', headers=headers).status_code == 400
+    response = client.get('/logs?request_id=does-not-exist', headers=headers)
+    assert response.status_code == 200
+    assert response.json['message'] == []
+
 # NOTA: El test del endpoint /sample con Selenium se omite en CI/CD porque
 # requiere ChromeDriver y un navegador, lo cual no está disponible en el entorno de pruebas.
 # Para tests de integración completos, se recomienda usar mocks o un entorno con Selenium instalado.
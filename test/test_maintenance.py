@@ -0,0 +1,73 @@
+"""
+Pruebas para el planificador de mantenimiento (utils/maintenance.py)
+"""
+import utils.logging_config as logging_config
+from utils.maintenance import (
+    MaintenanceTask,
+    maintenance_stats,
+    register_maintenance_task
+)
+import threading
+import sys
+import os
+sys.path.insert(0, os.path.abspath(
+    os.path.join(os.path.dirname(__file__), '..')))
+
+
+def test_task_run_records_duration():
+    """Verifica que cada ejecución registra su duración"""
+    task = MaintenanceTask('sleepy', lambda: threading.Event().wait(0.01), 60)
+    task.run()
+
+    stats = task.stats()
+    assert stats['runs'] == 1
+    assert stats['failures'] == 0
+    assert stats['last_duration'] >= 0.01
+    assert stats['max_duration'] == stats['last_duration']
+
+
+def test_task_failure_is_recorded_not_raised():
+    """Verifica que un fallo se registra sin romper el planificador"""
+    def failing():
+        raise RuntimeError("disk full")
+
+    task = MaintenanceTask('failing', failing, 60)
+    task.run()
+
+    stats = task.stats()
+    assert stats['failures'] == 1
+    assert stats['last_error'] == "disk full"
+
+
+def test_task_reschedules_after_interval():
+    """Verifica que la siguiente ejecución se programa según el intervalo"""
+    task = MaintenanceTask('noop', lambda: None, 60)
+    first_run = task.next_run
+    task.run()
+    assert task.next_run >= first_run + 60
+
+
+def test_registered_task_runs_in_background():
+    """Verifica que una tarea registrada se ejecuta en el hilo de mantenimiento"""
+    ran = threading.Event()
+    register_maintenance_task('test_background', ran.set, 3600)
+
+    assert ran.wait(2)
+    assert 'test_background' in maintenance_stats()
+
+
+def test_configure_logger_only_sets_up_once(monkeypatch):
+    """Verifica que configure_logger no repite la configuración en cada petición"""
+    calls = []
+
+    def fake_setup():
+        calls.append(1)
+        logging_config._configured = True
+
+    monkeypatch.setattr(logging_config, '_configured', False)
+    monkeypatch.setattr(logging_config, '_setup_log_file', fake_setup)
+
+    logging_config.configure_logger()
+    logging_config.configure_logger()
+    logging_config.configure_logger()
+    assert len(calls) == 1
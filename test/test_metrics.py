@@ -0,0 +1,133 @@
+"""
+Pruebas para la instrumentación de acciones (utils/metrics.py y endpoint /metrics)
+"""
+import utils.metrics as metrics_module
+from utils.metrics import (
+    count_strategy,
+    instrument,
+    observe_action,
+    register_metrics_collector,
+    render_metrics,
+    render_worker_metrics,
+    reset_metrics,
+    write_metrics_snapshot
+)
+import json
+import psutil
+import pytest
+import sys
+import os
+sys.path.insert(0, os.path.abspath(
+    os.path.join(os.path.dirname(__file__), '..')))
+
+
+@pytest.fixture(autouse=True)
+def clean_metrics():
+    reset_metrics()
+    yield
+    reset_metrics()
+
+
+@pytest.fixture
+def client():
+    from main import app
+    app.config['TESTING'] = True
+    with app.test_client() as client:
+        yield client
+
+
+def test_instrument_records_latency_histogram():
+    """Verifica que el decorador registra cada llamada en el histograma"""
+    @instrument
+    def fake_action(value):
+        return value * 2
+
+    assert fake_action(2) == 4
+    assert fake_action(3) == 6
+    assert fake_action.__name__ == 'fake_action'
+
+    output = render_metrics()
+    assert 'scraper_action_duration_seconds_count{action="fake_action"} 2' in output
+    assert 'scraper_action_duration_seconds_bucket{action="fake_action",le="+Inf"} 2' in output
+    assert 'scraper_action_failures_total{action="fake_action"}' not in output
+
+
+def test_instrument_counts_failures():
+    """Verifica que las excepciones se cuentan como fallos y se propagan"""
+    @instrument(name='custom_action')
+    def failing_action():
+        raise ValueError("boom")
+
+    with pytest.raises(ValueError):
+        failing_action()
+
+    output = render_metrics()
+    assert 'scraper_action_failures_total{action="custom_action"} 1' in output
+    assert 'scraper_action_duration_seconds_count{action="custom_action"} 1' in output
+
+
+def test_histogram_buckets_are_cumulative():
+    """Verifica que los buckets del histograma son acumulativos"""
+    from utils.metrics import observe_action
+    observe_action('timed', 0.001)
+    observe_action('timed', 0.3)
+    observe_action('timed', 100)
+
+    output = render_metrics()
+    assert 'scraper_action_duration_seconds_bucket{action="timed",le="0.005"} 1' in output
+    assert 'scraper_action_duration_seconds_bucket{action="timed",le="0.5"} 2' in output
+    assert 'scraper_action_duration_seconds_bucket{action="timed",le="60"} 2' in output
+    assert 'scraper_action_duration_seconds_bucket{action="timed",le="+Inf"} 3' in output
+
+
+def test_strategy_counters():
+    """Verifica los contadores de estrategia de fallback"""
+    count_strategy('click_element', 'javascript')
+    count_strategy('click_element', 'javascript')
+    count_strategy('click_element', 'basic')
+
+    output = render_metrics()
+    assert 'scraper_action_strategy_total{action="click_element",strategy="javascript"} 2' in output
+    assert 'scraper_action_strategy_total{action="click_element",strategy="basic"} 1' in output
+
+
+def test_collectors_and_label_escaping():
+    """Verifica las métricas de colectores externos y el escapado de etiquetas"""
+    register_metrics_collector('test', lambda: [
+        ('scraper_test_gauge', 'gauge', 'Test gauge.', [({'name': 'a"b'}, 1.5)])])
+
+    output = render_metrics()
+    assert '# TYPE scraper_test_gauge gauge' in output
+    assert 'scraper_test_gauge{name="a\\"b"} 1.5' in output
+
+
+def test_worker_metrics_merged_from_snapshots(tmp_path, monkeypatch):
+    """Verifica que /metrics une las métricas de los workers vivos con su etiqueta worker y borra las de los muertos"""
+    monkeypatch.setattr(metrics_module, 'METRICS_DIR', str(tmp_path))
+    observe_action('timed', 0.1)
+    write_metrics_snapshot()  # la propia no se lee: se usan los valores actuales
+    observe_action('timed', 0.1)
+
+    other = os.getppid()
+    other_start = int(psutil.Process(other).create_time())
+    (tmp_path / f"{other}-{other_start}.json").write_text(json.dumps([
+        ['scraper_action_failures_total', 'counter', 'Browser actions that raised an error.',
+         [['scraper_action_failures_total', {'action': 'timed'}, 3]]]]))
+    dead = tmp_path / '999999999-0.json'
+    dead.write_text('[]')
+
+    output = render_worker_metrics()
+    assert f'scraper_action_duration_seconds_count{{action="timed",worker="{os.getpid()}"}} 2' in output
+    assert f'scraper_action_failures_total{{action="timed",worker="{other}"}} 3' in output
+    assert output.count('# TYPE scraper_action_failures_total counter') == 1
+    assert not dead.exists()
+
+
+def test_metrics_endpoint(client):
+    """Verifica que /metrics requiere token y responde en formato Prometheus"""
+    assert client.get('/metrics').status_code == 401
+
+    response = client.get('/metrics', headers={"Authorization": "Bearer sample"})
+    assert response.status_code == 200
+    assert response.content_type.startswith('text/plain; version=0.0.4')
+    assert b'# TYPE scraper_action_duration_seconds histogram' in response.data
@@ -0,0 +1,72 @@
+"""
+Pruebas para la librería de helpers JavaScript (actions/page_helpers.py)
+"""
+from actions.page_helpers import (
+    PAGE_HELPERS_JS,
+    install_page_helpers,
+    make_element_interactable,
+    page_helper
+)
+import sys
+import os
+sys.path.insert(0, os.path.abspath(
+    os.path.join(os.path.dirname(__file__), '..')))
+
+
+class FakeDriver:
+    """Página que tiene (o no) la librería instalada"""
+
+    def __init__(self, installed=True):
+        self.installed = installed
+        self.scripts = []
+
+    def execute_script(self, script, *args):
+        self.scripts.append(script)
+        if PAGE_HELPERS_JS in script:
+            self.installed = True
+        if not self.installed:
+            return '__sq_missing__'
+        return 'result'
+
+
+def test_page_helper_sends_short_script():
+    """Verifica que con la librería instalada solo se envía una llamada corta"""
+    driver = FakeDriver()
+    assert page_helper(driver, 'enable', object()) == 'result'
+    assert len(driver.scripts) == 1
+    assert 'window.__sq.enable' in driver.scripts[0]
+    assert len(driver.scripts[0]) < 120
+
+
+def test_page_helper_injects_library_once():
+    """Verifica que la librería se inyecta si la página no la tiene y después no se reenvía"""
+    driver = FakeDriver(installed=False)
+    assert page_helper(driver, 'scrollCenter', object(), True) == 'result'
+    assert page_helper(driver, 'click', object()) == 'result'
+
+    with_library = [script for script in driver.scripts if PAGE_HELPERS_JS in script]
+    assert len(with_library) == 1
+    assert len(driver.scripts) == 3
+
+
+def test_install_page_helpers_uses_cdp():
+    """Verifica que en Chrome la librería se registra por CDP y en otros navegadores no falla"""
+    commands = []
+
+    class ChromeDriver(FakeDriver):
+        def execute_cdp_cmd(self, command, params):
+            commands.append((command, params))
+
+    assert install_page_helpers(ChromeDriver()) is True
+    assert commands == [('Page.addScriptToEvaluateOnNewDocument', {'source': PAGE_HELPERS_JS})]
+    assert install_page_helpers(FakeDriver()) is False
+
+
+def test_make_element_interactable_handles_errors():
+    """Verifica que make_element_interactable devuelve False si el script falla"""
+    class BrokenDriver:
+        def execute_script(self, script, *args):
+            raise RuntimeError("javascript error")
+
+    assert make_element_interactable(BrokenDriver(), object()) is False
+    assert make_element_interactable(FakeDriver(), object()) is True
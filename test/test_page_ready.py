@@ -0,0 +1,148 @@
+"""
+Pruebas para las condiciones de carga de página (actions/page_ready.py)
+"""
+import json
+from actions.page_ready import navigate, network_idle, readiness_conditions
+from actions.reload_driver import reload_driver
+from selenium.webdriver.common.by import By
+import utils.error as error_module
+from utils.error import messageError
+import pytest
+import sys
+import os
+sys.path.insert(0, os.path.abspath(
+    os.path.join(os.path.dirname(__file__), '..')))
+
+
+class LoadingDriver:
+    """
+    Driver cuya página avanza un paso en cada consulta tras la navegación:
+    documento nuevo, 'interactive', 'complete' y, después, aparece #results.
+    """
+
+    def __init__(self, strategy='normal', steps=('loading', 'interactive', 'complete'), results_after=None):
+        self.capabilities = {'pageLoadStrategy': strategy}
+        self.origin = 1.0
+        self.steps = list(steps)
+        self.ready_state = 'complete'
+        self.results_after = results_after
+        self.polls = 0
+        self.navigated = False
+
+    def navigate(self):
+        self.navigated = True
+        self.polls = 0
+
+    def get(self, url):
+        self.navigate()
+
+    def _tick(self):
+        if self.navigated:
+            self.polls += 1
+            if self.polls == 2:
+                self.origin = 2.0
+            if self.polls >= 2 and self.steps:
+                self.ready_state = self.steps.pop(0)
+
+    def execute_script(self, script, *args):
+        if 'location.reload' in script:
+            self.navigate()
+            return None
+        if 'onbeforeunload' in script:
+            return None
+        self._tick()
+        if 'timeOrigin' in script:
+            return self.origin
+        if 'readyState' in script:
+            return self.ready_state
+        return None
+
+    def find_elements(self, by, value):
+        self._tick()
+        return ['results'] if self.results_after is not None and self.polls >= self.results_after else []
+
+    @property
+    def switch_to(self):
+        raise AttributeError('no alert')
+
+
+class LoggingDriver:
+    """Driver con el registro de rendimiento de Chrome (eventos CDP Network)"""
+
+    def __init__(self, batches):
+        self.batches = list(batches)
+
+    def get_log(self, name):
+        assert name == 'performance'
+        return self.batches.pop(0) if self.batches else []
+
+
+def event(method, request_id):
+    return {'message': json.dumps({'message': {'method': method, 'params': {'requestId': request_id}}})}
+
+
+@pytest.fixture(autouse=True)
+def quiet_errors(monkeypatch):
+    monkeypatch.setattr(error_module, 'STAGE', 'production')
+
+
+def test_readiness_conditions_specs():
+    """Verifica los nombres, localizadores, listas y condiciones propias aceptados"""
+    custom = lambda driver: (lambda: True)
+    assert readiness_conditions(None) == []
+    assert len(readiness_conditions(['domcontentloaded', (By.ID, 'results'), custom])) == 3
+    assert readiness_conditions(custom) == [custom]
+
+    with pytest.raises(messageError):
+        readiness_conditions('fast')
+
+
+def test_navigate_none_strategy_waits_for_new_document():
+    """Verifica que con pageLoadStrategy 'none' no se da por lista la página anterior"""
+    driver = LoadingDriver(strategy='none')
+
+    navigate(driver, lambda: driver.get('https://example.com'), 'domcontentloaded', timeout=1)
+
+    assert driver.origin == 2.0
+    assert driver.ready_state in ('interactive', 'complete')
+
+
+def test_navigate_selector_ready():
+    """Verifica que la espera termina en cuanto aparece el selector indicado"""
+    driver = LoadingDriver(strategy='none', results_after=4)
+
+    navigate(driver, lambda: driver.get('https://example.com'), (By.ID, 'results'), timeout=1)
+
+    assert driver.polls >= 4
+
+
+def test_navigate_timeout():
+    """Verifica que se lanza messageError si la página nunca está lista"""
+    driver = LoadingDriver(strategy='none', results_after=None)
+
+    with pytest.raises(messageError):
+        navigate(driver, lambda: driver.get('https://example.com'), (By.ID, 'results'), timeout=0.2)
+
+
+def test_network_idle_with_cdp_events():
+    """Verifica que la red está inactiva solo cuando terminan las peticiones pendientes"""
+    driver = LoggingDriver([
+        [event('Network.requestWillBeSent', 'old')],  # drained when the condition is prepared
+        [event('Network.requestWillBeSent', '1'), event('Network.requestWillBeSent', '2')],
+        [event('Network.loadingFinished', '1')],
+        [event('Network.loadingFailed', '2')],
+    ])
+    condition = network_idle(idle_time=0)(driver)
+
+    assert not condition()  # 2 pending
+    assert not condition()  # 1 pending
+    assert condition()      # none pending
+
+
+def test_reload_driver_uses_driver_strategy():
+    """Verifica que reload_driver espera al documento nuevo según la estrategia del driver"""
+    driver = LoadingDriver(strategy='eager', steps=('loading', 'interactive'))
+
+    assert reload_driver(driver) is driver
+    assert driver.origin == 2.0
+    assert driver.ready_state == 'interactive'
@@ -0,0 +1,150 @@
+"""
+Pruebas para el modo de lectura con BeautifulSoup (actions/parse_html.py)
+"""
+import time
+from urllib.parse import urljoin
+import actions.parse_html as parse_html_module
+from bs4 import BeautifulSoup
+from actions.parse_html import SoupCache, extract_html, extract_source, parse_html, select_locator
+from selenium.webdriver.common.by import By
+import utils.error as error_module
+from utils.error import messageError
+import pytest
+import sys
+import os
+sys.path.insert(0, os.path.abspath(
+    os.path.join(os.path.dirname(__file__), '..')))
+
+FIXTURE = os.path.join(os.path.dirname(__file__), 'fixtures', 'products.html')
+URL = 'https://shop.example.com/products?page=1'
+CONTAINER = (By.CSS_SELECTOR, 'table#products tbody')
+SCHEMA = {'id': '@data-id', 'name': 'td.name', 'link': 'a@href', 'price': 'td.price@data-value'}
+
+# Local chromedriver round-trips usually take 1-3 ms; 0.3 ms keeps the benchmark conservative
+ROUND_TRIP = 0.0003
+
+
+@pytest.fixture(autouse=True)
+def quiet_errors(monkeypatch):
+    monkeypatch.setattr(error_module, 'STAGE', 'production')
+    parse_html_module.soup_cache.clear()
+
+
+@pytest.fixture(scope='module')
+def html():
+    with open(FIXTURE, encoding='utf-8') as f:
+        return f.read()
+
+
+class RemoteElement:
+    """Elemento de Selenium simulado: cada llamada es un round-trip al driver"""
+
+    def __init__(self, driver, node):
+        self.driver = driver
+        self.node = node
+
+    def find_element(self, by, value):
+        return self.find_elements(by, value)[0]
+
+    def find_elements(self, by, value):
+        self.driver.round_trip()
+        return [RemoteElement(self.driver, node) for node in self.node.select(value)]
+
+    @property
+    def text(self):
+        self.driver.round_trip()
+        return ' '.join(self.node.get_text().split())
+
+    def get_attribute(self, name):
+        self.driver.round_trip()
+        value = self.node.get(name)
+        return urljoin(URL, value) if name == 'href' else value
+
+
+class FixtureDriver:
+    def __init__(self, html):
+        self.html = html
+        self.calls = 0
+        self.current_url = URL
+        # Own document, so the per-element path does not warm the shared cache
+        self.dom = BeautifulSoup(html, 'html.parser')
+
+    def round_trip(self):
+        self.calls += 1
+        time.sleep(ROUND_TRIP)
+
+    @property
+    def page_source(self):
+        self.round_trip()
+        return self.html
+
+    def find_element(self, by, value):
+        self.round_trip()
+        return RemoteElement(self, self.dom.select_one(value))
+
+
+def per_element_extract(driver):
+    """Camino habitual con Selenium: una llamada por fila, celda y atributo"""
+    rows = []
+    for row in driver.find_element(*CONTAINER).find_elements(By.CSS_SELECTOR, 'tr'):
+        rows.append({
+            'id': row.get_attribute('data-id'),
+            'name': row.find_element(By.CSS_SELECTOR, 'td.name').text,
+            'link': row.find_element(By.CSS_SELECTOR, 'a').get_attribute('href'),
+            'price': row.find_element(By.CSS_SELECTOR, 'td.price').get_attribute('data-value'),
+        })
+    return rows
+
+
+def test_extract_html_fields(html):
+    """Verifica el texto normalizado, los atributos y los href absolutos"""
+    rows = extract_html(parse_html(html), CONTAINER, SCHEMA, rows='tr', base_url=URL)
+
+    assert len(rows) == 100
+    assert rows[0] == {
+        'id': 'SKU-0001',
+        'name': 'Producto 1',
+        'link': 'https://shop.example.com/products/1',
+        'price': '3.99',
+    }
+
+
+def test_soup_cache_parses_once(html):
+    """Verifica que el mismo HTML se parsea una sola vez y el caché respeta su tamaño"""
+    cache = SoupCache(max_entries=2)
+
+    assert cache.get(html) is cache.get(html)
+    assert (cache.hits, cache.misses) == (1, 1)
+
+    cache.get('<p>a</p>')
+    cache.get('<p>b</p>')
+    assert len(cache) == 2
+    assert cache.get(html) is not None and cache.misses == 4
+
+
+def test_select_locator_rejects_xpath(html):
+    """Verifica que los localizadores soportados funcionan y XPath da messageError"""
+    soup = parse_html(html)
+
+    assert len(select_locator(soup, (By.CLASS_NAME, 'product'))) == 100
+    assert select_locator(soup, (By.ID, 'products'))[0].name == 'table'
+    with pytest.raises(messageError):
+        select_locator(soup, (By.XPATH, '//table'))
+
+
+def test_benchmark_page_source_vs_per_element(html):
+    """Verifica que leer page_source una vez da el mismo resultado que el camino por elemento, con una llamada y en menos tiempo"""
+    selenium_driver = FixtureDriver(html)
+    start = time.perf_counter()
+    expected = per_element_extract(selenium_driver)
+    per_element = time.perf_counter() - start
+
+    source_driver = FixtureDriver(html)
+    start = time.perf_counter()
+    rows = extract_source(source_driver, CONTAINER, SCHEMA, rows='tr')
+    page_source = time.perf_counter() - start
+
+    assert rows == expected
+    assert source_driver.calls == 1
+    assert selenium_driver.calls > 500
+    assert page_source < per_element
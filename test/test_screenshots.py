@@ -0,0 +1,148 @@
+"""
+Pruebas para el servicio de capturas de pantalla (utils/screenshots.py)
+"""
+import base64
+import os
+import threading
+import time
+import utils.screenshots as screenshots_module
+from utils.file_manager import take_screenshot
+from utils.screenshots import ScreenshotService, get_screenshot_service
+import utils.error as error_module
+from utils.error import messageError
+import pytest
+import sys
+sys.path.insert(0, os.path.abspath(
+    os.path.join(os.path.dirname(__file__), '..')))
+
+
+class CDPDriver:
+    """Chromium: captura por Page.captureScreenshot"""
+
+    def __init__(self, image=b'image'):
+        self.image = image
+        self.commands = []
+
+    def execute_cdp_cmd(self, command, params):
+        self.commands.append((command, params))
+        if command == 'Page.getLayoutMetrics':
+            return {'cssContentSize': {'width': 1280, 'height': 5000}}
+        return {'data': base64.b64encode(self.image).decode()}
+
+    def execute_script(self, script, *args):
+        return {'x': 10, 'y': 2000, 'width': 300, 'height': 50}
+
+
+class SeleniumDriver:
+    """Firefox: solo las capturas PNG de Selenium"""
+
+    def __init__(self, image=b'png'):
+        self.image = image
+
+    def get_screenshot_as_base64(self):
+        return base64.b64encode(self.image).decode()
+
+
+@pytest.fixture(autouse=True)
+def quiet_errors(monkeypatch):
+    monkeypatch.setattr(error_module, 'STAGE', 'production')
+
+
+def test_capture_content_addressed(tmp_path):
+    """Verifica que capturas simultáneas no coinciden y que la misma captura se guarda una vez"""
+    service = ScreenshotService(str(tmp_path))
+    paths = []
+    threads = [threading.Thread(target=lambda i=i: paths.append(
+                   service.capture(CDPDriver(b'page %d' % i), background=True)))
+               for i in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    service.flush()
+
+    assert len(set(paths)) == 8
+    assert all(os.path.exists(path) and path.endswith('.png') for path in paths)
+    assert service.wait(service.capture(CDPDriver(b'page 0'))) in paths
+    assert len(os.listdir(tmp_path)) == 8
+    assert service.stats()['duplicates'] == 1
+
+
+def test_cdp_webp_full_page_and_element(tmp_path):
+    """Verifica los parámetros CDP de formato, calidad, página completa y recorte de elemento"""
+    service = ScreenshotService(str(tmp_path))
+    driver = CDPDriver()
+
+    path = service.wait(service.capture(driver, full_page=True, image_format='webp', quality=60))
+    params = driver.commands[-1][1]
+    assert path.endswith('.webp')
+    assert params['format'] == 'webp' and params['quality'] == 60
+    assert params['captureBeyondViewport'] is True
+    assert params['clip'] == {'x': 0, 'y': 0, 'width': 1280, 'height': 5000, 'scale': 1}
+
+    service.capture(driver, element=object(), image_format='png', background=True)
+    params = driver.commands[-1][1]
+    assert params['clip'] == {'x': 10, 'y': 2000, 'width': 300, 'height': 50, 'scale': 1}
+    assert 'quality' not in params
+
+
+def test_firefox_keeps_png_without_pillow(tmp_path, monkeypatch):
+    """Verifica que sin CDP ni Pillow la captura se guarda como PNG"""
+    monkeypatch.setattr(screenshots_module, 'Image', None)
+    service = ScreenshotService(str(tmp_path))
+
+    path = service.wait(service.capture(SeleniumDriver(b'firefox'), image_format='webp'))
+
+    assert path.endswith('.png')
+    with open(path, 'rb') as f:
+        assert f.read() == b'firefox'
+
+
+def test_retention_by_total_bytes(tmp_path):
+    """Verifica que se borran las capturas más antiguas por encima del límite sin tocar otros archivos"""
+    (tmp_path / 'scraper.log').write_bytes(b'x' * 1000)
+    service = ScreenshotService(str(tmp_path), max_bytes=250)
+    paths = []
+    for index in range(5):
+        paths.append(service.wait(service.capture(CDPDriver(bytes([index]) * 100))))
+        os.utime(paths[-1], (index, index))
+
+    assert [os.path.exists(path) for path in paths] == [False, False, False, True, True]
+    assert (tmp_path / 'scraper.log').exists()
+    assert service.stats()['bytes'] == 200
+
+
+def test_take_screenshot_returns_written_path(tmp_path):
+    """Verifica que take_screenshot devuelve la ruta con el archivo ya escrito y valida el formato"""
+    path = take_screenshot(CDPDriver(b'shot'), str(tmp_path), image_format='jpeg', quality=50)
+
+    assert path.startswith(str(tmp_path)) and path.endswith('.jpg')
+    with open(path, 'rb') as f:
+        assert f.read() == b'shot'
+    with pytest.raises(messageError):
+        take_screenshot(CDPDriver(), str(tmp_path), image_format='gif')
+
+    path = take_screenshot(CDPDriver(b'later'), str(tmp_path), background=True)
+    assert get_screenshot_service(str(tmp_path)).wait(path) == path
+    assert os.path.exists(path)
+
+
+def test_failed_writes_are_not_left_pending(tmp_path):
+    """Verifica que una escritura fallida se cuenta, no queda pendiente y take_screenshot la lanza"""
+    store = tmp_path / 'store'
+    store.write_bytes(b'not a directory')
+    service = ScreenshotService(str(store))
+
+    with pytest.raises(messageError):
+        service.capture(CDPDriver(b'shot'))
+    service.capture(CDPDriver(b'other'), background=True)
+    service.flush()
+
+    stats = service.stats()
+    assert stats['failures'] == 2 and stats['pending'] == 0
+    # Done callbacks run right after the futures finish
+    for _ in range(100):
+        if not service._pending:
+            break
+        time.sleep(0.01)
+    assert service._pending == {}
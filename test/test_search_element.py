@@ -0,0 +1,176 @@
+"""
+Pruebas para la búsqueda de elementos (actions/search_element.py)
+"""
+import time
+import actions.search_element as search_element_module
+from actions.search_element import search_any, search_element
+from selenium.common.exceptions import NoSuchElementException
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support.wait import WebDriverWait
+import utils.error as error_module
+from utils.error import messageError
+import pytest
+import sys
+import os
+sys.path.insert(0, os.path.abspath(
+    os.path.join(os.path.dirname(__file__), '..')))
+
+LOCATOR = (By.ID, 'missing')
+
+
+class FakeDriver:
+    def __init__(self, found=None):
+        self.found = found
+
+    def find_element(self, by, value):
+        if self.found is None:
+            raise NoSuchElementException(f"no element {value}")
+        return self.found
+
+
+class FakeElement:
+    def __init__(self, name):
+        self.name = name
+
+    def is_displayed(self):
+        return True
+
+    def is_enabled(self):
+        return True
+
+
+class SlowPageDriver:
+    """Driver cuyos elementos aparecen tras un número de búsquedas"""
+
+    def __init__(self, appear_after):
+        self.appear_after = appear_after
+        self.lookups = {value: 0 for value in appear_after}
+
+    def find_element(self, by, value):
+        self.lookups[value] = self.lookups.get(value, 0) + 1
+        after = self.appear_after.get(value)
+        if after is None or self.lookups[value] <= after:
+            raise NoSuchElementException(f"no element {value}")
+        return FakeElement(value)
+
+
+@pytest.fixture
+def short_wait(monkeypatch):
+    """Una única espera corta para todos los localizadores"""
+    waits = []
+
+    def get_wait(driver):
+        waits.append(driver)
+        return WebDriverWait(driver, 0.5, poll_frequency=0.01)
+
+    monkeypatch.setattr(search_element_module, 'get_wait', get_wait)
+    return waits
+
+
+@pytest.fixture(autouse=True)
+def quiet_errors(monkeypatch):
+    """messageError no imprime fuera de producción"""
+    monkeypatch.setattr(error_module, 'STAGE', 'production')
+
+
+def test_search_element_returns_element():
+    """Verifica que se devuelve el elemento encontrado sin esperar"""
+    assert search_element(FakeDriver('element'), LOCATOR, wait_to_search=False) == 'element'
+
+
+def test_search_element_error_names_caller():
+    """Verifica que el error indica la función que llamó a search_element, no el decorador @instrument"""
+    with pytest.raises(messageError) as error:
+        search_element(FakeDriver(), LOCATOR, wait_to_search=False)
+
+    message = str(error.value)
+    assert "Error in function 'test_search_element_error_names_caller'" in message
+    assert f"{__file__}:" in message
+    assert "Failed to locate element ('id', 'missing')" in message
+
+
+def test_search_element_error_names_caller_in_metrics_module():
+    """Verifica que no se salta al llamador cuando su archivo también termina en metrics.py"""
+    namespace = {'search_element': search_element, 'FakeDriver': FakeDriver, 'LOCATOR': LOCATOR}
+    source = "def controller_metrics():\n    search_element(FakeDriver(), LOCATOR, wait_to_search=False)\n"
+    exec(compile(source, os.path.join('controller', 'controller_metrics.py'), 'exec'), namespace)
+
+    with pytest.raises(messageError) as error:
+        namespace['controller_metrics']()
+
+    assert "Error in function 'controller_metrics'" in str(error.value)
+
+
+def test_search_element_error_names_caller_with_compiled_metrics(monkeypatch):
+    """Verifica que se salta @instrument aunque su co_filename no coincida con utils/metrics.py (imagen solo .pyc)"""
+    wrapper = search_element_module.search_element
+    monkeypatch.setattr(wrapper, '__code__', wrapper.__code__.replace(
+        co_filename=os.path.join(os.sep, 'app', 'utils', 'metrics.py')))
+
+    with pytest.raises(messageError) as error:
+        search_element_module.search_element(FakeDriver(), LOCATOR, wait_to_search=False)
+
+    assert "Error in function 'test_search_element_error_names_caller_with_compiled_metrics'" in str(error.value)
+
+
+def test_search_element_without_exception_returns_none():
+    """Verifica que con raise_exception=False se devuelve None"""
+    assert search_element(FakeDriver(), LOCATOR, wait_to_search=False, raise_exception=False) is None
+
+
+def test_search_element_failure_path_is_cheap():
+    """Verifica que el camino de error (muy usado en sondeos) cuesta menos de 1 ms por llamada"""
+    driver = FakeDriver()
+    calls = 300
+
+    start = time.perf_counter()
+    for _ in range(calls):
+        try:
+            search_element(driver, LOCATOR, wait_to_search=False)
+        except messageError:
+            pass
+    raising = (time.perf_counter() - start) / calls
+
+    start = time.perf_counter()
+    for _ in range(calls):
+        search_element(driver, LOCATOR, wait_to_search=False, raise_exception=False)
+    silent = (time.perf_counter() - start) / calls
+
+    # inspect.stack() cost ~0.2 ms per call here and grows with the stack depth;
+    # the bounds are generous so slow CI machines do not fail
+    assert raising < 0.001
+    assert silent < 0.001
+
+
+def test_search_any_returns_first_match_and_locator(short_wait):
+    """Verifica que se devuelve el elemento y el localizador que apareció primero, con una sola espera"""
+    driver = SlowPageDriver({'late': 5, 'soon': 2})
+
+    element, locator = search_any(driver, [(By.ID, 'late'), (By.ID, 'soon'), (By.ID, 'never')])
+
+    assert locator == (By.ID, 'soon')
+    assert element.name == 'soon'
+    assert len(short_wait) == 1
+
+
+def test_search_any_prefers_earlier_locator(short_wait):
+    """Verifica que si varios aparecen a la vez gana el primero de la lista"""
+    driver = SlowPageDriver({'second': 0, 'first': 0})
+
+    element, locator = search_any(driver, [(By.ID, 'first'), (By.ID, 'second')])
+
+    assert locator == (By.ID, 'first')
+
+
+def test_search_any_not_found(short_wait):
+    """Verifica que sin coincidencias se lanza messageError o se devuelve (None, None)"""
+    locators = [(By.ID, 'a'), (By.ID, 'b')]
+
+    start = time.perf_counter()
+    with pytest.raises(messageError) as error:
+        search_any(SlowPageDriver({}), locators)
+    # One timeout for all the locators, not one per locator
+    assert time.perf_counter() - start < 0.9
+    assert "Error in function 'test_search_any_not_found'" in str(error.value)
+
+    assert search_any(SlowPageDriver({}), locators, raise_exception=False) == (None, None)
@@ -0,0 +1,149 @@
+"""
+Pruebas para las sesiones guardadas (actions/session_store.py y cached_login)
+"""
+import os
+import time
+import actions.login as login_module
+import actions.session_store as session_store_module
+from actions.session_store import SessionStore, restore_session, save_session
+import utils.error as error_module
+import pytest
+import sys
+sys.path.insert(0, os.path.abspath(
+    os.path.join(os.path.dirname(__file__), '..')))
+
+
+class BrowserDriver:
+    """Driver con cookies y localStorage de una sola página"""
+
+    def __init__(self, url='https://shop.example.com/account', cdp=True):
+        self.current_url = url
+        self.cookies = []
+        self.local_storage = {}
+        self.cdp_commands = []
+        self.visited = []
+        if cdp:
+            self.execute_cdp_cmd = lambda command, params: self.cdp_commands.append((command, params))
+
+    def get(self, url):
+        self.visited.append(url)
+        self.current_url = url
+
+    def get_cookies(self):
+        return list(self.cookies)
+
+    def add_cookie(self, cookie):
+        self.cookies.append(cookie)
+
+    def delete_all_cookies(self):
+        self.cookies = []
+
+    def execute_script(self, script, *args):
+        if 'setItem' in script:
+            self.local_storage.update(args[0])
+        elif 'getItem' in script:
+            return {'origin': 'https://shop.example.com', 'items': dict(self.local_storage)}
+        elif 'clear' in script:
+            self.local_storage = {}
+
+
+@pytest.fixture(autouse=True)
+def store(monkeypatch):
+    monkeypatch.setattr(error_module, 'STAGE', 'production')
+    store = SessionStore(ttl=60, max_entries=2)
+    monkeypatch.setattr(session_store_module, 'session_store', store)
+    monkeypatch.setattr(login_module, 'session_store', store)
+    return store
+
+
+def test_ttl_and_lru(store, monkeypatch):
+    """Verifica la caducidad por TTL y el desalojo del menos usado"""
+    store.put('a.com', 'ana', [])
+    store.put('b.com', 'ana', [])
+    assert store.get('a.com', 'ana') is not None
+    store.put('c.com', 'ana', [])  # b.com is the least recently used
+
+    assert store.get('b.com', 'ana') is None
+    assert store.get('a.com', 'ana') is not None
+
+    later = time.time() + 61
+    monkeypatch.setattr(session_store_module.time, 'time', lambda: later)
+    assert store.get('c.com', 'ana') is None
+    assert store.lookups == {'hit': 0, 'miss': 1, 'expired': 1, 'invalid': 0}
+
+
+def test_save_and_restore_cdp():
+    """Verifica que se guardan cookies vigentes y localStorage y se restauran por CDP"""
+    driver = BrowserDriver()
+    driver.cookies = [
+        {'name': 'sid', 'value': '1', 'domain': '.example.com', 'path': '/', 'expiry': int(time.time()) + 600},
+        {'name': 'old', 'value': '2', 'domain': '.example.com', 'path': '/', 'expiry': 1},
+    ]
+    driver.local_storage = {'token': 'abc'}
+    save_session(driver, username='ana')
+
+    fresh = BrowserDriver()
+    assert restore_session(fresh, username='ana')
+    command, params = fresh.cdp_commands[0]
+    assert command == 'Network.setCookies'
+    assert [cookie['name'] for cookie in params['cookies']] == ['sid']
+    assert 'expires' in params['cookies'][0]
+    assert fresh.local_storage == {'token': 'abc'}
+    assert not restore_session(BrowserDriver(), username='luis')
+
+
+def test_restore_without_cdp_opens_origin():
+    """Verifica que sin CDP se abre el origen del sitio antes de añadir las cookies"""
+    driver = BrowserDriver()
+    driver.cookies = [{'name': 'sid', 'value': '1'}]
+    save_session(driver, 'shop', 'ana')
+
+    firefox = BrowserDriver(url='about:blank', cdp=False)
+    assert restore_session(firefox, 'shop', 'ana')
+    assert firefox.visited == ['https://shop.example.com']
+    assert firefox.cookies == [{'name': 'sid', 'value': '1'}]
+
+
+def test_disk_store_encrypted(tmp_path):
+    """Verifica que las sesiones en disco están cifradas y se comparten entre instancias"""
+    pytest.importorskip('cryptography')
+    SessionStore(str(tmp_path), key='secret').put('shop', 'ana', [{'name': 'sid', 'value': 'token-123'}])
+
+    files = os.listdir(tmp_path)
+    assert len(files) == 1
+    assert b'token-123' not in (tmp_path / files[0]).read_bytes()
+    assert SessionStore(str(tmp_path), key='secret').get('shop', 'ana')['cookies'][0]['value'] == 'token-123'
+    assert SessionStore(str(tmp_path), key='other').get('shop', 'ana') is None
+
+
+@pytest.mark.parametrize('key, fernet', [(None, session_store_module.Fernet), ('secret', None)])
+def test_memory_only_without_key_or_cryptography(tmp_path, monkeypatch, key, fernet):
+    """Verifica que sin SESSION_STORE_KEY o sin cryptography las sesiones solo se guardan en memoria"""
+    monkeypatch.setattr(session_store_module, 'Fernet', fernet)
+    store = SessionStore(str(tmp_path), key=key)
+    store.put('shop', 'ana', [{'name': 'sid', 'value': 'token-123'}])
+
+    assert store.path is None
+    assert os.listdir(tmp_path) == []
+    assert store.get('shop', 'ana') is not None
+
+
+@pytest.mark.parametrize('logged_in, logins', [(True, 0), (False, 1)])
+def test_cached_login(store, monkeypatch, logged_in, logins):
+    """Verifica que el login se omite con una sesión válida y se repite si el sitio la rechaza"""
+    calls = []
+    monkeypatch.setattr(login_module, 'reload_driver', lambda driver: driver)
+    monkeypatch.setattr(login_module, 'search_element', lambda driver, locator: 'menu')
+    monkeypatch.setattr(login_module, 'login', lambda driver, username, password: calls.append(username) or driver)
+    locator = login_module.LOGGED_IN_LOCATOR if logged_in else login_module.LOGIN_BUTTON_LOCATOR
+    monkeypatch.setattr(login_module, 'search_any', lambda driver, locators, raise_exception: ('element', locator))
+
+    driver = BrowserDriver()
+    driver.cookies = [{'name': 'sid', 'value': '1'}]
+    login_module.cached_login(driver, 'ana', 'secret')  # nothing saved: full login
+    assert calls == ['ana']
+
+    login_module.cached_login(BrowserDriver(), 'ana', 'secret')
+    assert len(calls) == 1 + logins
+    assert store.lookups['hit' if logged_in else 'invalid'] == 1
+    assert store.get('shop.example.com', 'ana') is not None
@@ -0,0 +1,113 @@
+"""
+Pruebas para la caché de estrategias de click (actions/strategy_cache.py)
+"""
+import actions.click_element as click_module
+from actions.strategy_cache import StrategyCache
+from selenium.common.exceptions import (
+    ElementClickInterceptedException,
+    ElementNotInteractableException
+)
+import pytest
+import sys
+import os
+sys.path.insert(0, os.path.abspath(
+    os.path.join(os.path.dirname(__file__), '..')))
+
+
+class FakeActionChains:
+    """ActionChains de un sitio donde el ratón nunca llega al elemento"""
+
+    def __init__(self, driver):
+        pass
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: self
+
+    def perform(self):
+        raise ElementNotInteractableException("covered")
+
+
+class FakeElement:
+    def is_displayed(self):
+        return True
+
+    def click(self):
+        raise ElementClickInterceptedException("intercepted")
+
+
+class FakeDriver:
+    current_url = 'https://example.com/login'
+
+    def __init__(self):
+        self.js_clicks = 0
+
+    def execute_script(self, script, *args):
+        if 'window.__sq.click' in script:
+            self.js_clicks += 1
+        return True
+
+
+@pytest.fixture
+def cache(monkeypatch):
+    """Caché vacía, sin esperas y con un sitio donde solo funciona el click JavaScript"""
+    cache = StrategyCache(max_entries=10)
+    sleeps = []
+    monkeypatch.setattr(click_module, 'strategy_cache', cache)
+    monkeypatch.setattr(click_module, 'ActionChains', FakeActionChains)
+    monkeypatch.setattr(click_module, 'sleep', sleeps.append)
+    cache.sleeps = sleeps
+    return cache
+
+
+def test_lru_eviction():
+    """Verifica que se eliminan las entradas menos usadas al superar el límite"""
+    cache = StrategyCache(max_entries=2)
+    cache.remember('click_element', 'a.com', 'x', 'basic')
+    cache.remember('click_element', 'b.com', 'x', 'javascript')
+    assert cache.get('click_element', 'a.com', 'x') == 'basic'  # a.com pasa a ser la más reciente
+
+    cache.remember('click_element', 'c.com', 'x', 'direct')
+
+    assert len(cache) == 2
+    assert cache.get('click_element', 'b.com', 'x') is None
+    assert cache.get('click_element', 'a.com', 'x') == 'basic'
+
+
+def test_persistence(tmp_path):
+    """Verifica que la caché se guarda y se carga desde disco"""
+    path = str(tmp_path / "strategies.json")
+    cache = StrategyCache(path=path)
+    cache.remember('click_element', 'a.com', ('css selector', '#ok'), 'javascript')
+    cache.save()
+
+    loaded = StrategyCache(path=path)
+    assert loaded.get('click_element', 'a.com', ('css selector', '#ok')) == 'javascript'
+
+
+def test_click_learns_and_reuses_strategy(cache):
+    """Verifica que el segundo click usa directamente el método que funcionó, sin esperas"""
+    driver, element = FakeDriver(), FakeElement()
+
+    click_module.click_element(driver, element, locator=('id', 'submit'))
+    assert driver.js_clicks == 1
+    assert cache.sleeps  # El primer click recorre la cadena con esperas
+    assert cache.get('click_element', 'example.com', ('id', 'submit')) == 'javascript'
+
+    cache.sleeps.clear()
+    click_module.click_element(driver, element, locator=('id', 'submit'))
+
+    assert driver.js_clicks == 2
+    assert cache.sleeps == []
+    assert cache.lookups['click_element'] == {'hit': 1, 'miss': 1, 'stale': 0}
+
+
+def test_stale_strategy_falls_back(cache):
+    """Verifica que si el método recordado falla se recorre la cadena completa y se actualiza"""
+    driver, element = FakeDriver(), FakeElement()
+    cache.remember('click_element', 'example.com', None, 'direct')
+
+    click_module.click_element(driver, element)
+
+    assert driver.js_clicks == 1
+    assert cache.get('click_element', 'example.com', None) == 'javascript'
+    assert cache.lookups['click_element']['stale'] == 1
@@ -0,0 +1,76 @@
+"""
+Pruebas para las esperas por condición (actions/wait_until.py)
+"""
+from actions.wait_until import (
+    humanized_delays,
+    scroll_settled,
+    value_committed,
+    wait_until
+)
+import time
+import sys
+import os
+sys.path.insert(0, os.path.abspath(
+    os.path.join(os.path.dirname(__file__), '..')))
+
+
+class FakeElement:
+    def __init__(self, value=''):
+        self.value = value
+
+    def get_attribute(self, name):
+        return self.value
+
+
+def test_wait_until_returns_as_soon_as_condition_holds():
+    """Verifica que la espera termina en cuanto se cumple la condición"""
+    calls = []
+
+    def condition():
+        calls.append(1)
+        return len(calls) >= 3 and 'listo'
+
+    start = time.monotonic()
+    assert wait_until(condition, timeout=5, poll=0.01) == 'listo'
+    assert time.monotonic() - start < 1
+    assert len(calls) == 3
+
+
+def test_wait_until_timeout_and_ignored_exceptions():
+    """Verifica que al agotar el tiempo devuelve False y que ignora las excepciones indicadas"""
+    def failing():
+        raise KeyError("todavía no")
+
+    start = time.monotonic()
+    assert wait_until(failing, timeout=0.1, poll=0.02, ignored=(KeyError,)) is False
+    assert 0.1 <= time.monotonic() - start < 1
+
+
+def test_scroll_settled_waits_for_stable_position():
+    """Verifica que el scroll se da por terminado cuando el elemento deja de moverse dentro de la vista"""
+    positions = iter([[900, 0, False], [400, 0, True], [120, 0, True], [120, 0, True]])
+
+    class FakeDriver:
+        def execute_script(self, script, *args):
+            return next(positions)
+
+    condition = scroll_settled(FakeDriver(), object())
+    assert [condition() for _ in range(4)] == [False, False, False, True]
+
+
+def test_value_committed():
+    """Verifica la condición de valor escrito y de campo limpio"""
+    element = FakeElement('user@example.com')
+    assert value_committed(element, 'user@')()
+    assert not value_committed(element, '')()
+    assert value_committed(FakeElement(''), '')()
+
+
+def test_humanized_delays_respect_budget():
+    """Verifica que las pausas de escritura humanizada no superan el presupuesto total"""
+    delays = humanized_delays(200, budget=2, min_delay=0.05, max_delay=0.3)
+    assert len(delays) == 200
+    assert sum(delays) <= 2 + 1e-9
+
+    short = humanized_delays(3, budget=2, min_delay=0.05, max_delay=0.3)
+    assert all(0.05 <= delay <= 0.3 for delay in short)
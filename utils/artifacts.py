@@ -0,0 +1,164 @@
+import json
+import logging
+import mimetypes
+import os
+import re
+import shutil
+import threading
+import time
+import uuid
+from flask import send_file
+from utils.config import ARTIFACT_MAX_AGE, ARTIFACT_MAINTENANCE_INTERVAL, ARTIFACTS_DIR
+from utils.file_manager import save_file
+from utils.maintenance import register_maintenance_task
+
+ARTIFACT_ID_REGEX = re.compile(r'^[0-9a-f]{32}$')
+
+# The cleanup is scheduled by the first artifact of the process, not by every one
+_cleanup_registered = False
+_cleanup_lock = threading.Lock()
+
+
+class FileResult:
+    """
+    File returned by a controller instead of its content, so it never goes
+    through memory or Base64:
+
+    - handle_request_endpoint(controller, decode_response=False) streams it
+      as the response body (send_file: Range requests, sendfile in gunicorn,
+      X-Sendfile behind a proxy with USE_X_SENDFILE)
+    - in JSON responses, jobs and batches it is stored as an artifact and the
+      message carries its reference, to download from GET /artifacts/<id>
+
+    Args:
+        source: Path of the file (e.g. the one returned by wait_for_download)
+            or a binary file object
+        download_name: File name for the client. Default: the name of the file
+        mimetype: Default: guessed from download_name
+
+    Example:
+        path = wait_for_download(pattern='*.pdf')
+        return FileResult(path, 'invoice.pdf')
+    """
+
+    def __init__(self, source, download_name=None, mimetype=None):
+        if isinstance(source, (str, os.PathLike)):
+            source = os.path.abspath(source)
+            download_name = download_name or os.path.basename(source)
+        self.source = source
+        self.download_name = download_name or 'download'
+        self.mimetype = (mimetype or mimetypes.guess_type(self.download_name)[0]
+                         or 'application/octet-stream')
+
+    def send(self):
+        """
+        Flask response that streams the file.
+        """
+        return send_file(self.source, mimetype=self.mimetype, as_attachment=True,
+                         download_name=self.download_name, conditional=True, max_age=0)
+
+
+def store_artifact(result):
+    """
+    Keeps the file of a FileResult in ARTIFACTS_DIR for ARTIFACT_MAX_AGE seconds.
+    Paths are moved, not copied, when they are on the same filesystem
+    (download sandboxes are).
+
+    Returns:
+        dict: Reference to put in the response: id, name, mimetype, size and url
+    """
+    os.makedirs(ARTIFACTS_DIR, exist_ok=True)
+    artifact_id = uuid.uuid4().hex
+    path = os.path.join(ARTIFACTS_DIR, artifact_id)
+    if isinstance(result.source, str):
+        shutil.move(result.source, path)
+    else:
+        save_file(result.source, ARTIFACTS_DIR, artifact_id)
+
+    artifact = {
+        'id': artifact_id,
+        'name': result.download_name,
+        'mimetype': result.mimetype,
+        'size': os.path.getsize(path),
+        'url': f"/artifacts/{artifact_id}",
+    }
+    # Written last and atomically: an artifact exists once its metadata does
+    metadata_path = path + '.json'
+    with open(metadata_path + '.tmp', 'w') as f:
+        json.dump(dict(artifact, created_at=time.time()), f)
+    os.replace(metadata_path + '.tmp', metadata_path)
+
+    _register_cleanup()
+    logging.info(f"Artifact {artifact_id} stored ({artifact['size']} bytes)")
+    return artifact
+
+
+def store_file_result(result):
+    """
+    The artifact reference of `result` if it is a FileResult, otherwise
+    `result` unchanged. For responses that are serialized as JSON.
+    """
+    return store_artifact(result) if isinstance(result, FileResult) else result
+
+
+def get_artifact(artifact_id):
+    """
+    Metadata of a stored artifact with the path of its file, or None.
+    """
+    if not ARTIFACT_ID_REGEX.fullmatch(artifact_id or ''):
+        return None
+    path = os.path.join(ARTIFACTS_DIR, artifact_id)
+    try:
+        with open(path + '.json') as f:
+            artifact = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if not os.path.isfile(path):
+        return None
+    artifact['path'] = path
+    return artifact
+
+
+def delete_old_artifacts(max_age=ARTIFACT_MAX_AGE, now=None):
+    """
+    Deletes the artifacts stored more than `max_age` seconds ago, and files
+    left without metadata by interrupted writes. Returns how many were removed.
+    """
+    now = now or time.time()
+    try:
+        entries = list(os.scandir(ARTIFACTS_DIR))
+    except FileNotFoundError:
+        return 0
+
+    # <id>, <id>.json and the temporary files of the same artifact go together
+    groups = {}
+    for entry in entries:
+        groups.setdefault(entry.name.split('.')[0], []).append(entry)
+
+    removed = 0
+    for artifact_id, files in groups.items():
+        try:
+            with open(os.path.join(ARTIFACTS_DIR, artifact_id + '.json')) as f:
+                created_at = json.load(f)['created_at']
+        except (OSError, ValueError, KeyError):
+            created_at = max(entry.stat().st_mtime for entry in files)
+        if now - created_at < max_age:
+            continue
+        for entry in files:
+            try:
+                os.remove(entry.path)
+            except FileNotFoundError:
+                pass
+        removed += 1
+    if removed:
+        logging.info(f"Deleted {removed} expired artifacts")
+    return removed
+
+
+def _register_cleanup():
+    global _cleanup_registered
+    with _cleanup_lock:
+        if _cleanup_registered:
+            return
+        _cleanup_registered = True
+    register_maintenance_task('artifact_cleanup', delete_old_artifacts, ARTIFACT_MAINTENANCE_INTERVAL)
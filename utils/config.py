@@ -14,9 +14,83 @@ BROWSER_LANGUAGE = os.getenv("BROWSER_LANGUAGE") or 'en'
 DOWNLOAD_DIR = os.path.abspath("temp_downloads")
 PORT = int(os.getenv("PORT", 3000))
 PAGE_MAX_TIMEOUT = 7
-DOWNLOAD_MAX_TIMEOUT = 4
+PAGE_LOAD_STRATEGY = os.getenv("PAGE_LOAD_STRATEGY") or 'normal'  # 'normal' (load event), 'eager' (DOMContentLoaded) or 'none'
+NETWORK_IDLE_TIME = float(os.getenv("NETWORK_IDLE_TIME", 0.5))  # Seconds without requests for the 'networkidle' readiness
+NETWORK_IDLE_CDP = os.getenv("NETWORK_IDLE_CDP", "False") == "True"  # Chrome performance log (CDP Network events) for 'networkidle'; buffers every event, off by default
+DOWNLOAD_MAX_TIMEOUT = float(os.getenv("DOWNLOAD_MAX_TIMEOUT", 4))  # Seconds wait_for_download waits for a browser download to finish
+DOWNLOAD_SANDBOX_MAX_AGE = int(os.getenv("DOWNLOAD_SANDBOX_MAX_AGE", 300))  # Seconds a finished download sandbox is kept
+DOWNLOAD_SANDBOX_MAX_BYTES = int(os.getenv("DOWNLOAD_SANDBOX_MAX_BYTES", 1024 * 1024 * 1024))  # Above this, oldest finished sandboxes go first (0: no limit)
+DOWNLOAD_JANITOR_INTERVAL = int(os.getenv("DOWNLOAD_JANITOR_INTERVAL", 60))  # Seconds between sandbox cleanups
+HTTP_POOL_SIZE = int(os.getenv("HTTP_POOL_SIZE", 10))  # Connections kept per host by the shared requests.Session
+FILE_CHUNK_SIZE = int(os.getenv("FILE_CHUNK_SIZE", 1024 * 1024))  # Bytes per chunk when saving files (save_file)
+FILE_DOWNLOAD_TIMEOUT = float(os.getenv("FILE_DOWNLOAD_TIMEOUT", 10))  # Seconds to connect and between received chunks
+WAIT_POLL_INTERVAL = float(os.getenv("WAIT_POLL_INTERVAL", 0.05))  # Seconds between checks of wait_until
+WAIT_SETTLE_TIMEOUT = float(os.getenv("WAIT_SETTLE_TIMEOUT", 1))  # Max seconds for scroll/focus/value to settle
+TYPING_MIN_DELAY = float(os.getenv("TYPING_MIN_DELAY", 0.05))  # Seconds between keystrokes (slow typing)
+TYPING_MAX_DELAY = float(os.getenv("TYPING_MAX_DELAY", 0.3))
+TYPING_TIME_BUDGET = float(os.getenv("TYPING_TIME_BUDGET", 5))  # Max seconds of pauses per slowly typed text
+EXTRACT_CHUNK_SIZE = int(os.getenv("EXTRACT_CHUNK_SIZE", 500))  # Rows serialized per execute_script by extract
+EXTRACT_MAX_PAGES = int(os.getenv("EXTRACT_MAX_PAGES", 50))  # Pages walked by extract_pages
+ARTIFACTS_DIR = os.path.abspath(os.getenv("ARTIFACTS_DIR") or "artifacts")  # Files offered through GET /artifacts/<id>
+ARTIFACT_MAX_AGE = int(os.getenv("ARTIFACT_MAX_AGE", 3600))  # Seconds an artifact can be downloaded
+ARTIFACT_MAINTENANCE_INTERVAL = int(os.getenv("ARTIFACT_MAINTENANCE_INTERVAL", 300))  # Seconds between artifact cleanups
+USE_X_SENDFILE = os.getenv("USE_X_SENDFILE", "False") == "True"  # Let the proxy (nginx, Apache) send files
+SCREENSHOT_DIR = os.path.abspath(os.getenv("SCREENSHOT_DIR") or os.path.join("logs", "screenshots"))  # Content-addressed store
+SCREENSHOT_FORMAT = os.getenv("SCREENSHOT_FORMAT") or 'png'  # 'png', 'webp' or 'jpeg'
+SCREENSHOT_QUALITY = int(os.getenv("SCREENSHOT_QUALITY", 80))  # 0-100, WebP and JPEG only
+SCREENSHOT_MAX_BYTES = int(os.getenv("SCREENSHOT_MAX_BYTES", 200 * 1024 * 1024))  # Oldest screenshots are deleted above it (0: no limit)
+PARSE_CACHE_SIZE = int(os.getenv("PARSE_CACHE_SIZE", 16))  # Parsed page sources kept by actions/parse_html.py
 BASE_URL = 'https://www.google.com/'
 LOG_FILE_DELETION_DAYS = 30
+LOG_MAINTENANCE_INTERVAL = int(os.getenv("LOG_MAINTENANCE_INTERVAL", 3600))  # Seconds between log cleanups
+LOG_MAX_BYTES = int(os.getenv("LOG_MAX_BYTES", 10 * 1024 * 1024))  # Rotate the log file above this size
+LOG_ROTATE_INTERVAL = int(os.getenv("LOG_ROTATE_INTERVAL", 86400))  # Seconds, rotate the log file after this age
+LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", 10000))  # Records buffered before the policy applies
+LOG_QUEUE_POLICY = os.getenv("LOG_QUEUE_POLICY") or 'drop'  # 'drop' or 'block' when the buffer is full
+LOG_QUEUE_BLOCK_TIMEOUT = float(os.getenv("LOG_QUEUE_BLOCK_TIMEOUT", 1))  # Seconds, 'block' policy only
+LOG_BATCH_SIZE = int(os.getenv("LOG_BATCH_SIZE", 200))  # Records written per flush
+LOG_JSON = os.getenv("LOG_JSON", "False") == "True"  # JSON lines with request_id, controller, action, duration
+DRIVER_MANIFEST_PATH = os.path.abspath(
+    os.getenv("DRIVER_MANIFEST_PATH") or os.path.join(".driver_cache", "manifest.json"))
+
+# Strategy cache of click_element (actions/strategy_cache.py)
+STRATEGY_CACHE_SIZE = int(os.getenv("STRATEGY_CACHE_SIZE", 1000))  # (site, locator) entries kept
+STRATEGY_CACHE_PATH = os.path.abspath(os.getenv("STRATEGY_CACHE_PATH")) if os.getenv("STRATEGY_CACHE_PATH") else None
+
+# Driver pool (actions/driver_pool.py)
+DRIVER_POOL_SIZE = int(os.getenv("DRIVER_POOL_SIZE", 2))  # Drivers per browser type and profile
+DRIVER_POOL_PREWARM = os.getenv("DRIVER_POOL_PREWARM", "True") == "True"
+DRIVER_POOL_MAX_IDLE = int(os.getenv("DRIVER_POOL_MAX_IDLE", 300))  # Seconds
+DRIVER_POOL_MAX_USES = int(os.getenv("DRIVER_POOL_MAX_USES", 25))
+DRIVER_POOL_MAX_AGE = int(os.getenv("DRIVER_POOL_MAX_AGE", 1800))  # Seconds
+DRIVER_POOL_LEASE_TIMEOUT = int(os.getenv("DRIVER_POOL_LEASE_TIMEOUT", 60))  # Seconds
+
+# Saved login sessions (actions/session_store.py)
+SESSION_STORE_PATH = os.getenv("SESSION_STORE_PATH", ".sessions") or None  # Encrypted sessions (empty: memory only)
+SESSION_STORE_KEY = os.getenv("SESSION_STORE_KEY") or None  # Secret for the encryption key (unset: memory only)
+SESSION_TTL = int(os.getenv("SESSION_TTL", 3600))  # Seconds a saved session is reused before logging in again
+SESSION_MAX_ENTRIES = int(os.getenv("SESSION_MAX_ENTRIES", 100))  # (site, username) sessions kept (LRU)
+
+# Browser profiles (actions/browser_profiles.py)
+DRIVER_PROFILE = os.getenv("DRIVER_PROFILE") or 'default'  # 'default' or 'lean' (blocks images, fonts, media, trackers)
+BLOCKED_URL_PATTERNS = [pattern.strip() for pattern in os.getenv("BLOCKED_URL_PATTERNS", "").split(",") if pattern.strip()]
+DRIVER_REAPER_INTERVAL = int(os.getenv("DRIVER_REAPER_INTERVAL", 30))  # Seconds between orphan sweeps
+
+# Background jobs (utils/jobs.py)
+JOBS_DB_PATH = os.path.abspath(
+    os.getenv("JOBS_DB_PATH") or os.path.join("jobs", "jobs.sqlite3"))
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", 2))  # Jobs run at the same time per gunicorn worker
+JOB_POLL_INTERVAL = float(os.getenv("JOB_POLL_INTERVAL", 1))  # Seconds
+JOB_LEASE_TIMEOUT = float(os.getenv("JOB_LEASE_TIMEOUT", 120))  # Seconds without a heartbeat before any worker re-queues a running job
+
+# Metrics (utils/metrics.py)
+METRICS_DIR = os.path.abspath(os.getenv("METRICS_DIR") or "metrics")  # Snapshots shared by the gunicorn workers of this host
+METRICS_SNAPSHOT_INTERVAL = float(os.getenv("METRICS_SNAPSHOT_INTERVAL", 10))  # Seconds between snapshots of each worker
+
+# Batch endpoint (utils/handle_batch.py)
+BATCH_CONCURRENCY = int(os.getenv("BATCH_CONCURRENCY", DRIVER_POOL_SIZE))  # Default items run in parallel
+BATCH_MAX_CONCURRENCY = int(os.getenv("BATCH_MAX_CONCURRENCY", 8))  # Upper bound a request can ask for (also capped by DRIVER_POOL_SIZE)
+BATCH_ITEM_TIMEOUT = float(os.getenv("BATCH_ITEM_TIMEOUT", 300))  # Seconds per item
 
 def has_display():
     if HEADLESS_MODE == 'True' or os.getenv("DOCKERIZED"):
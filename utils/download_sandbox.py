@@ -0,0 +1,235 @@
+import logging
+import os
+import re
+import shutil
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from contextvars import ContextVar
+import psutil
+from utils.config import (
+    DOWNLOAD_DIR,
+    DOWNLOAD_JANITOR_INTERVAL,
+    DOWNLOAD_SANDBOX_MAX_AGE,
+    DOWNLOAD_SANDBOX_MAX_BYTES,
+)
+from utils.maintenance import register_maintenance_task
+from utils.metrics import register_metrics_collector
+
+# Sandboxes are DOWNLOAD_DIR/<pid>-<start>-<label>-<random>: the pid and the start
+# time of the process (pids repeat after a container restart) tell the janitor
+# which process owns them, so a worker never deletes another worker's sandbox
+_SANDBOX_NAME = re.compile(r'^(\d+)-(\d+)-[\w-]*$')
+_LABEL_CHARS = re.compile(r'[^\w-]')
+
+# Sandbox of the current request or batch item, see download_sandbox()
+_current_sandbox = ContextVar('download_sandbox', default=None)
+
+# path -> open download_sandbox() blocks, and path -> time.time() when the last one closed
+_active = {}
+_finished = {}
+# path of an open sandbox -> names already returned by wait_for_download() in it
+_delivered = {}
+_lock = threading.Lock()
+_stats = {'created': 0, 'removed': 0, 'removed_bytes': 0}
+# The janitor is scheduled by the first sandbox of the process, not by every request
+_janitor_registered = False
+# pid -> int(create_time) of this process (cached per pid: workers are forked)
+_process_starts = {}
+
+
+@contextmanager
+def download_sandbox(label=None):
+    """
+    Gives the block a download directory of its own inside DOWNLOAD_DIR.
+
+    Drivers leased or created inside the block download there (see
+    set_download_directory) and wait_for_download() watches it by default,
+    so concurrent requests never race on file names. The directory is not
+    deleted on exit: the maintenance janitor removes it later
+    (DOWNLOAD_SANDBOX_MAX_AGE / DOWNLOAD_SANDBOX_MAX_BYTES).
+
+    Args:
+        label: Readable part of the directory name, e.g. the request id
+
+    Example:
+        with download_sandbox(request_id) as directory:
+            with lease_page() as driver:
+                driver = click_element(driver, download_button)
+                path = wait_for_download()
+    """
+    global _janitor_registered
+    label = _LABEL_CHARS.sub('', label or '')[:40]
+    pid, start = _process_owner()
+    path = os.path.join(DOWNLOAD_DIR, f"{pid}-{start}-{label}-{uuid.uuid4().hex[:12]}")
+    os.makedirs(path)
+    with _lock:
+        _active[path] = 1
+        _delivered[path] = set()
+        _stats['created'] += 1
+        register_janitor = not _janitor_registered
+        _janitor_registered = True
+    if register_janitor:
+        register_maintenance_task('download_janitor', clean_download_sandboxes, DOWNLOAD_JANITOR_INTERVAL)
+
+    token = _current_sandbox.set(path)
+    try:
+        yield path
+    finally:
+        _current_sandbox.reset(token)
+        with _lock:
+            _active.pop(path, None)
+            _delivered.pop(path, None)
+            _finished[path] = time.time()
+
+
+def current_download_dir():
+    """
+    Download directory of the current request: its sandbox or DOWNLOAD_DIR.
+    """
+    return _current_sandbox.get() or DOWNLOAD_DIR
+
+
+def sandbox_downloads(directory):
+    """
+    Names already returned by wait_for_download() in `directory` if it is an
+    open sandbox (created empty: every other file in it is a new download),
+    None for any other directory.
+    """
+    with _lock:
+        return _delivered.get(directory)
+
+
+def set_download_directory(driver, directory=None):
+    """
+    Points the downloads of a launched Chromium driver to `directory`
+    (default: current_download_dir()) through CDP.
+
+    Browser.setDownloadBehavior covers every tab of the driver; old Chrome
+    versions only have the per-tab Page.setDownloadBehavior. Firefox has no
+    CDP and keeps the directory set at launch.
+
+    Returns:
+        bool: True if the directory was set
+    """
+    directory = directory or current_download_dir()
+    if not hasattr(driver, 'execute_cdp_cmd'):
+        return False
+    params = {'behavior': 'allow', 'downloadPath': directory}
+    for command in ('Browser.setDownloadBehavior', 'Page.setDownloadBehavior'):
+        try:
+            driver.execute_cdp_cmd(command, params)
+            return True
+        except Exception as e:
+            error = e
+    logging.warning(f"Could not set the download directory {directory}: {error}")
+    return False
+
+
+def clean_download_sandboxes(max_age=DOWNLOAD_SANDBOX_MAX_AGE, max_bytes=DOWNLOAD_SANDBOX_MAX_BYTES, now=None):
+    """
+    Janitor of the maintenance thread. Deletes the sandboxes of this process
+    finished more than `max_age` seconds ago, and those of dead processes
+    (no process with that pid and start time) not modified for `max_age`
+    seconds. If the sandboxes left still take more than `max_bytes`, the
+    oldest finished ones go first. Open sandboxes are never touched.
+
+    Returns:
+        int: Number of sandboxes removed
+    """
+    now = now or time.time()
+    process = _process_owner()
+    try:
+        entries = [entry for entry in os.scandir(DOWNLOAD_DIR) if entry.is_dir(follow_symlinks=False)]
+    except FileNotFoundError:
+        return 0
+
+    with _lock:
+        active = set(_active)
+        finished = dict(_finished)
+
+    # (finished at, path) of the sandboxes the janitor may delete
+    candidates = []
+    for entry in entries:
+        match = _SANDBOX_NAME.match(entry.name)
+        if not match or entry.path in active:
+            continue
+        owner = (int(match.group(1)), int(match.group(2)))
+        if entry.path in finished:
+            candidates.append((finished[entry.path], entry.path))
+        elif owner != process and not _process_alive(*owner):
+            candidates.append((_last_modified(entry.path), entry.path))
+
+    candidates.sort()
+    sizes = {path: _directory_size(path) for _, path in candidates}
+    total = sum(sizes.values()) + sum(_directory_size(path) for path in active)
+    removed = 0
+    for finished_at, path in candidates:
+        if now - finished_at < max_age and (not max_bytes or total <= max_bytes):
+            continue
+        shutil.rmtree(path, ignore_errors=True)
+        total -= sizes[path]
+        removed += 1
+        with _lock:
+            _finished.pop(path, None)
+            _stats['removed'] += 1
+            _stats['removed_bytes'] += sizes[path]
+    if removed:
+        logging.info(f"Download janitor removed {removed} sandboxes")
+    return removed
+
+
+def download_sandbox_metrics():
+    with _lock:
+        active, finished, stats = len(_active), len(_finished), dict(_stats)
+    return [
+        ('scraper_download_sandboxes', 'gauge', 'Download sandboxes of this process by state.',
+         [({'state': 'active'}, active), ({'state': 'finished'}, finished)]),
+        ('scraper_download_sandboxes_removed_total', 'counter', 'Sandboxes deleted by the download janitor.',
+         [({}, stats['removed'])]),
+        ('scraper_download_sandbox_removed_bytes_total', 'counter', 'Bytes freed by the download janitor.',
+         [({}, stats['removed_bytes'])]),
+    ]
+
+
+def _process_owner():
+    pid = os.getpid()
+    if pid not in _process_starts:
+        _process_starts[pid] = int(psutil.Process(pid).create_time())
+    return pid, _process_starts[pid]
+
+
+def _process_alive(pid, start):
+    try:
+        # create_time is derived from the boot time: allow for rounding
+        return abs(psutil.Process(pid).create_time() - start) <= 1
+    except psutil.NoSuchProcess:
+        return False
+    except psutil.Error:
+        return True
+
+
+def _directory_size(path):
+    total = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            try:
+                total += os.lstat(os.path.join(root, name)).st_size
+            except OSError:
+                pass
+    return total
+
+
+def _last_modified(path):
+    latest = os.lstat(path).st_mtime
+    for root, dirs, files in os.walk(path):
+        for name in dirs + files:
+            try:
+                latest = max(latest, os.lstat(os.path.join(root, name)).st_mtime)
+            except OSError:
+                pass
+    return latest
+
+
+register_metrics_collector('download_sandbox', download_sandbox_metrics)
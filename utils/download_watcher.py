@@ -0,0 +1,294 @@
+import ctypes
+import ctypes.util
+import fnmatch
+import logging
+import os
+import select
+import struct
+import sys
+import threading
+import time
+from utils.config import DOWNLOAD_MAX_TIMEOUT, WAIT_POLL_INTERVAL
+from utils.download_sandbox import current_download_dir, sandbox_downloads
+from utils.error import messageError
+
+# Files a browser is still writing: Chrome (.crdownload), Firefox (.part), others
+PARTIAL_SUFFIXES = ('.crdownload', '.part', '.partial', '.download', '.tmp')
+
+# inotify(7)
+_IN_CLOSE_WRITE = 0x00000008
+_IN_MOVED_TO = 0x00000080
+_IN_Q_OVERFLOW = 0x00004000
+_IN_IGNORED = 0x00008000
+_IN_NONBLOCK = 0o4000
+_IN_CLOEXEC = 0o2000000
+_EVENT_HEADER = struct.Struct('iIII')
+
+# With inotify the directories are also rescanned this often (missed or overflowed events)
+_RESCAN_INTERVAL = 1.0
+
+
+class DownloadWatcher:
+    """
+    Waits for browser downloads to finish in one or more directories
+    (by default the download directory of the current request).
+
+    A single background thread reads inotify events (Linux) for every watched
+    directory and wakes the waiters; elsewhere, or if inotify is not
+    available, the directories are polled every `poll_interval` seconds.
+
+    A file counts as finished when it is not a partial file (PARTIAL_SUFFIXES),
+    no partial file with its name exists next to it (Firefox keeps an empty
+    placeholder while writing name.part), and it was closed or renamed into
+    place with some content (inotify) or its size did not change for
+    `poll_interval` seconds. An empty file is only confirmed by its size: the
+    Firefox placeholder is closed before name.part appears.
+
+    Every finished file is returned to one waiter only, so several downloads
+    (or several requests) can wait in the same directory at the same time.
+    """
+
+    def __init__(self, poll_interval=WAIT_POLL_INTERVAL, use_inotify=True):
+        self.poll_interval = poll_interval
+        self._condition = threading.Condition()
+        self._fd = _inotify_init() if use_inotify else None
+        self._thread = None
+        # directory -> {'wd', 'waiters', 'version', 'completed', 'sizes', 'claimed'}
+        # ('sizes': name -> (size, time.monotonic() when first seen with that size))
+        self._directories = {}
+        self._wds = {}
+
+    @property
+    def uses_inotify(self):
+        return self._fd is not None
+
+    def snapshot(self, directory=None):
+        """
+        Names of the files in `directory` now. Taken before the click that
+        starts a download, so the download is found even if it finishes
+        before wait() is called.
+        """
+        try:
+            return {entry.name for entry in os.scandir(directory or current_download_dir())}
+        except FileNotFoundError:
+            return set()
+
+    def wait(self, directory=None, timeout=DOWNLOAD_MAX_TIMEOUT, existing=None, count=1, pattern=None):
+        """
+        Returns the paths of the first `count` downloads that finish in `directory`.
+
+        Args:
+            directory: Download directory. Default: the sandbox of the current
+                request (see utils/download_sandbox.py) or DOWNLOAD_DIR
+            timeout: Maximum seconds to wait for all of them
+            existing: Names to ignore (see snapshot). Default: in an open download
+                sandbox the files already returned by a previous wait, so a
+                download finished before wait() is found; elsewhere the files
+                present now
+            count: Number of downloads to wait for
+            pattern: Optional glob the file name must match, e.g. '*.pdf'
+
+        Returns:
+            list: Absolute paths, in the order the downloads finished
+
+        Raises:
+            messageError: If fewer than `count` downloads finish within `timeout`
+        """
+        directory = os.path.abspath(directory or current_download_dir())
+        os.makedirs(directory, exist_ok=True)
+        delivered = sandbox_downloads(directory) if existing is None else None
+        if existing is None:
+            existing = set(delivered) if delivered is not None else self.snapshot(directory)
+        else:
+            existing = set(existing)
+        deadline = time.monotonic() + timeout
+        found = []
+
+        with self._condition:
+            state = self._watch(directory)
+        try:
+            while True:
+                with self._condition:
+                    version = state['version']
+                    finished, unconfirmed = self._finished(directory, state, existing, pattern)
+                    for name in finished:
+                        state['claimed'].add(name)
+                        found.append(os.path.join(directory, name))
+                        if len(found) == count:
+                            if delivered is not None:
+                                delivered.update(os.path.basename(path) for path in found)
+                            return found
+
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise messageError(
+                            f"Download not finished after {timeout}s in {directory} "
+                            f"({len(found)}/{count} files)")
+                    # New files without a completion event are confirmed by a later scan
+                    interval = _RESCAN_INTERVAL if self.uses_inotify and not unconfirmed else self.poll_interval
+                    # A new event (version change) wakes the waiter before the interval ends
+                    self._condition.wait_for(lambda: state['version'] != version, min(remaining, interval))
+        except BaseException:
+            # Files already claimed by a failed wait can be found by other waiters
+            with self._condition:
+                state['claimed'].difference_update(os.path.basename(path) for path in found)
+            raise
+        finally:
+            with self._condition:
+                self._unwatch(directory)
+
+    def _finished(self, directory, state, existing, pattern):
+        # Called with the condition held
+        try:
+            entries = {entry.name: entry.stat().st_size for entry in os.scandir(directory) if entry.is_file()}
+        except FileNotFoundError:
+            return [], 0
+        partial = {name for name in entries if name.endswith(PARTIAL_SUFFIXES)}
+        now = time.monotonic()
+        previous_sizes = state['sizes']
+        state['sizes'] = {name: previous_sizes[name] if previous_sizes.get(name, (None,))[0] == size else (size, now)
+                          for name, size in entries.items()}
+
+        finished = []
+        unconfirmed = 0
+        for name, size in entries.items():
+            if (name in existing or name in state['claimed'] or name in partial or name.startswith('.')
+                    or any(name + suffix in partial for suffix in PARTIAL_SUFFIXES)):
+                continue
+            if pattern and not fnmatch.fnmatch(name, pattern):
+                continue
+            if (name in state['completed'] and size > 0) or now - state['sizes'][name][1] >= self.poll_interval:
+                finished.append(name)
+            else:
+                unconfirmed += 1
+        return finished, unconfirmed
+
+    def _watch(self, directory):
+        state = self._directories.get(directory)
+        if state is None:
+            state = {'wd': None, 'waiters': 0, 'version': 0, 'completed': set(), 'sizes': {}, 'claimed': set()}
+            self._directories[directory] = state
+            if self._fd is not None:
+                wd = _libc.inotify_add_watch(self._fd, os.fsencode(directory), _IN_CLOSE_WRITE | _IN_MOVED_TO)
+                if wd >= 0:
+                    state['wd'] = wd
+                    self._wds[wd] = directory
+                    self._start()
+                else:
+                    logging.warning(f"inotify watch failed for {directory} (errno {ctypes.get_errno()}), polling it")
+        state['waiters'] += 1
+        return state
+
+    def _unwatch(self, directory):
+        state = self._directories[directory]
+        state['waiters'] -= 1
+        if state['waiters'] == 0:
+            del self._directories[directory]
+            if state['wd'] is not None:
+                self._wds.pop(state['wd'], None)
+                _libc.inotify_rm_watch(self._fd, state['wd'])
+
+    def _start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._read_events, daemon=True, name="download-watcher")
+            self._thread.start()
+
+    def _read_events(self):
+        while True:
+            try:
+                readable, _, _ = select.select([self._fd], [], [], _RESCAN_INTERVAL)
+                if not readable:
+                    continue
+                data = os.read(self._fd, 64 * 1024)
+            except BlockingIOError:
+                continue
+            except OSError as e:
+                logging.error(f"Download watcher stopped: {e}")
+                return
+
+            with self._condition:
+                offset = 0
+                while offset + _EVENT_HEADER.size <= len(data):
+                    wd, mask, _, length = _EVENT_HEADER.unpack_from(data, offset)
+                    name = data[offset + _EVENT_HEADER.size:offset + _EVENT_HEADER.size + length].rstrip(b'\0')
+                    offset += _EVENT_HEADER.size + length
+                    if mask & _IN_Q_OVERFLOW:
+                        # Events lost: wake every waiter so they rescan
+                        for state in self._directories.values():
+                            state['version'] += 1
+                        continue
+                    directory = self._wds.get(wd)
+                    if directory is None or mask & _IN_IGNORED:
+                        continue
+                    state = self._directories[directory]
+                    state['completed'].add(os.fsdecode(name))
+                    state['version'] += 1
+                self._condition.notify_all()
+
+
+def _load_libc():
+    if not sys.platform.startswith('linux'):
+        return None
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+        libc.inotify_init1.argtypes = [ctypes.c_int]
+        libc.inotify_add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+        libc.inotify_rm_watch.argtypes = [ctypes.c_int, ctypes.c_int]
+        return libc
+    except (OSError, AttributeError):
+        return None
+
+
+_libc = _load_libc()
+
+
+def _inotify_init():
+    if _libc is None:
+        return None
+    fd = _libc.inotify_init1(_IN_NONBLOCK | _IN_CLOEXEC)
+    if fd < 0:
+        logging.warning(f"inotify not available (errno {ctypes.get_errno()}), polling download directories")
+        return None
+    return fd
+
+
+_watcher = None
+_watcher_lock = threading.Lock()
+
+
+def get_download_watcher():
+    global _watcher
+    with _watcher_lock:
+        if _watcher is None:
+            _watcher = DownloadWatcher()
+        return _watcher
+
+
+def download_snapshot(directory=None):
+    """
+    Files already in `directory`, to pass as `existing` to wait_for_download.
+    """
+    return get_download_watcher().snapshot(directory)
+
+
+def wait_for_download(directory=None, timeout=DOWNLOAD_MAX_TIMEOUT, existing=None, pattern=None):
+    """
+    Espera a que termine una descarga en `directory` (default: el directorio de
+    descargas de la petición actual) y devuelve su ruta.
+
+    Example:
+        existing = download_snapshot()
+        driver = click_element(driver, download_button)
+        path = wait_for_download(existing=existing, pattern='*.pdf')
+    """
+    return get_download_watcher().wait(directory, timeout, existing, 1, pattern)[0]
+
+
+def wait_for_downloads(count, directory=None, timeout=DOWNLOAD_MAX_TIMEOUT, existing=None, pattern=None):
+    """
+    Igual que wait_for_download para `count` descargas simultáneas.
+
+    Returns:
+        list: Rutas en el orden en que terminaron
+    """
+    return get_download_watcher().wait(directory, timeout, existing, count, pattern)
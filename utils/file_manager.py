@@ -4,11 +4,23 @@ import re
 import io
 import requests
 import base64
+import threading
+from contextlib import contextmanager
+from urllib.parse import unquote, urlparse
+from requests.adapters import HTTPAdapter
+from utils.config import FILE_CHUNK_SIZE, FILE_DOWNLOAD_TIMEOUT, HTTP_POOL_SIZE
 from utils.error import messageError
+from utils.screenshots import get_screenshot_service
 import uuid
 import tempfile
 import shutil
-from datetime import datetime
+
+URL_PATTERN = re.compile(r'^https?://\S+$')
+_BASE64_NOISE = re.compile(r'[^A-Za-z0-9+/=]')
+
+# Shared by every request of the process, so downloads reuse connections (see get_http_session)
+_session = None
+_session_lock = threading.Lock()
 
 
 def clear_directory(directory):
@@ -19,19 +31,23 @@ def clear_directory(directory):
             # Create the full path to the file
             file_path = os.path.join(directory, file_name)
             try:
-                # Check if the item is a file
-                if os.path.isfile(file_path):
+                # Check if the item is a file (or a link, whose target is kept)
+                if os.path.isfile(file_path) or os.path.islink(file_path):
                     # Delete the file
                     os.remove(file_path)
-                # If it is a directory, recursively delete its contents
+                # If it is a directory, delete it with its contents
                 elif os.path.isdir(file_path):
-                    clear_directory(file_path)
+                    shutil.rmtree(file_path)
             except Exception as e:
                 logging.info(f"Could not delete {file_path}: {e}")
     else:
         logging.info(f"The directory {directory} does not exist")
 
 
+# Directories already created by this process (see create_download_directory_once)
+_created_directories = set()
+
+
 def create_download_directory(directory_name):
 
     # Creates a directory for downloading files within the current working directory.
@@ -45,6 +61,15 @@ def create_download_directory(directory_name):
     return download_dir
 
 
+def create_download_directory_once(directory_name):
+    # Same as create_download_directory but only touches the filesystem the
+    # first time per process, so it can be called on every request.
+    if directory_name not in _created_directories:
+        create_download_directory(directory_name)
+        _created_directories.add(directory_name)
+    return os.path.join(os.getcwd(), directory_name)
+
+
 def clean_filename(filename):
     # Defines a regular expression that matches any character that is not a letter, number, space, or underscore
     invalid_chars_regex = r'[^\w\s-]'
@@ -61,12 +86,10 @@ def get_file(data):
     :return: Contenido binario del archivo, nombre del archivo y su extensión
     :raises MessageError: Si el formato de archivo no es válido
     """
-    url_pattern = re.compile(r'^https?://\S+$')
-
-    if isinstance(data, str) and url_pattern.match(data):
+    if isinstance(data, str) and URL_PATTERN.match(data):
         # Si es una URL, obtiene el nombre y extensión del archivo
         try:
-            response = requests.get(data, timeout=10)
+            response = get_http_session().get(data, timeout=10)
             response.raise_for_status()  # Lanza error si el request falla
 
             # Obtener el nombre y la extensión desde la URL
@@ -113,32 +136,162 @@ def createTempFile(data, file_name):
     # Retorna la ruta del archivo renombrado
     return final_path
 
-def take_screenshot(driver, directory="logs"):
+
+def get_http_session():
+    """
+    requests.Session compartida por el proceso, con un pool de HTTP_POOL_SIZE
+    conexiones por host para reutilizar conexiones entre descargas.
     """
-    Toma una captura de pantalla del navegador y la guarda con la fecha y hora actual.
+    global _session
+    with _session_lock:
+        if _session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=HTTP_POOL_SIZE, pool_maxsize=HTTP_POOL_SIZE)
+            session.mount('http://', adapter)
+            session.mount('https://', adapter)
+            _session = session
+        return _session
 
-    Args:
-        driver: Instancia del WebDriver de Selenium
-        directory (str): Directorio donde guardar la captura (por defecto "logs")
 
-    Returns:
-        str: Ruta completa del archivo de captura guardado
+def save_file(data, directory=None, file_name=None, chunk_size=FILE_CHUNK_SIZE):
+    """
+    Versión en streaming de get_file + createTempFile: escribe el archivo
+    directamente en su ruta final por bloques, sin tener todo su contenido en
+    memoria ni copiarlo en disco.
+
+    - URL: se descarga con iter_content por la sesión compartida
+    - Cadena Base64: se decodifica por bloques
+    - bytes, BytesIO u objeto con read(): se copia por bloques
+
+    :param data: URL del archivo, contenido binario, objeto con read() o cadena Base64
+    :param directory: Directorio destino (default: directorio temporal del sistema)
+    :param file_name: Nombre del archivo (default: el de la URL o uno generado como en get_file)
+    :param chunk_size: Bytes por bloque
+    :return: Ruta del archivo guardado
+    :raises MessageError: Si la descarga o la decodificación fallan
+    """
+    directory = directory or tempfile.gettempdir()
+    os.makedirs(directory, exist_ok=True)
+
+    if isinstance(data, str) and URL_PATTERN.match(data):
+        try:
+            response = get_http_session().get(data, stream=True, timeout=FILE_DOWNLOAD_TIMEOUT)
+        except requests.RequestException as e:
+            raise messageError(f"Error al descargar el archivo: {e}")
+        with response:
+            try:
+                response.raise_for_status()
+            except requests.RequestException as e:
+                raise messageError(f"Error al descargar el archivo: {e}")
+            name = file_name or _response_file_name(response, data)
+            return _write_chunks(directory, name, response.iter_content(chunk_size),
+                                 "Error al descargar el archivo")
+
+    if isinstance(data, bytes):
+        return _write_chunks(directory, file_name or f"{uuid.uuid4()}.bin", [data])
+
+    if hasattr(data, 'read'):
+        chunks = iter(lambda: data.read(chunk_size), b'')
+        return _write_chunks(directory, file_name or f"{uuid.uuid4()}.bin", chunks)
+
+    if isinstance(data, str):
+        return _write_chunks(directory, file_name or f"{uuid.uuid4()}.pdf",
+                             iter_base64_decode(data, chunk_size), "Error al decodificar Base64")
+
+    raise messageError("Formato de archivo desconocido")
+
+
+@contextmanager
+def temp_file(data, file_name=None):
+    """
+    save_file en un directorio temporal propio que se borra al salir del bloque.
+
+    Example:
+        with temp_file(data['document']) as path:
+            upload_element.send_keys(path)
     """
+    directory = tempfile.mkdtemp(prefix='scraper_')
     try:
-        # Crear directorio si no existe
-        os.makedirs(directory, exist_ok=True)
+        yield save_file(data, directory, file_name)
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
 
-        # Generar nombre del archivo con fecha y hora
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = f"screenshot_{timestamp}.png"
-        filepath = os.path.join(directory, filename)
 
-        # Tomar captura de pantalla
-        driver.save_screenshot(filepath)
+def iter_base64_decode(data, chunk_size=FILE_CHUNK_SIZE):
+    """
+    Decodifica una cadena Base64 por bloques. Igual que base64.b64decode,
+    ignora los caracteres fuera del alfabeto (saltos de línea, espacios).
+    """
+    # 4 Base64 characters encode 3 bytes: decode whole groups and carry the rest
+    step = max(4, chunk_size // 3 * 4)
+    pending = ''
+    for start in range(0, len(data), step):
+        text = pending + _BASE64_NOISE.sub('', data[start:start + step])
+        usable = len(text) - len(text) % 4
+        pending = text[usable:]
+        if usable:
+            yield base64.b64decode(text[:usable])
+    if pending:
+        # Incorrect padding is reported like base64.b64decode does
+        yield base64.b64decode(pending)
 
-        logging.info(f"Screenshot saved: {filepath}")
-        return filepath
 
+def _write_chunks(directory, file_name, chunks, error_message="Error al guardar el archivo"):
+    # Written to a unique .part file in the same directory and renamed at the end,
+    # so a failed download never leaves a truncated file under the final name
+    final_path = os.path.join(directory, os.path.basename(file_name))
+    fd, part_path = tempfile.mkstemp(dir=directory, prefix='.', suffix='.part')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            for chunk in chunks:
+                if chunk:
+                    f.write(chunk)
+        os.replace(part_path, final_path)
+        return final_path
     except Exception as e:
-        logging.error(f"Error taking screenshot: {e}")
-        raise messageError(f"Error al tomar captura de pantalla: {e}")
+        try:
+            os.remove(part_path)
+        except OSError:
+            pass
+        raise messageError(f"{error_message}: {e}")
+
+
+def _response_file_name(response, url):
+    # Content-Disposition first, then the last segment of the URL path (without query string)
+    disposition = response.headers.get('Content-Disposition', '')
+    match = re.search(r"filename\*=(?:UTF-8'')?([^;]+)|filename=\"?([^\";]+)\"?", disposition, re.IGNORECASE)
+    if match:
+        name = unquote((match.group(1) or match.group(2)).strip())
+    else:
+        name = unquote(os.path.basename(urlparse(url).path))
+    name = os.path.basename(name.replace('\\', '/'))
+    return name or f"{uuid.uuid4()}.unknown"
+
+def take_screenshot(driver, directory=None, element=None, full_page=False, image_format=None, quality=None,
+                    background=False):
+    """
+    Toma una captura de pantalla del navegador y la guarda en el almacén de capturas
+    (utils/screenshots.py): el nombre es el hash del contenido, así que capturas
+    simultáneas nunca coinciden.
+
+    Al volver el archivo ya está escrito. Con background=True la codificación y
+    la escritura se hacen en segundo plano: la ruta se devuelve enseguida y el
+    archivo aparece poco después (get_screenshot_service(directory).wait(path)
+    espera a que exista).
+
+    Args:
+        driver: Instancia del WebDriver de Selenium
+        directory (str): Directorio del almacén (por defecto SCREENSHOT_DIR)
+        element: WebElement a recortar (opcional)
+        full_page (bool): Página completa en lugar de la parte visible
+        image_format (str): 'png', 'webp' o 'jpeg' (por defecto SCREENSHOT_FORMAT).
+            WebP y JPEG solo en Chromium; Firefox los convierte solo si Pillow está instalado
+        quality (int): Calidad 0-100 para WebP y JPEG (por defecto SCREENSHOT_QUALITY)
+        background (bool): Devolver la ruta sin esperar a que se escriba el archivo
+
+    Returns:
+        str: Ruta completa del archivo de captura
+    """
+    options = {key: value for key, value in (('image_format', image_format), ('quality', quality))
+               if value is not None}
+    return get_screenshot_service(directory).capture(driver, element, full_page, background=background, **options)
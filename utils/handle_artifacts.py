@@ -0,0 +1,19 @@
+import time
+from flask import jsonify, send_file
+from utils.artifacts import get_artifact
+from utils.security import authenticate_token
+
+
+def handle_artifact_download(artifact_id):
+    """
+    Streams a stored artifact: GET /artifacts/<id> (the id comes in the
+    message of the request that produced it). Range requests are supported.
+    """
+    start_time = time.time()
+    if not authenticate_token():
+        return jsonify({"status": "ERROR", "message": "Unauthorized", "time": time.time() - start_time}), 401
+    artifact = get_artifact(artifact_id)
+    if artifact is None:
+        return jsonify({"status": "ERROR", "message": "Artifact not found", "time": time.time() - start_time}), 404
+    return send_file(artifact['path'], mimetype=artifact['mimetype'], as_attachment=True,
+                     download_name=artifact['name'], conditional=True, max_age=0)
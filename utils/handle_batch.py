@@ -0,0 +1,147 @@
+import json
+import logging
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from flask import Response, jsonify, request, stream_with_context
+from actions.browser_profiles import PROFILES, browser_profile
+from actions.driver_registry import driver_owner, kill_owned_trees
+from utils.artifacts import store_file_result
+from utils.config import BATCH_CONCURRENCY, BATCH_ITEM_TIMEOUT, BATCH_MAX_CONCURRENCY, DOWNLOAD_DIR, DRIVER_POOL_SIZE
+from utils.download_sandbox import download_sandbox
+from utils.file_manager import create_download_directory_once
+from utils.logging_config import configure_logger, log_context, new_request_id
+from utils.security import authenticate_token
+
+
+def handle_batch_endpoint(controller_function, controller_name=None):
+    """
+    Runs `controller_function` once per payload and streams one NDJSON line per
+    item as soon as it finishes, followed by a summary line.
+
+    Expected body: a list of payloads, or
+        {"items": [...], "concurrency": 4, "timeout": 60}
+
+    Every item line has the shape of a handle_request_endpoint response plus
+    its position in the input: {"index", "status", "message", "time"}.
+
+    `controller_function` None (unknown `controller_name`) is answered with
+    404 once the token has been checked.
+    """
+    configure_logger()
+    create_download_directory_once(DOWNLOAD_DIR)
+    request_id = new_request_id(request.headers.get('X-Request-ID'))
+    name = controller_function.__name__ if controller_function else controller_name
+    with log_context(request_id, name):
+        response = _handle_batch(controller_function, request_id, name)
+    if isinstance(response, Response):
+        response.headers['X-Request-ID'] = request_id
+    return response
+
+
+def _handle_batch(controller_function, request_id, name):
+    start_time = time.time()
+    logging.info(f"|| Batch controller:{name}")
+    if not authenticate_token():
+        return jsonify({"status": "ERROR", "message": "Unauthorized", "time": time.time() - start_time}), 401
+    if controller_function is None:
+        return jsonify({"status": "ERROR", "message": f"Unknown controller '{name}'", "time": time.time() - start_time}), 404
+    if not request.is_json:
+        return jsonify({"status": "ERROR", "message": "A JSON was expected in the request body", "time": time.time() - start_time}), 400
+    profile = request.headers.get('X-Browser-Profile')
+    if profile and profile not in PROFILES:
+        return jsonify({"status": "ERROR", "message": f"Unknown browser profile '{profile}'", "time": time.time() - start_time}), 400
+    try:
+        body = request.json
+        options = body if isinstance(body, dict) else {}
+        items = body if isinstance(body, list) else body.get('items')
+        if not isinstance(items, list) or not items:
+            return jsonify({"status": "ERROR", "message": "A non-empty list of items was expected", "time": time.time() - start_time}), 400
+        # Every item leases from the shared driver pool: more workers than drivers would only wait
+        # for a lease and fail with "No driver available"
+        concurrency = max(1, min(int(options.get('concurrency', BATCH_CONCURRENCY)), BATCH_MAX_CONCURRENCY,
+                                 DRIVER_POOL_SIZE))
+        item_timeout = float(options.get('timeout', BATCH_ITEM_TIMEOUT))
+    except (TypeError, ValueError, AttributeError) as e:
+        return jsonify({"status": "ERROR", "message": f"Invalid batch options: {e}", "time": time.time() - start_time}), 400
+
+    logging.info(f"Batch of {len(items)} items, concurrency {concurrency}, timeout {item_timeout}s")
+    return Response(
+        stream_with_context(run_batch(controller_function, items, concurrency, item_timeout, start_time, request_id, profile)),
+        mimetype='application/x-ndjson')
+
+
+def run_batch(controller_function, items, concurrency, item_timeout, start_time=None, request_id=None, profile=None):
+    """
+    Generator that yields one NDJSON line per item in completion order.
+
+    Items are logged under `request_id` (the id of the batch request) and
+    their drivers use the browser `profile` (None: DRIVER_PROFILE). Every item
+    downloads into its own sandbox (see utils/download_sandbox.py).
+
+    An item that exceeds `item_timeout` is reported as an error right away.
+    Its thread can not be interrupted, so the browsers it opened or leased
+    are killed: the controller fails on its next WebDriver call, which frees
+    its slot and its pooled driver, and its late result is discarded.
+    """
+    start_time = start_time or time.time()
+    started = {}
+    owners = {}
+    pending = {}
+    counts = {"OK": 0, "ERROR": 0}
+
+    def run_item(index, data):
+        started[index] = time.time()
+        label = f"{request_id}-{index}" if request_id else str(index)
+        with log_context(request_id, controller_function.__name__), browser_profile(profile), \
+                download_sandbox(label), driver_owner(label) as owner:
+            owners[index] = owner
+            if isinstance(data, dict):
+                logging.info({key: value for key, value in data.items() if key != 'password'})
+            # A FileResult becomes an artifact reference (GET /artifacts/<id>)
+            return store_file_result(controller_function(data))
+
+    def line(index, status, message):
+        counts[status] += 1
+        elapsed = time.time() - started.get(index, time.time())
+        return json.dumps({"index": index, "status": status, "message": message, "time": elapsed}, default=str) + "\n"
+
+    executor = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="batch")
+    try:
+        for index, data in enumerate(items):
+            pending[executor.submit(run_item, index, data)] = index
+
+        while pending:
+            done, _ = wait(pending, timeout=_next_deadline(started, pending, item_timeout),
+                           return_when=FIRST_COMPLETED)
+            for future in done:
+                index = pending.pop(future)
+                try:
+                    yield line(index, "OK", future.result())
+                except Exception as e:
+                    logging.error(f"ERROR batch item {index}: {e}", extra={'request_id': request_id})
+                    yield line(index, "ERROR", "An internal error has occurred. " + str(e))
+
+            now = time.time()
+            for future, index in list(pending.items()):
+                if index in started and now - started[index] >= item_timeout:
+                    del pending[future]
+                    logging.error(f"ERROR batch item {index}: timed out after {item_timeout}s",
+                                  extra={'request_id': request_id})
+                    if index in owners:
+                        kill_owned_trees(owners[index])
+                    yield line(index, "ERROR", f"An internal error has occurred. Timed out after {item_timeout}s")
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    status = "OK" if not counts["ERROR"] else "ERROR" if not counts["OK"] else "PARTIAL"
+    yield json.dumps({"summary": True, "status": status,
+                      "message": {"total": len(items), "succeeded": counts["OK"], "failed": counts["ERROR"]},
+                      "time": time.time() - start_time}) + "\n"
+
+
+def _next_deadline(started, pending, item_timeout):
+    # Wake up when the oldest running item would time out (or poll while none has started)
+    running = [started[index] for index in pending.values() if index in started]
+    if not running:
+        return 0.1
+    return max(0.0, min(running) + item_timeout - time.time())
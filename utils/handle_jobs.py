@@ -0,0 +1,43 @@
+import logging
+import time
+from flask import jsonify, request
+from utils.jobs import QUEUED, enqueue_job, get_job
+from utils.logging_config import configure_logger
+from utils.security import authenticate_token
+
+
+def handle_job_submit(controllers):
+    """
+    Queues a controller invocation and answers immediately with the job id.
+
+    Expected body: {"controller": "<name>", "data": {...controller payload...}}
+    """
+    configure_logger()
+    start_time = time.time()
+    if not authenticate_token():
+        return jsonify({"status": "ERROR", "message": "Unauthorized", "time": time.time() - start_time}), 401
+    if not request.is_json:
+        return jsonify({"status": "ERROR", "message": "A JSON was expected in the request body", "time": time.time() - start_time}), 400
+    try:
+        body = request.json
+        controller = body.get('controller')
+        if controller not in controllers:
+            return jsonify({"status": "ERROR", "message": f"Unknown controller '{controller}'", "time": time.time() - start_time}), 400
+        data = body.get('data') or {}
+        job_id = enqueue_job(controller, data)
+        logging.info(f"|| Job {job_id} queued - Controller: {controller}")
+        return jsonify({"status": "OK", "message": {"id": job_id, "status": QUEUED}, "time": time.time() - start_time}), 202
+    except Exception as e:
+        error_message = str(e)
+        logging.error(f"ERROR: {error_message}")
+        return jsonify({"status": "ERROR", "message": "An internal error has occurred. " + error_message, "time": time.time() - start_time}), 400
+
+
+def handle_job_status(job_id):
+    start_time = time.time()
+    if not authenticate_token():
+        return jsonify({"status": "ERROR", "message": "Unauthorized", "time": time.time() - start_time}), 401
+    job = get_job(job_id)
+    if job is None:
+        return jsonify({"status": "ERROR", "message": "Job not found", "time": time.time() - start_time}), 404
+    return jsonify({"status": "OK", "message": job, "time": time.time() - start_time}), 200
@@ -0,0 +1,22 @@
+import time
+from flask import jsonify, request
+from utils.logging_config import REQUEST_ID_REGEX, search_logs
+from utils.security import authenticate_token
+
+
+def handle_logs_search():
+    """
+    Returns the log records of one request: GET /logs?request_id=<id>&limit=<n>
+    """
+    start_time = time.time()
+    if not authenticate_token():
+        return jsonify({"status": "ERROR", "message": "Unauthorized", "time": time.time() - start_time}), 401
+    request_id = request.args.get('request_id', '')
+    if not REQUEST_ID_REGEX.fullmatch(request_id):
+        return jsonify({"status": "ERROR", "message": "A valid request_id was expected", "time": time.time() - start_time}), 400
+    try:
+        limit = max(1, int(request.args.get('limit', 1000)))
+    except ValueError:
+        return jsonify({"status": "ERROR", "message": "limit must be an integer", "time": time.time() - start_time}), 400
+    entries = search_logs(request_id, limit=limit)
+    return jsonify({"status": "OK", "message": entries, "time": time.time() - start_time}), 200
@@ -0,0 +1,22 @@
+import time
+from flask import Response, jsonify
+from utils.metrics import render_worker_metrics
+from utils.security import authenticate_token
+
+# Content type of the Prometheus text exposition format
+PROMETHEUS_CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+def handle_metrics_endpoint():
+    """
+    Action latencies, fallback strategies, failures, maintenance tasks and
+    driver pools of every gunicorn worker in Prometheus text format, one
+    series per worker (see render_worker_metrics).
+
+    Prometheus sends the token with `authorization: {credentials: <VALID_TOKEN>}`
+    in its scrape config.
+    """
+    start_time = time.time()
+    if not authenticate_token():
+        return jsonify({"status": "ERROR", "message": "Unauthorized", "time": time.time() - start_time}), 401
+    return Response(render_worker_metrics(), content_type=PROMETHEUS_CONTENT_TYPE)
@@ -1,32 +1,59 @@
 import logging
 import time
-from flask import jsonify, request
+from flask import jsonify, make_response, request
+from actions.browser_profiles import PROFILES, browser_profile
+from actions.driver_registry import driver_owner
+from utils.artifacts import FileResult, store_artifact
 from utils.config import DOWNLOAD_DIR, STAGE
-from utils.file_manager import create_download_directory
-from utils.logging_config import configure_logger
+from utils.download_sandbox import download_sandbox
+from utils.file_manager import create_download_directory_once
+from utils.logging_config import configure_logger, log_context, new_request_id
 from utils.security import authenticate_token
 
 
 def handle_request_endpoint(controller_function, decode_response=True):
     configure_logger()
-    create_download_directory(DOWNLOAD_DIR)
+    create_download_directory_once(DOWNLOAD_DIR)
+    # Every log line of the request carries its id; the client gets it back to query GET /logs
+    request_id = new_request_id(request.headers.get('X-Request-ID'))
+    with log_context(request_id, controller_function.__name__):
+        response = make_response(_handle_request(controller_function, decode_response, request_id))
+    response.headers['X-Request-ID'] = request_id
+    return response
+
+
+def _handle_request(controller_function, decode_response, request_id=None):
     start_time = time.time()
     logging.info("|| Controller:" + controller_function.__name__)
     if not authenticate_token():
         return jsonify({"status": "ERROR", "message": "Unauthorized", "time": time.time() - start_time}), 401
     if not request.is_json:
         return jsonify({"status": "ERROR", "message": "A JSON was expected in the request body", "time": time.time() - start_time}), 400
+    # Optional browser profile for the drivers of this request, e.g. X-Browser-Profile: lean
+    profile = request.headers.get('X-Browser-Profile')
+    if profile and profile not in PROFILES:
+        return jsonify({"status": "ERROR", "message": f"Unknown browser profile '{profile}'", "time": time.time() - start_time}), 400
     try:
         data = request.json
         logging.info(
             {key: value for key, value in data.items() if key != 'password'})
-        message = controller_function(data)
+        # The request downloads into its own directory (see utils/download_sandbox.py)
+        # and the drivers it leaves open are reaped when it ends (see actions/driver_registry.py)
+        with browser_profile(profile), download_sandbox(request_id), driver_owner(request_id):
+            message = controller_function(data)
+        if isinstance(message, FileResult):
+            if not decode_response:
+                # Streamed from disk, never loaded in memory
+                logging.info(f"OK - file: {message.download_name}", extra={'duration': time.time() - start_time})
+                return message.send()
+            # Files are not inlined in the JSON: the client downloads them from GET /artifacts/<id>
+            message = store_artifact(message)
         if decode_response:
-            logging.info(f"OK - message: {message}")
+            logging.info(f"OK - message: {message}", extra={'duration': time.time() - start_time})
             return jsonify({"status": "OK", "message": message, "time": time.time() - start_time}), 200
         else:
             return message
     except Exception as e:
         error_message = str(e)
-        logging.error(f"ERROR: {error_message}")
+        logging.error(f"ERROR: {error_message}", extra={'duration': time.time() - start_time})
         return jsonify({"status": "ERROR", "message": "An internal error has occurred. " + error_message, "time": time.time() - start_time}), 400
@@ -2,7 +2,7 @@
 from actions.web_driver import get_wait
 from dotenv import load_dotenv
 import os
-from webdriver_manager.chrome import ChromeDriverManager
+from actions.driver_resolver import get_chromedriver_path
 from selenium import webdriver
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.chrome.service import Service
@@ -12,7 +12,7 @@ from utils.config import DOWNLOAD_DIR, BASE_URL
 
 load_dotenv()
 stage = os.getenv("STAGE")
-route = ChromeDriverManager().install()
+route = get_chromedriver_path()
 options = Options()
 user_agent = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/96.0.4664.45 Safari/537.36"
 options.add_argument(f"user-agent={user_agent}")
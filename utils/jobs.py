@@ -0,0 +1,334 @@
+import json
+import logging
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+import psutil
+from contextlib import closing, contextmanager
+from actions.driver_registry import driver_owner
+from utils.artifacts import store_file_result
+from utils.config import JOB_LEASE_TIMEOUT, JOB_POLL_INTERVAL, JOB_WORKERS, JOBS_DB_PATH
+from utils.download_sandbox import download_sandbox
+from utils.logging_config import log_context
+from utils.maintenance import register_maintenance_task
+
+
+# Job states
+QUEUED = 'queued'
+RUNNING = 'running'
+DONE = 'done'
+FAILED = 'failed'
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    controller TEXT NOT NULL,
+    payload TEXT,
+    status TEXT NOT NULL,
+    result TEXT,
+    error TEXT,
+    worker TEXT,
+    created_at REAL NOT NULL,
+    started_at REAL,
+    heartbeat_at REAL,
+    finished_at REAL
+);
+CREATE INDEX IF NOT EXISTS jobs_status_created ON jobs (status, created_at);
+"""
+
+_workers = None
+_workers_lock = threading.Lock()
+_job_available = threading.Event()
+_schema_ready = set()
+
+
+@contextmanager
+def _connect():
+    # isolation_level=None: every statement commits on its own unless a
+    # transaction is opened explicitly with BEGIN IMMEDIATE
+    if JOBS_DB_PATH not in _schema_ready:
+        os.makedirs(os.path.dirname(JOBS_DB_PATH), exist_ok=True)
+    with closing(sqlite3.connect(JOBS_DB_PATH, timeout=30, isolation_level=None)) as connection:
+        connection.row_factory = sqlite3.Row
+        if JOBS_DB_PATH not in _schema_ready:
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.executescript(_SCHEMA)
+            _add_column(connection, 'heartbeat_at REAL')
+            _schema_ready.add(JOBS_DB_PATH)
+        yield connection
+
+
+def _add_column(connection, column):
+    # Queues created by an older version lack the column
+    try:
+        connection.execute(f"ALTER TABLE jobs ADD COLUMN {column}")
+    except sqlite3.OperationalError as e:
+        if 'duplicate column' not in str(e):
+            raise
+
+
+def _process_id(pid=None):
+    # host:pid:start_time identifies a process even if its pid is reused after a restart
+    pid = pid or os.getpid()
+    return f"{socket.gethostname()}:{pid}:{psutil.Process(pid).create_time()}"
+
+
+def enqueue_job(controller, data):
+    """
+    Stores a controller invocation to be run by the job workers.
+
+    Args:
+        controller (str): Name of the controller (key of the controllers registry)
+        data (dict): Payload passed to the controller
+
+    Returns:
+        str: Id of the new job
+    """
+    job_id = uuid.uuid4().hex
+    with _connect() as connection:
+        connection.execute(
+            "INSERT INTO jobs (id, controller, payload, status, created_at) VALUES (?, ?, ?, ?, ?)",
+            (job_id, controller, json.dumps(data), QUEUED, time.time()))
+    _job_available.set()
+    return job_id
+
+
+def get_job(job_id):
+    """
+    Returns the public view of a job (without its payload), or None if it does not exist.
+    """
+    with _connect() as connection:
+        row = connection.execute(
+            "SELECT id, controller, status, result, error, created_at, started_at, finished_at "
+            "FROM jobs WHERE id = ?", (job_id,)).fetchone()
+    if row is None:
+        return None
+    job = dict(row)
+    job['result'] = json.loads(job['result']) if job['result'] is not None else None
+    return job
+
+
+def claim_next_job(worker):
+    """
+    Atomically moves the oldest queued job to running. Safe across threads and
+    gunicorn worker processes sharing the same database.
+
+    Returns:
+        dict: Job with its payload, or None if the queue is empty
+    """
+    with _connect() as connection:
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            row = connection.execute(
+                "SELECT id, controller, payload FROM jobs WHERE status = ? ORDER BY created_at LIMIT 1",
+                (QUEUED,)).fetchone()
+            if row is not None:
+                now = time.time()
+                connection.execute(
+                    "UPDATE jobs SET status = ?, worker = ?, started_at = ?, heartbeat_at = ? WHERE id = ?",
+                    (RUNNING, worker, now, now, row['id']))
+            connection.execute("COMMIT")
+        except Exception:
+            connection.execute("ROLLBACK")
+            raise
+    if row is None:
+        return None
+    return {'id': row['id'], 'controller': row['controller'], 'data': json.loads(row['payload'])}
+
+
+def finish_job(job_id, result=None, error=None, worker=None):
+    """
+    Stores the outcome of a job. With `worker`, only while the job is still
+    leased to it: a job re-queued after its lease expired keeps running
+    elsewhere and the late result is discarded.
+
+    Returns:
+        bool: True if the job was updated
+    """
+    # The payload may hold credentials, so it is not kept once the job ends
+    query = "UPDATE jobs SET status = ?, result = ?, error = ?, payload = NULL, finished_at = ? WHERE id = ?"
+    params = (FAILED if error is not None else DONE, json.dumps(result), error, time.time(), job_id)
+    if worker is not None:
+        query += " AND status = ? AND worker = ?"
+        params += (RUNNING, worker)
+    with _connect() as connection:
+        return connection.execute(query, params).rowcount > 0
+
+
+def renew_job_leases(jobs):
+    """
+    Heartbeat of running jobs: moves their lease forward.
+
+    Args:
+        jobs (dict): Job id -> worker that runs it
+    """
+    if not jobs:
+        return
+    now = time.time()
+    with _connect() as connection:
+        connection.executemany(
+            "UPDATE jobs SET heartbeat_at = ? WHERE id = ? AND status = ? AND worker = ?",
+            [(now, job_id, RUNNING, worker) for job_id, worker in jobs.items()])
+
+
+def recover_jobs(lease_timeout=JOB_LEASE_TIMEOUT):
+    """
+    Re-queues running jobs whose worker is gone, so they are not lost: those
+    without a heartbeat for `lease_timeout` seconds, whatever host ran them,
+    and right away those of a process of this host that no longer exists
+    (crash or restart).
+
+    Returns:
+        int: Number of jobs re-queued
+    """
+    host = socket.gethostname()
+    expired = time.time() - lease_timeout
+    recovered = 0
+    with _connect() as connection:
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            rows = connection.execute(
+                "SELECT id, worker, COALESCE(heartbeat_at, started_at) AS heartbeat FROM jobs WHERE status = ?",
+                (RUNNING,)).fetchall()
+            for row in rows:
+                if (row['heartbeat'] or 0) >= expired:
+                    # worker = host:pid:start_time:thread
+                    parts = (row['worker'] or '').split(':')
+                    if len(parts) < 3 or parts[0] != host or not parts[1].isdigit():
+                        continue
+                    if _is_same_process_alive(int(parts[1]), parts[2]):
+                        continue
+                connection.execute(
+                    "UPDATE jobs SET status = ?, worker = NULL, started_at = NULL, heartbeat_at = NULL "
+                    "WHERE id = ? AND status = ?", (QUEUED, row['id'], RUNNING))
+                recovered += 1
+            connection.execute("COMMIT")
+        except Exception:
+            connection.execute("ROLLBACK")
+            raise
+    if recovered:
+        logging.warning(f"Re-queued {recovered} interrupted jobs")
+    return recovered
+
+
+def _is_same_process_alive(pid, create_time):
+    try:
+        return str(psutil.Process(pid).create_time()) == create_time
+    except psutil.Error:
+        return False
+
+
+class JobWorkerPool:
+    """
+    Bounded set of threads that run queued jobs with the registered controllers.
+
+    Args:
+        controllers (dict): Controller name -> controller function
+        workers (int): Number of jobs run at the same time by this process
+    """
+
+    def __init__(self, controllers, workers=JOB_WORKERS):
+        self.controllers = controllers
+        self.workers = workers
+        self._stop = threading.Event()
+        self._threads = []
+        # job id -> worker of the jobs this pool is running, see heartbeat()
+        self._running = {}
+        self._running_lock = threading.Lock()
+
+    def start(self):
+        recover_jobs()
+        # Leases expire after JOB_LEASE_TIMEOUT: renew them well before
+        register_maintenance_task('job_heartbeat', self.heartbeat, JOB_LEASE_TIMEOUT / 3)
+        for index in range(self.workers):
+            thread = threading.Thread(target=self._run, daemon=True, name=f"job-worker-{index}")
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self, timeout=5):
+        self._stop.set()
+        _job_available.set()
+        for thread in self._threads:
+            thread.join(timeout)
+
+    def heartbeat(self):
+        """
+        Maintenance task: renews the leases of the jobs running in this pool and
+        re-queues the expired ones of any worker.
+        """
+        if self._stop.is_set():
+            return
+        with self._running_lock:
+            running = dict(self._running)
+        renew_job_leases(running)
+        recover_jobs()
+
+    def run_next(self, worker):
+        """
+        Runs one queued job. Returns False when there was nothing to run.
+        """
+        job = claim_next_job(worker)
+        if job is None:
+            return False
+
+        with self._running_lock:
+            self._running[job['id']] = worker
+        try:
+            self._run_job(job, worker)
+        finally:
+            with self._running_lock:
+                self._running.pop(job['id'], None)
+        return True
+
+    def _run_job(self, job, worker):
+        # The job id is the request id of its log lines
+        with log_context(job['id'], job['controller']):
+            logging.info(f"|| Job {job['id']} - Controller: {job['controller']}")
+            controller_function = self.controllers.get(job['controller'])
+            try:
+                if controller_function is None:
+                    raise KeyError(f"Unknown controller '{job['controller']}'")
+                with download_sandbox(job['id']), driver_owner(job['id']):
+                    result = store_file_result(controller_function(job['data']))
+                finished = finish_job(job['id'], result=result, worker=worker)
+            except Exception as e:
+                logging.error(f"ERROR job {job['id']}: {e}")
+                # Exceptions without a message (TimeoutError(), KeyError()) still fail the job
+                finished = finish_job(job['id'], error=str(e) or repr(e), worker=worker)
+            if not finished:
+                logging.warning(f"Job {job['id']} was re-queued after its lease expired, result discarded")
+
+    def _run(self):
+        worker = f"{_process_id()}:{threading.current_thread().name}"
+        while not self._stop.is_set():
+            try:
+                if self.run_next(worker):
+                    continue
+            except Exception as e:
+                logging.error(f"Error in job worker {worker}: {e}")
+            # Wake up on local enqueues, poll for jobs added by other processes
+            _job_available.wait(JOB_POLL_INTERVAL)
+            _job_available.clear()
+
+
+def start_job_workers(controllers):
+    """
+    Starts the job worker pool of this process once.
+    """
+    global _workers
+    with _workers_lock:
+        if _workers is None and JOB_WORKERS > 0:
+            _workers = JobWorkerPool(controllers)
+            _workers.start()
+        return _workers
+
+
+def stop_job_workers():
+    global _workers
+    with _workers_lock:
+        if _workers is not None:
+            _workers.stop()
+            _workers = None
@@ -1,222 +1,531 @@
 import os
+import atexit
+import contextvars
+import json
 import logging
-from datetime import datetime, timedelta
-from utils.config import AUTO_DELETE_LOGS, STAGE, LOG_FILE_DELETION_DAYS
+import queue
+import sys
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import datetime
+from logging.handlers import QueueHandler
+from utils.config import (
+    AUTO_DELETE_LOGS,
+    STAGE,
+    LOG_FILE_DELETION_DAYS,
+    LOG_JSON,
+    LOG_MAINTENANCE_INTERVAL,
+    LOG_BATCH_SIZE,
+    LOG_MAX_BYTES,
+    LOG_QUEUE_BLOCK_TIMEOUT,
+    LOG_QUEUE_POLICY,
+    LOG_QUEUE_SIZE,
+    LOG_ROTATE_INTERVAL,
+)
 from utils.error import messageError
+from utils.maintenance import register_maintenance_task
 import re
 
 
-# Global variable to track the current log file path
-_current_log_file = None
+LOG_FORMAT = '%(asctime)s - %(levelname)s - %(request_tag)s%(message)s'
+# Log files are named after the moment they were opened: 2025-02-26_11-13-20.log
+# (a _N suffix is added if two files are opened in the same second)
+LOG_FILENAME_REGEX = re.compile(r"(\d{4}-\d{2}-\d{2}_\d{2}-\d{2}-\d{2})(?:_\d+)?\.log")
+# Every log file has a sidecar index next to it: <file>.log.idx
+LOG_INDEX_SUFFIX = '.idx'
+# Request fields added to every record (JSON keys and LogRecord attributes)
+CONTEXT_FIELDS = ('request_id', 'controller', 'action', 'duration')
+REQUEST_ID_REGEX = re.compile(r"[\w.\-]{1,64}")
+
+# Request being served by the current thread/context
+_request_id = contextvars.ContextVar('request_id', default=None)
+_controller = contextvars.ContextVar('controller', default=None)
+
+# Global state of the logging pipeline of this process
+_configured = False
+_configure_lock = threading.Lock()
+_file_handler = None
+_queue_handler = None
+_listener = None
 
 
 def configure_logger():
-    try:
-        global _current_log_file
+    """
+    Sets up the logging pipeline once per process. Later calls return
+    immediately, so it is safe to call at the start of every request.
+
+    Pipeline: logging.* -> BoundedQueueHandler (never touches the disk)
+    -> BatchingQueueListener thread -> SizeAndTimeRotatingFileHandler.
+
+    Records are written as text, or as JSON lines when LOG_JSON is enabled.
+
+    Old log cleanup runs in the maintenance thread every LOG_MAINTENANCE_INTERVAL
+    seconds instead of on each call.
+    """
+    if _configured:
+        return
+    with _configure_lock:
+        if _configured:
+            return
+        _setup_log_file()
 
-        # Get the current date and time to use in the log file name
-        current_datetime = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
-        # Create the logs directory if it does not exist
-        base_directory = '/app' if os.environ.get('DOCKERIZED', False) else ''
 
-        logs_directory = os.path.join(base_directory, 'logs')
+def _setup_log_file():
+    try:
+        global _configured, _file_handler, _queue_handler, _listener
+
+        root = logging.getLogger()
+        for handler in [handler for handler in root.handlers if _is_implicit_handler(handler)]:
+            # Installed by a logging.info() that ran before this: replaced by the pipeline
+            root.removeHandler(handler)
+        if root.handlers:
+            # Handlers installed on purpose by the host (e.g. pytest) are respected
+            _configured = True
+            logging.warning(
+                "File logging skipped: the root logger already has handlers "
+                f"({', '.join(type(handler).__name__ for handler in root.handlers)})")
+            return
+
+        logs_directory = get_logs_directory()
         os.makedirs(logs_directory, exist_ok=True)
 
-        # Configure the name of the log file with the date, time, and incident number
-        log_filename = f"{current_datetime}.log"
-        log_filepath = os.path.join(logs_directory, log_filename)
-        _current_log_file = log_filepath
+        _file_handler = SizeAndTimeRotatingFileHandler(
+            logs_directory, max_bytes=LOG_MAX_BYTES, interval=LOG_ROTATE_INTERVAL)
+        _file_handler.setFormatter(JsonFormatter() if LOG_JSON else TextFormatter(LOG_FORMAT))
+
+        log_queue = queue.Queue(maxsize=LOG_QUEUE_SIZE)
+        _queue_handler = BoundedQueueHandler(
+            log_queue, policy=LOG_QUEUE_POLICY, block_timeout=LOG_QUEUE_BLOCK_TIMEOUT)
+        # The context must be read in the thread that logs, not in the listener
+        _queue_handler.addFilter(ContextFilter())
+        _listener = BatchingQueueListener(
+            log_queue, _file_handler, batch_size=LOG_BATCH_SIZE, dropped_source=_queue_handler)
+        _listener.start()
 
-        # Configure the logging system to write to the dynamically created file
-        logging.basicConfig(filename=log_filepath, level=logging.INFO,
-                            format='%(asctime)s - %(levelname)s - %(message)s')
+        root.setLevel(logging.INFO)
+        root.addHandler(_queue_handler)
+        atexit.register(stop_logging)
+        _configured = True
 
         # Log the initiation of submission of information
         logging.info("Initiating log")
         logging.info(f"Stage: {STAGE}")
 
         if AUTO_DELETE_LOGS:
-            delete_old_logs()
+            register_maintenance_task(
+                'delete_old_logs', delete_old_logs, LOG_MAINTENANCE_INTERVAL)
 
     except Exception as e:
         # In case of error, log the error and raise an exception
         raise messageError("Error setting up logging")
 
 
-def _rotate_log_if_needed(logs_directory, current_datetime):
+def _is_implicit_handler(handler):
+    # The stderr handler logging.basicConfig() adds when a record is logged with no handlers
+    return (type(handler) is logging.StreamHandler and handler.stream is sys.stderr
+            and handler.formatter is not None and handler.formatter._fmt == logging.BASIC_FORMAT)
+
+
+def stop_logging():
     """
-    Verifica si el archivo de log actual es muy antiguo y crea uno nuevo si es necesario.
+    Writes every queued record to disk and stops the listener thread.
+    """
+    global _configured, _listener, _queue_handler
+    if _queue_handler is not None:
+        logging.getLogger().removeHandler(_queue_handler)
+        _queue_handler = None
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+    _configured = False
 
-    Esto asegura que incluso si el servicio ha estado corriendo durante días,
-    siempre habrá un archivo de log reciente donde escribir.
 
-    Args:
-        logs_directory (str): Ruta al directorio de logs
-        current_datetime (datetime): Fecha y hora actual
+def get_logs_directory():
+    base_directory = '/app' if os.environ.get('DOCKERIZED', False) else ''
+    return os.path.join(base_directory, 'logs')
+
+
+def current_log_file():
+    return _file_handler.baseFilename if _file_handler else None
+
+
+def new_request_id(value=None):
     """
-    global _current_log_file
+    Returns `value` if it is a valid request id (e.g. a client X-Request-ID
+    header), or a new random one.
+    """
+    if value and REQUEST_ID_REGEX.fullmatch(value):
+        return value
+    return uuid.uuid4().hex[:16]
 
-    if not _current_log_file or not os.path.exists(_current_log_file):
-        return
 
+@contextmanager
+def log_context(request_id, controller=None):
+    """
+    Tags every record logged inside the block with `request_id` and `controller`.
+
+    Context variables do not follow work submitted to other threads, so each
+    worker thread has to open its own log_context.
+    """
+    request_token = _request_id.set(request_id)
+    controller_token = _controller.set(controller)
     try:
-        # Extraer el timestamp del nombre del archivo
-        filename = os.path.basename(_current_log_file)
-        match = re.match(
-            r"(\d{4}-\d{2}-\d{2}_\d{2}-\d{2}-\d{2})\.log", filename)
-
-        if match:
-            log_datetime = datetime.strptime(
-                match.group(1), "%Y-%m-%d_%H-%M-%S")
-            difference = current_datetime - log_datetime
-
-            # Si el archivo actual tiene más de LOG_FILE_DELETION_DAYS días, crear uno nuevo
-            if difference.days >= LOG_FILE_DELETION_DAYS:
-                # Crear nuevo archivo de log
-                new_datetime = current_datetime.strftime("%Y-%m-%d_%H-%M-%S")
-                new_log_filename = f"{new_datetime}.log"
-                new_log_filepath = os.path.join(
-                    logs_directory, new_log_filename)
-
-                # Reinicializar el logger con el nuevo archivo
-                logging.shutdown()
-
-                # Crear nuevo logger
-                logging.basicConfig(
-                    filename=new_log_filepath,
-                    level=logging.INFO,
-                    format='%(asctime)s - %(levelname)s - %(message)s',
-                    force=True
-                )
-
-                _current_log_file = new_log_filepath
-                logging.info(
-                    f"Log rotated: switching from {filename} to {new_log_filename}")
+        yield request_id
+    finally:
+        _controller.reset(controller_token)
+        _request_id.reset(request_token)
 
-    except Exception as e:
-        logging.warning(f"Error during log rotation: {str(e)}")
 
+class ContextFilter(logging.Filter):
+    """
+    Adds the CONTEXT_FIELDS to each record. Values passed with
+    `extra={...}` take precedence over the request context.
 
-def delete_old_logs():
+    `action` defaults to the function that logged, when it is in actions/.
     """
-    Realiza rotación de logs y eliminación de archivos antiguos:
 
-    Proceso:
-    1. Verifica si el archivo de log actual es muy antiguo (> LOG_FILE_DELETION_DAYS)
-    2. Si es muy antiguo, crea uno nuevo y reinicializa el logger
-    3. Elimina archivos completos que tengan más de LOG_FILE_DELETION_DAYS días
-    4. De los archivos que sobreviven, elimina registros que tengan más de LOG_FILE_DELETION_DAYS días
+    def filter(self, record):
+        if getattr(record, 'request_id', None) is None:
+            record.request_id = _request_id.get()
+        if getattr(record, 'controller', None) is None:
+            record.controller = _controller.get()
+        if getattr(record, 'action', None) is None:
+            in_actions = f"{os.sep}actions{os.sep}" in (record.pathname or '')
+            record.action = record.funcName if in_actions else None
+        if not hasattr(record, 'duration'):
+            record.duration = None
+        return True
+
 
-    Esto garantiza que el servicio siempre tenga un archivo válido para escribir logs,
-    evitando pérdida de datos cuando se eliminan archivos antiguos.
+class TextFormatter(logging.Formatter):
     """
-    try:
-        current_datetime = datetime.now()
-        base_directory = '/app' if os.environ.get('DOCKERIZED', False) else ''
-        logs_directory = os.path.join(base_directory, 'logs')
-        os.makedirs(logs_directory, exist_ok=True)
+    LOG_FORMAT with the request id as a `[id] ` prefix of the message.
+    """
+
+    def format(self, record):
+        request_id = getattr(record, 'request_id', None)
+        record.request_tag = f"[{request_id}] " if request_id else ''
+        return super().format(record)
 
-        # Paso 0: Verificar y rotar el archivo de log actual si es muy antiguo
-        _rotate_log_if_needed(logs_directory, current_datetime)
-
-        files = os.listdir(logs_directory)
-        surviving_files = []
-
-        # Paso 1: Eliminar archivos completos antiguos (más de LOG_FILE_DELETION_DAYS días)
-        for file in files:
-            # Check if the filename matches the expected format (e.g., '2025-02-26_11-13-20.log')
-            match = re.match(
-                r"(\d{4}-\d{2}-\d{2}_\d{2}-\d{2}-\d{2})\.log", file)
-            if match:
-                file_datetime = datetime.strptime(
-                    match.group(1), "%Y-%m-%d_%H-%M-%S")
-                difference = current_datetime - file_datetime
-
-                if difference.days > LOG_FILE_DELETION_DAYS:
-                    file_path = os.path.join(logs_directory, file)
-                    os.remove(file_path)
-                    logging.info(f"Deleted old log file: {file}")
-                else:
-                    surviving_files.append(file)
+
+class JsonFormatter(logging.Formatter):
+    """
+    One JSON object per line: time, level, message and the CONTEXT_FIELDS that are set.
+    """
+
+    def format(self, record):
+        entry = {
+            'time': datetime.fromtimestamp(record.created).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'message': record.getMessage(),
+        }
+        for field in CONTEXT_FIELDS:
+            value = getattr(record, field, None)
+            if value is not None:
+                entry[field] = value
+        if record.exc_info:
+            entry['exception'] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class BoundedQueueHandler(QueueHandler):
+    """
+    QueueHandler with a bounded buffer. When the buffer is full the record is
+    either dropped right away (policy 'drop') or the caller waits up to
+    `block_timeout` seconds for room (policy 'block') and drops it after that.
+
+    Logging calls never wait for the disk, only (with 'block') for the queue.
+    """
+
+    def __init__(self, log_queue, policy='drop', block_timeout=1.0):
+        super().__init__(log_queue)
+        self.policy = policy
+        self.block_timeout = block_timeout
+        self.dropped = 0
+
+    def enqueue(self, record):
+        try:
+            if self.policy == 'block':
+                self.queue.put(record, timeout=self.block_timeout)
             else:
-                # Log or handle any files that don't match the expected pattern
-                logging.warning(f"Skipping file with invalid format: {file}")
+                self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
 
-        # Paso 2: Limpiar registros antiguos de archivos que sobreviven
-        for file in surviving_files:
-            file_path = os.path.join(logs_directory, file)
-            _clean_old_records_from_file(file_path, current_datetime)
 
-    except Exception as e:
-        raise messageError("Error deleting old logs")
+class BatchingQueueListener:
+    """
+    Thread that drains the log queue in batches of up to `batch_size` records
+    and flushes the handlers once per batch instead of once per record.
+    """
 
+    _sentinel = None
+
+    def __init__(self, log_queue, *handlers, batch_size=200, dropped_source=None):
+        self.queue = log_queue
+        self.handlers = handlers
+        self.batch_size = max(1, batch_size)
+        self.dropped_source = dropped_source
+        self._reported_dropped = 0
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._monitor, daemon=True, name="log-listener")
+        self._thread.start()
+
+    def stop(self):
+        if self._thread is not None:
+            # The sentinel must get in even if the queue is full
+            self.queue.put(self._sentinel)
+            self._thread.join()
+            self._thread = None
+
+    def _monitor(self):
+        while True:
+            batch = [self.queue.get()]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            stop = self._sentinel in batch
+            self._write(record for record in batch if record is not self._sentinel)
+            if stop:
+                return
+
+    def _write(self, records):
+        for record in records:
+            for handler in self.handlers:
+                if record.levelno >= handler.level:
+                    handler.handle(record)
+        self._report_dropped()
+        for handler in self.handlers:
+            handler.flush()
+
+    def _report_dropped(self):
+        if self.dropped_source is None:
+            return
+        dropped = self.dropped_source.dropped
+        if dropped > self._reported_dropped:
+            record = logging.makeLogRecord({
+                'levelno': logging.WARNING, 'levelname': 'WARNING',
+                'msg': f"Log queue full: dropped {dropped - self._reported_dropped} records"})
+            self._reported_dropped = dropped
+            for handler in self.handlers:
+                handler.handle(record)
+
+
+class SizeAndTimeRotatingFileHandler(logging.FileHandler):
+    """
+    Writes to `<logs_directory>/<YYYY-MM-DD_HH-MM-SS>.log` and opens a new file
+    when the current one reaches `max_bytes` or is `interval` seconds old.
 
-def _clean_old_records_from_file(file_path, current_datetime):
+    Records are not flushed one by one; the listener flushes once per batch.
+    Each flush also rewrites the sidecar index of the file (`<file>.idx`):
+    time range, format and request ids of its records.
     """
-    Limpia registros antiguos (más de LOG_FILE_DELETION_DAYS días) de un archivo de log específico.
-    Si el archivo quedaría vacío después de la limpieza, lo elimina completamente.
 
-    Args:
-        file_path (str): Ruta completa al archivo de log
-        current_datetime (datetime): Fecha y hora actual para comparar
+    def __init__(self, logs_directory, max_bytes=10 * 1024 * 1024, interval=86400):
+        self.logs_directory = logs_directory
+        self.max_bytes = max_bytes
+        self.interval = interval
+        super().__init__(self._new_filename(), encoding='utf-8')
+        self.opened_at = time.time()
+        self.size = self.stream.tell()
+        self._reset_index()
+
+    def emit(self, record):
+        try:
+            message = self.format(record) + self.terminator
+            if self.should_rollover(len(message)):
+                self.do_rollover()
+            self.stream.write(message)
+            self.size += len(message)
+            self._add_to_index(record)
+        except Exception:
+            self.handleError(record)
+
+    def flush(self):
+        super().flush()
+        if self._index_dirty:
+            self._write_index()
+
+    def close(self):
+        if self.stream and self._index_dirty:
+            self._write_index()
+        super().close()
+
+    def should_rollover(self, incoming=0):
+        if self.size and self.max_bytes and self.size + incoming > self.max_bytes:
+            return True
+        return bool(self.interval) and time.time() - self.opened_at >= self.interval
+
+    def do_rollover(self):
+        if self.stream:
+            self.stream.close()
+            if self._index_dirty:
+                self._write_index()
+        self.baseFilename = os.path.abspath(self._new_filename())
+        self.stream = self._open()
+        self.opened_at = time.time()
+        self.size = self.stream.tell()
+        self._reset_index()
+
+    def _reset_index(self):
+        self._index = {'start': None, 'end': None, 'request_ids': set()}
+        self._index_dirty = False
+
+    def _add_to_index(self, record):
+        if self._index['start'] is None:
+            self._index['start'] = record.created
+        self._index['end'] = max(self._index['end'] or record.created, record.created)
+        request_id = getattr(record, 'request_id', None)
+        if request_id:
+            self._index['request_ids'].add(request_id)
+        self._index_dirty = True
+
+    def _write_index(self):
+        index = {
+            'format': 'json' if isinstance(self.formatter, JsonFormatter) else 'text',
+            'start': self._index['start'],
+            'end': self._index['end'],
+            'request_ids': sorted(self._index['request_ids']),
+        }
+        index_path = self.baseFilename + LOG_INDEX_SUFFIX
+        try:
+            with open(index_path + '.tmp', 'w', encoding='utf-8') as f:
+                json.dump(index, f, separators=(',', ':'))
+            os.replace(index_path + '.tmp', index_path)
+            self._index_dirty = False
+        except OSError as e:
+            # Without index the file is still found by a full scan
+            logging.getLogger(__name__).debug(f"Could not write log index: {e}")
+
+    def _new_filename(self):
+        name = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
+        path = os.path.join(self.logs_directory, f"{name}.log")
+        current = getattr(self, 'baseFilename', None)
+        suffix = 0
+        while os.path.exists(path) or os.path.abspath(path) == current:
+            suffix += 1
+            path = os.path.join(self.logs_directory, f"{name}_{suffix}.log")
+        return path
+
+
+def read_log_index(log_path):
+    """
+    Returns the sidecar index of a log file, or None if it has none (e.g. files
+    written before indexes existed) or it can not be read.
     """
     try:
-        # Leer todas las líneas del archivo
-        with open(file_path, 'r', encoding='utf-8') as f:
-            lines = f.readlines()
+        with open(log_path + LOG_INDEX_SUFFIX, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
 
-        # Filtrar líneas que no sean muy antiguas
-        filtered_lines = []
-        records_removed = 0
+def list_log_files(logs_directory=None):
+    """
+    Log files of `logs_directory`, oldest first.
+    """
+    logs_directory = logs_directory or get_logs_directory()
+    if not os.path.isdir(logs_directory):
+        return []
+    files = [file for file in os.listdir(logs_directory) if LOG_FILENAME_REGEX.fullmatch(file)]
+    return [os.path.join(logs_directory, file) for file in sorted(files)]
 
-        for line in lines:
-            # Extraer timestamp del registro usando regex
-            # Formato esperado: "2025-09-08 12:31:19,625 - INFO - mensaje"
-            timestamp_match = re.match(
-                r"(\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}),\d+ - ", line)
 
-            if timestamp_match:
-                try:
-                    # Parsear la fecha del registro
-                    record_datetime = datetime.strptime(
-                        timestamp_match.group(1), "%Y-%m-%d %H:%M:%S")
-
-                    # Calcular diferencia en días
-                    difference = current_datetime - record_datetime
-
-                    # Mantener registros de menos de LOG_FILE_DELETION_DAYS días
-                    if difference.days <= LOG_FILE_DELETION_DAYS:
-                        filtered_lines.append(line)
-                    else:
-                        records_removed += 1
-
-                except ValueError:
-                    # Si hay error parseando la fecha, mantener la línea
-                    filtered_lines.append(line)
-            else:
-                # Si no tiene formato de timestamp reconocible, mantener la línea
-                filtered_lines.append(line)
-
-        # Verificar si el archivo quedaría vacío o solo con líneas vacías
-        content_lines = [line for line in filtered_lines if line.strip()]
-
-        if not content_lines:
-            # Si no hay contenido útil, eliminar el archivo completo
-            os.remove(file_path)
-            filename = os.path.basename(file_path)
-            logging.info(f"Deleted empty log file after cleaning: {filename}")
-        elif records_removed > 0:
-            # Solo reescribir el archivo si se removieron registros y hay contenido
-            with open(file_path, 'w', encoding='utf-8') as f:
-                f.writelines(filtered_lines)
-
-            filename = os.path.basename(file_path)
-            logging.info(
-                f"Cleaned {records_removed} old records from {filename}")
+def search_logs(request_id, logs_directory=None, limit=1000):
+    """
+    Busca los registros de una petición.
+
+    Solo se leen los archivos cuyo índice contiene `request_id`; los archivos
+    sin índice se recorren enteros.
+
+    Args:
+        request_id (str): Id de la petición (cabecera X-Request-ID)
+        logs_directory (str): Carpeta de logs, por defecto la de la aplicación
+        limit (int): Número máximo de registros devueltos
+
+    Returns:
+        list: Registros como dict (formato JSON) o como línea de texto
+    """
+    entries = []
+    text_tag = f"[{request_id}] "
+    for log_path in list_log_files(logs_directory):
+        index = read_log_index(log_path)
+        if index is not None and request_id not in index.get('request_ids', ()):
+            continue
+        try:
+            with open(log_path, 'r', encoding='utf-8', errors='replace') as f:
+                for line in f:
+                    if request_id not in line:
+                        continue
+                    entry = _parse_log_line(line)
+                    if isinstance(entry, dict):
+                        if entry.get('request_id') != request_id:
+                            continue
+                    elif text_tag not in entry:
+                        continue
+                    entries.append(entry)
+                    if len(entries) >= limit:
+                        return entries
+        except OSError as e:
+            logging.warning(f"Could not read log file {log_path}: {e}")
+    return entries
+
+
+def _parse_log_line(line):
+    line = line.rstrip('\n')
+    if line.startswith('{'):
+        try:
+            return json.loads(line)
+        except ValueError:
+            pass
+    return line
+
+
+def delete_old_logs(logs_directory=None):
+    """
+    Elimina los archivos de log cuyo último registro tiene más de
+    LOG_FILE_DELETION_DAYS días, junto con su índice.
+
+    Como SizeAndTimeRotatingFileHandler abre un archivo nuevo cada
+    LOG_ROTATE_INTERVAL segundos, ningún archivo mezcla registros recientes con
+    registros muy antiguos y ya no es necesario reescribir archivos línea a línea.
+    La fecha del último registro se toma del índice del archivo (o de su fecha
+    de modificación si no tiene índice), sin leer su contenido.
+
+    Returns:
+        int: Número de archivos eliminados
+    """
+    try:
+        logs_directory = logs_directory or get_logs_directory()
+        if not os.path.isdir(logs_directory):
+            return 0
+
+        cutoff = time.time() - LOG_FILE_DELETION_DAYS * 86400
+        active = current_log_file()
+        deleted = 0
+
+        for file_path in list_log_files(logs_directory):
+            if os.path.abspath(file_path) == active:
+                continue
+            index = read_log_index(file_path)
+            last_record = index.get('end') if index else None
+            if (last_record or os.path.getmtime(file_path)) < cutoff:
+                os.remove(file_path)
+                if index is not None:
+                    os.remove(file_path + LOG_INDEX_SUFFIX)
+                deleted += 1
+                logging.info(f"Deleted old log file: {os.path.basename(file_path)}")
+        return deleted
 
     except Exception as e:
-        logging.error(f"Error cleaning old records from {file_path}: {str(e)}")
-        # No lanzar excepción para no afectar el procesamiento de otros archivos
+        raise messageError("Error deleting old logs")
 
 
 # INFO
@@ -231,13 +540,15 @@ def _clean_old_records_from_file(file_path, current_datetime):
 
 # log.critical(msg): Used for critical severity messages that indicate serious problems that have caused the program to terminate or require immediate action.
 
-# CONFIGURACIÓN DE LIMPIEZA DE LOGS:
+# CONFIGURACIÓN DE LOGS:
+# - Los logs se encolan en memoria (LOG_QUEUE_SIZE registros como máximo) y un hilo los escribe en lotes de LOG_BATCH_SIZE
+# - LOG_QUEUE_POLICY: "drop" descarta registros si la cola está llena, "block" espera hasta LOG_QUEUE_BLOCK_TIMEOUT segundos
+# - Rotación: se abre un archivo nuevo al superar LOG_MAX_BYTES bytes o LOG_ROTATE_INTERVAL segundos
 # - AUTO_DELETE_LOGS: Si está habilitado, se ejecuta automáticamente la limpieza de logs
-# - LOG_FILE_DELETION_DAYS: Número de días después de los cuales se eliminan logs y registros (configurado en config.py)
-# - Archivos completos: Se eliminan archivos de log que tengan más de LOG_FILE_DELETION_DAYS días de antigüedad
-# - Registros individuales: De los archivos que sobreviven, se eliminan registros más antiguos de LOG_FILE_DELETION_DAYS días
-# - Archivos vacíos: Si un archivo queda sin contenido útil después de la limpieza, se elimina completamente
-# - Rotación automática: Si el archivo de log actual es muy antiguo, se crea uno nuevo automáticamente
+# - LOG_MAINTENANCE_INTERVAL: La limpieza se ejecuta en segundo plano (utils/maintenance.py) cada N segundos,
+#   nunca dentro de una petición. Su duración queda registrada en maintenance_stats()
+# - LOG_FILE_DELETION_DAYS: Se eliminan los archivos cuyo último registro tiene más de N días (configurado en config.py)
 # - Los archivos se identifican por su formato de nombre: YYYY-MM-DD_HH-MM-SS.log
-# - Los registros se identifican por su timestamp en formato: YYYY-MM-DD HH:MM:SS,milliseconds
-# - ROTACIÓN SEGURA: El servicio siempre tendrá un archivo válido donde escribir, evitando pérdida de logs
+# - LOG_JSON: Si está habilitado, cada registro es una línea JSON con request_id, controller, action y duration
+# - Cada archivo tiene un índice YYYY-MM-DD_HH-MM-SS.log.idx (rango de fechas e ids de petición) que usan
+#   la limpieza y GET /logs?request_id= para saltarse archivos completos
@@ -0,0 +1,111 @@
+import logging
+import threading
+import time
+
+
+# Background housekeeping (log retention, idle driver pruning...) so requests
+# never pay for it. One scheduler thread per process.
+_tasks = {}
+_lock = threading.Lock()
+_wakeup = threading.Event()
+_thread = None
+
+
+class MaintenanceTask:
+    """
+    Periodic task and the timing metrics of its runs.
+    """
+
+    def __init__(self, name, function, interval):
+        self.name = name
+        self.function = function
+        self.interval = interval
+        self.next_run = time.monotonic()
+        self.runs = 0
+        self.failures = 0
+        self.last_duration = None
+        self.max_duration = 0.0
+        self.total_duration = 0.0
+        self.last_error = None
+
+    def run(self):
+        start = time.perf_counter()
+        try:
+            self.function()
+            self.last_error = None
+        except Exception as e:
+            self.failures += 1
+            self.last_error = str(e)
+            logging.error(f"Maintenance task {self.name} failed: {e}")
+        finally:
+            duration = time.perf_counter() - start
+            self.runs += 1
+            self.last_duration = duration
+            self.max_duration = max(self.max_duration, duration)
+            self.total_duration += duration
+            self.next_run = time.monotonic() + self.interval
+            logging.info(f"Maintenance task {self.name} took {duration:.3f}s")
+
+    def stats(self):
+        return {
+            'interval': self.interval,
+            'runs': self.runs,
+            'failures': self.failures,
+            'last_duration': self.last_duration,
+            'max_duration': self.max_duration,
+            'total_duration': self.total_duration,
+            'last_error': self.last_error,
+        }
+
+
+def register_maintenance_task(name, function, interval):
+    """
+    Schedules `function` to run every `interval` seconds in the maintenance
+    thread, starting as soon as possible. Registering a name again replaces it.
+    """
+    with _lock:
+        _tasks[name] = MaintenanceTask(name, function, interval)
+    _start()
+    _wakeup.set()
+
+
+def run_pending_maintenance():
+    """
+    Runs the tasks that are due. Returns the seconds until the next one.
+    """
+    now = time.monotonic()
+    with _lock:
+        due = [task for task in _tasks.values() if task.next_run <= now]
+    for task in due:
+        task.run()
+    with _lock:
+        if not _tasks:
+            return None
+        return max(0.0, min(task.next_run for task in _tasks.values()) - time.monotonic())
+
+
+def maintenance_stats():
+    """
+    Timing metrics of every maintenance task, by name.
+    """
+    with _lock:
+        return {name: task.stats() for name, task in _tasks.items()}
+
+
+def _loop():
+    while True:
+        try:
+            timeout = run_pending_maintenance()
+        except Exception as e:
+            logging.error(f"Error in maintenance scheduler: {e}")
+            timeout = 60
+        _wakeup.wait(timeout)
+        _wakeup.clear()
+
+
+def _start():
+    global _thread
+    with _lock:
+        if _thread is None or not _thread.is_alive():
+            _thread = threading.Thread(target=_loop, daemon=True, name="maintenance")
+            _thread.start()
@@ -0,0 +1,307 @@
+import bisect
+import functools
+import json
+import logging
+import os
+import re
+import threading
+import time
+import psutil
+from utils.config import METRICS_DIR, METRICS_SNAPSHOT_INTERVAL
+from utils.maintenance import maintenance_stats, register_maintenance_task
+
+
+# Upper bounds (seconds) of the latency histogram buckets. Browser actions go
+# from a few milliseconds (find_element) to tens of seconds (page loads).
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+# Everything is kept in plain dicts behind one lock: recording a sample is a
+# perf_counter call, a bisect and a few additions, cheap enough to leave on.
+_lock = threading.Lock()
+_histograms = {}   # action -> Histogram
+_failures = {}     # action -> count
+_strategies = {}   # (action, strategy) -> count
+_collectors = {}   # name -> function returning [(metric, type, help, [(labels, value)])]
+
+# Every gunicorn worker keeps its own metrics and writes them to
+# METRICS_DIR/<pid>-<start time>.json, so /metrics answers for all of them
+_SNAPSHOT_NAME = re.compile(r'^(\d+)-(\d+)\.json$')
+_process_starts = {}  # pid -> int(create_time) of this process (workers are forked)
+
+
+class Histogram:
+    """
+    Cumulative-on-export latency histogram of one action.
+    """
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # Last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self):
+        total = 0
+        for bound, count in zip(self.buckets + (float('inf'),), self.counts):
+            total += count
+            yield bound, total
+
+
+def observe_action(action, duration, failed=False):
+    """
+    Records one execution of `action` that took `duration` seconds.
+    """
+    with _lock:
+        histogram = _histograms.get(action)
+        if histogram is None:
+            histogram = _histograms[action] = Histogram()
+        histogram.observe(duration)
+        if failed:
+            _failures[action] = _failures.get(action, 0) + 1
+
+
+def count_strategy(action, strategy):
+    """
+    Counts which fallback strategy of `action` finished the job
+    (e.g. click_element -> 'javascript'), or 'failed' when none did.
+    """
+    with _lock:
+        key = (action, strategy)
+        _strategies[key] = _strategies.get(key, 0) + 1
+
+
+def instrument(function=None, name=None):
+    """
+    Decorator that records the latency and the failures (raised exceptions)
+    of every call to the decorated action.
+
+    Usage:
+        @instrument
+        def click_element(driver, element): ...
+
+        @instrument(name='login')
+        def custom_login(driver, username, password): ...
+    """
+    def decorator(function):
+        action = name or function.__name__
+
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            failed = True
+            try:
+                result = function(*args, **kwargs)
+                failed = False
+                return result
+            finally:
+                observe_action(action, time.perf_counter() - start, failed)
+
+        return wrapper
+
+    if function is not None:
+        return decorator(function)
+    return decorator
+
+
+def register_metrics_collector(name, function):
+    """
+    Adds metrics computed on demand (e.g. pool sizes) to render_metrics().
+
+    `function` returns a list of (metric, type, help, samples) where samples
+    is a list of (labels dict, value).
+    """
+    with _lock:
+        _collectors[name] = function
+
+
+def reset_metrics():
+    with _lock:
+        _histograms.clear()
+        _failures.clear()
+        _strategies.clear()
+
+
+def collect_metrics():
+    """
+    Metrics of this process as [(metric, type, help, [(sample, labels, value)])].
+    """
+    with _lock:
+        histograms = {action: (list(h.cumulative()), h.sum, h.count) for action, h in _histograms.items()}
+        failures = dict(_failures)
+        strategies = dict(_strategies)
+        collectors = list(_collectors.items())
+
+    samples = []
+    for action, (buckets, total, count) in sorted(histograms.items()):
+        for bound, cumulative in buckets:
+            le = '+Inf' if bound == float('inf') else _format_value(bound)
+            samples.append(('scraper_action_duration_seconds_bucket', {'action': action, 'le': le}, cumulative))
+        samples.append(('scraper_action_duration_seconds_sum', {'action': action}, total))
+        samples.append(('scraper_action_duration_seconds_count', {'action': action}, count))
+    families = [('scraper_action_duration_seconds', 'histogram', 'Duration of browser actions.', samples)]
+
+    families.append(('scraper_action_failures_total', 'counter', 'Browser actions that raised an error.',
+                     [('scraper_action_failures_total', {'action': action}, count)
+                      for action, count in sorted(failures.items())]))
+    families.append(('scraper_action_strategy_total', 'counter', 'Fallback strategy that completed each action.',
+                     [('scraper_action_strategy_total', {'action': action, 'strategy': strategy}, count)
+                      for (action, strategy), count in sorted(strategies.items())]))
+
+    for metric, metric_type, help_text, samples in _maintenance_metrics():
+        families.append(_family(metric, metric_type, help_text, samples))
+
+    for name, collector in collectors:
+        try:
+            for metric, metric_type, help_text, samples in collector():
+                families.append(_family(metric, metric_type, help_text, samples))
+        except Exception as e:
+            logging.warning(f"Metrics collector {name} failed: {e}")
+
+    return families
+
+
+def render_metrics(families=None):
+    """
+    Every metric (default: those of this process) in Prometheus text
+    exposition format (version 0.0.4).
+    """
+    lines = []
+    for metric, metric_type, help_text, samples in (collect_metrics() if families is None else families):
+        lines.append(f"# HELP {metric} {help_text}")
+        lines.append(f"# TYPE {metric} {metric_type}")
+        for sample, labels, value in samples:
+            lines.append(f"{sample}{_labels(**labels)} {_format_value(value)}")
+    return "\n".join(lines) + "\n"
+
+
+def render_worker_metrics():
+    """
+    Metrics of every gunicorn worker of this host, each sample labelled with
+    the pid of its worker (worker="<pid>"): Prometheus scrapes one worker per
+    request, so sum() by the other labels gives the totals.
+
+    The values of this worker are current; those of the others come from
+    their last snapshot (METRICS_SNAPSHOT_INTERVAL). Snapshots of workers that
+    no longer exist are deleted.
+    """
+    own = _process_owner()
+    workers = {own[0]: collect_metrics()}
+    for pid, families in _read_snapshots(own):
+        workers[pid] = families
+
+    merged = {}
+    for pid, families in sorted(workers.items()):
+        for metric, metric_type, help_text, samples in families:
+            family = merged.setdefault(metric, (metric_type, help_text, []))
+            family[2].extend((sample, dict(labels, worker=str(pid)), value) for sample, labels, value in samples)
+    return render_metrics([(metric, *family) for metric, family in merged.items()])
+
+
+def write_metrics_snapshot():
+    """
+    Maintenance task: stores the metrics of this process in METRICS_DIR for
+    the other workers (see render_worker_metrics).
+    """
+    if not METRICS_DIR:
+        return
+    os.makedirs(METRICS_DIR, exist_ok=True)
+    pid, start = _process_owner()
+    path = os.path.join(METRICS_DIR, f"{pid}-{start}.json")
+    with open(path + '.tmp', 'w') as f:
+        json.dump(collect_metrics(), f)
+    os.replace(path + '.tmp', path)
+
+
+def start_metrics_snapshots():
+    """
+    Schedules write_metrics_snapshot in the maintenance thread of this process.
+    """
+    if METRICS_DIR:
+        register_maintenance_task('metrics_snapshot', write_metrics_snapshot, METRICS_SNAPSHOT_INTERVAL)
+
+
+def _read_snapshots(own):
+    if not METRICS_DIR:
+        return []
+    try:
+        names = os.listdir(METRICS_DIR)
+    except FileNotFoundError:
+        return []
+    snapshots = []
+    for name in names:
+        match = _SNAPSHOT_NAME.match(name)
+        if not match:
+            continue
+        owner = (int(match.group(1)), int(match.group(2)))
+        path = os.path.join(METRICS_DIR, name)
+        if owner == own:
+            continue
+        if not _process_alive(*owner):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            continue
+        try:
+            with open(path) as f:
+                snapshots.append((owner[0], json.load(f)))
+        except (OSError, ValueError) as e:
+            logging.warning(f"Metrics snapshot {name} could not be read: {e}")
+    return snapshots
+
+
+def _process_owner():
+    pid = os.getpid()
+    if pid not in _process_starts:
+        _process_starts[pid] = int(psutil.Process(pid).create_time())
+    return pid, _process_starts[pid]
+
+
+def _process_alive(pid, start):
+    try:
+        # create_time is derived from the boot time: allow for rounding
+        return abs(psutil.Process(pid).create_time() - start) <= 1
+    except psutil.NoSuchProcess:
+        return False
+    except psutil.Error:
+        return True
+
+
+def _maintenance_metrics():
+    stats = maintenance_stats()
+    return [
+        ('scraper_maintenance_runs_total', 'counter', 'Runs of each maintenance task.',
+         [({'task': task}, s['runs']) for task, s in stats.items()]),
+        ('scraper_maintenance_failures_total', 'counter', 'Failed runs of each maintenance task.',
+         [({'task': task}, s['failures']) for task, s in stats.items()]),
+        ('scraper_maintenance_duration_seconds_total', 'counter', 'Time spent in each maintenance task.',
+         [({'task': task}, s['total_duration']) for task, s in stats.items()]),
+        ('scraper_maintenance_last_duration_seconds', 'gauge', 'Duration of the last run of each maintenance task.',
+         [({'task': task}, s['last_duration']) for task, s in stats.items() if s['last_duration'] is not None]),
+    ]
+
+
+def _family(metric, metric_type, help_text, samples):
+    return metric, metric_type, help_text, [(metric, labels, value) for labels, value in samples]
+
+
+def _labels(**labels):
+    if not labels:
+        return ''
+    escaped = (f'{key}="{_escape(value)}"' for key, value in labels.items())
+    return '{' + ','.join(escaped) + '}'
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _format_value(value):
+    if isinstance(value, float):
+        return repr(value)
+    return str(value)
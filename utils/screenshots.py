@@ -0,0 +1,273 @@
+import base64
+import hashlib
+import logging
+import os
+import re
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait as wait_futures
+from functools import partial
+from io import BytesIO
+from utils.config import SCREENSHOT_DIR, SCREENSHOT_FORMAT, SCREENSHOT_MAX_BYTES, SCREENSHOT_QUALITY
+from utils.error import messageError
+from utils.metrics import register_metrics_collector
+
+try:
+    from PIL import Image
+except ImportError:  # Optional: only needed to convert Firefox PNG captures to WebP/JPEG
+    Image = None
+
+FORMATS = {'png': 'png', 'webp': 'webp', 'jpeg': 'jpg'}
+# Files of the store: only these count for (and are deleted by) the size quota
+_STORED_NAME = re.compile(r'^[0-9a-f]{32}\.(png|webp|jpg)$')
+
+# Page coordinates of an element (CDP clips are relative to the document, not the viewport)
+_ELEMENT_RECT_JS = """
+var rect = arguments[0].getBoundingClientRect();
+return {x: rect.left + window.scrollX, y: rect.top + window.scrollY, width: rect.width, height: rect.height};
+"""
+
+
+class ScreenshotService:
+    """
+    Screenshots in a content-addressed store: <sha256 of the capture>.<format>.
+
+    Decoding, converting to WebP/JPEG, writing and the retention by total
+    bytes run in a single background thread. capture() waits for the file
+    by default; with background=True the request only pays for grabbing the
+    image from the browser (Base64), the path is returned right away and
+    the file appears when the thread writes it (see wait/flush). The same
+    capture with the same format and quality is stored once.
+
+    Only Chromium drivers support WebP/JPEG out of the box: they capture
+    through CDP Page.captureScreenshot, which encodes them in the browser
+    and supports full-page and element clips. Other drivers capture PNG
+    with Selenium; it is converted only if Pillow is installed (it is not
+    in requirements.txt), otherwise they keep PNG.
+
+    Args:
+        directory: Store directory
+        max_bytes: Total size of the store; the least recently captured
+            files are deleted above it (0: no limit)
+    """
+
+    def __init__(self, directory=SCREENSHOT_DIR, max_bytes=SCREENSHOT_MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="screenshots")
+        self._lock = threading.Lock()
+        self._pending = {}
+        self._sizes = None
+        self._total_bytes = 0
+        self._stats = {'captures': 0, 'stored': 0, 'duplicates': 0, 'removed': 0, 'failures': 0,
+                       'capture_seconds': 0.0, 'encode_seconds': 0.0}
+
+    def capture(self, driver, element=None, full_page=False, image_format=SCREENSHOT_FORMAT,
+                quality=SCREENSHOT_QUALITY, background=False):
+        """
+        Captures the viewport, the whole page or one element.
+
+        Args:
+            driver: WebDriver de Selenium
+            element: WebElement to clip the capture to
+            full_page: Whole document instead of the viewport
+            image_format: 'png', 'webp' or 'jpeg'
+            quality: 0-100, WebP and JPEG only
+            background: Return before the file is written (see wait)
+
+        Returns:
+            str: Path of the screenshot (with background=True, where it will shortly be written)
+        """
+        if image_format not in FORMATS:
+            raise messageError(f"Invalid screenshot format '{image_format}'. Available: {', '.join(FORMATS)}")
+        start = time.perf_counter()
+        try:
+            data, captured_format = self._grab(driver, element, full_page, image_format, quality)
+        except Exception as e:
+            raise messageError(f"Error al tomar captura de pantalla: {e}")
+        elapsed = time.perf_counter() - start
+
+        if captured_format != image_format and Image is None:
+            logging.warning(f"Pillow is not installed, screenshot kept as {captured_format}")
+            image_format = captured_format
+        digest = hashlib.sha256(f"{image_format}:{quality}:".encode() + data.encode()).hexdigest()
+        path = os.path.join(self.directory, f"{digest[:32]}.{FORMATS[image_format]}")
+
+        with self._lock:
+            self._stats['captures'] += 1
+            self._stats['capture_seconds'] += elapsed
+            future = self._pending.get(path)
+            submitted = future is None or future.done()
+            if submitted:
+                future = self._pending[path] = self._executor.submit(
+                    self._store, path, data, captured_format, image_format, quality)
+        if submitted:
+            # Outside the lock: it runs right away if the write already finished
+            future.add_done_callback(partial(self._finished, path))
+        if not background:
+            future.result()
+        return path
+
+    def wait(self, path, timeout=None):
+        """
+        Waits until the screenshot at `path` is written. Returns the path.
+        Errors are only raised while the write is pending; failed writes
+        are logged and counted in stats()['failures'].
+        """
+        with self._lock:
+            future = self._pending.get(path)
+        if future is not None:
+            future.result(timeout)
+        return path
+
+    def flush(self, timeout=None):
+        """
+        Waits for every pending screenshot (failed writes are logged and counted, not raised).
+        """
+        with self._lock:
+            futures = list(self._pending.values())
+        wait_futures(futures, timeout)
+
+    def stats(self):
+        with self._lock:
+            pending = sum(1 for future in self._pending.values() if not future.done())
+            return dict(self._stats, pending=pending, bytes=self._total_bytes)
+
+    def _finished(self, path, future):
+        # Done callback: written or failed (already logged and counted), the write is no longer pending
+        with self._lock:
+            if self._pending.get(path) is future:
+                del self._pending[path]
+
+    def _grab(self, driver, element, full_page, image_format, quality):
+        if hasattr(driver, 'execute_cdp_cmd'):
+            params = {'format': image_format, 'captureBeyondViewport': bool(element or full_page)}
+            if image_format != 'png':
+                params['quality'] = quality
+            if element is not None:
+                params['clip'] = dict(driver.execute_script(_ELEMENT_RECT_JS, element), scale=1)
+            elif full_page:
+                size = driver.execute_cdp_cmd('Page.getLayoutMetrics', {})['cssContentSize']
+                params['clip'] = {'x': 0, 'y': 0, 'width': size['width'], 'height': size['height'], 'scale': 1}
+            return driver.execute_cdp_cmd('Page.captureScreenshot', params)['data'], image_format
+        if element is not None:
+            return element.screenshot_as_base64, 'png'
+        if full_page and hasattr(driver, 'get_full_page_screenshot_as_base64'):
+            # Firefox
+            return driver.get_full_page_screenshot_as_base64(), 'png'
+        return driver.get_screenshot_as_base64(), 'png'
+
+    def _store(self, path, data, captured_format, image_format, quality):
+        start = time.perf_counter()
+        try:
+            if os.path.exists(path):
+                # Same capture already stored: it becomes the most recent one
+                os.utime(path)
+                with self._lock:
+                    self._stats['duplicates'] += 1
+                return path
+
+            content = base64.b64decode(data)
+            if captured_format != image_format:
+                image = Image.open(BytesIO(content))
+                if image_format == 'jpeg':
+                    image = image.convert('RGB')
+                output = BytesIO()
+                image.save(output, format=image_format.upper(), quality=quality)
+                content = output.getvalue()
+
+            os.makedirs(self.directory, exist_ok=True)
+            fd, part_path = tempfile.mkstemp(dir=self.directory, prefix='.', suffix='.part')
+            try:
+                with os.fdopen(fd, 'wb') as f:
+                    f.write(content)
+                os.replace(part_path, path)
+            except Exception:
+                os.remove(part_path)
+                raise
+            logging.info(f"Screenshot saved: {path}")
+
+            self._enforce_quota(path, len(content))
+            with self._lock:
+                self._stats['stored'] += 1
+                self._stats['encode_seconds'] += time.perf_counter() - start
+            return path
+        except Exception as e:
+            logging.error(f"Error saving screenshot {path}: {e}")
+            with self._lock:
+                self._stats['failures'] += 1
+            raise messageError(f"Error al guardar la captura de pantalla: {e}")
+
+    def _enforce_quota(self, path, size):
+        # Runs in the single writer thread: sizes are only modified here
+        if self._sizes is None:
+            self._sizes = {}
+            for entry in os.scandir(self.directory):
+                if entry.is_file() and _STORED_NAME.match(entry.name):
+                    self._sizes[entry.path] = entry.stat().st_size
+        self._sizes[path] = size
+        total = sum(self._sizes.values())
+        with self._lock:
+            self._total_bytes = total
+        if not self.max_bytes or total <= self.max_bytes:
+            return
+
+        def modified(file_path):
+            try:
+                return os.stat(file_path).st_mtime
+            except OSError:
+                return 0
+
+        for file_path in sorted(self._sizes, key=modified):
+            if total <= self.max_bytes or file_path == path:
+                break
+            try:
+                os.remove(file_path)
+            except FileNotFoundError:
+                pass
+            total -= self._sizes.pop(file_path)
+            with self._lock:
+                self._total_bytes = total
+                self._stats['removed'] += 1
+
+
+_services = {}
+_services_lock = threading.Lock()
+
+
+def get_screenshot_service(directory=None):
+    """
+    Process-wide service of a store directory (default: SCREENSHOT_DIR).
+    """
+    directory = os.path.abspath(directory or SCREENSHOT_DIR)
+    with _services_lock:
+        service = _services.get(directory)
+        if service is None:
+            service = _services[directory] = ScreenshotService(directory)
+        return service
+
+
+def screenshot_metrics():
+    with _services_lock:
+        stats = {directory: service.stats() for directory, service in _services.items()}
+
+    def samples(key):
+        return [({'directory': directory}, s[key]) for directory, s in stats.items()]
+
+    return [
+        ('scraper_screenshots_total', 'counter', 'Screenshots captured.', samples('captures')),
+        ('scraper_screenshots_stored_total', 'counter', 'Screenshots written to the store.', samples('stored')),
+        ('scraper_screenshots_duplicate_total', 'counter', 'Captures already in the store.', samples('duplicates')),
+        ('scraper_screenshots_removed_total', 'counter', 'Screenshots deleted by the size quota.', samples('removed')),
+        ('scraper_screenshot_failures_total', 'counter', 'Screenshots that could not be written.', samples('failures')),
+        ('scraper_screenshot_capture_seconds_total', 'counter', 'Time spent grabbing images from the browser.',
+         samples('capture_seconds')),
+        ('scraper_screenshot_encode_seconds_total', 'counter', 'Background time decoding, converting and writing.',
+         samples('encode_seconds')),
+        ('scraper_screenshots_pending', 'gauge', 'Screenshots waiting to be written.', samples('pending')),
+        ('scraper_screenshot_store_bytes', 'gauge', 'Size of the screenshot store.', samples('bytes')),
+    ]
+
+
+register_metrics_collector('screenshots', screenshot_metrics)